@@ -7,39 +7,35 @@ This file is ADDITIVE - it doesn't replace existing routes
 from flask import jsonify, request, url_for
 from tensorflow.keras.models import load_model
 from disease_classifier.dataset_handler import DatasetHandler
+from knowledge_base.loader import get_disease_info_source
+from serving.upload_store import UploadStore
+from config import Config
 import numpy as np
+import io
 import os
-import glob
 from datetime import datetime
 import json
 
-# Load disease information (preventive measures & causing agents)
-DISEASE_INFO = {}
-try:
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    info_path = os.path.join(base_dir, 'data', 'disease_info.json')
-    if not os.path.exists(info_path):
-        # try project root location
-        info_path = os.path.join(os.getcwd(), 'data', 'disease_info.json')
-    if os.path.exists(info_path):
-        with open(info_path, 'r', encoding='utf-8') as f:
-            DISEASE_INFO = json.load(f)
-except Exception:
-    DISEASE_INFO = {}
+# Disease information (preventive measures & causing agents), shared with app_with_api
+# and reloaded in the background when data/disease_info.json changes
+disease_info_source = get_disease_info_source()
 
 # These will be initialized when added to app.py
 model = None
 handler = None
+upload_store = None
 UPLOAD_FOLDER = "uploads"
 
-def init_api(flask_app, ml_model, data_handler):
+def init_api(flask_app, ml_model, data_handler, store=None):
     """
     Initialize API routes with Flask app and model
-    Call this from app.py after loading model
+    Call this from app.py after loading model; pass app.py's UploadStore so both
+    serve the same content-addressed uploads
     """
-    global model, handler
+    global model, handler, upload_store
     model = ml_model
     handler = data_handler
+    upload_store = store or UploadStore(UPLOAD_FOLDER).start()
     
     # Register routes
     flask_app.add_url_rule('/api/health', 'api_health', api_health, methods=['GET'])
@@ -74,21 +70,13 @@ def api_predict():
         if image_file.filename == '':
             return jsonify({'error': 'Please select an image'}), 400
 
-        # Clear old uploads
-        for old_file in glob.glob(os.path.join(UPLOAD_FOLDER, '*')):
-            try:
-                os.remove(old_file)
-            except:
-                pass
-
-        # Save new file
-        image_path = os.path.join(UPLOAD_FOLDER, image_file.filename)
-        image_file.save(image_path)
+        image_bytes = image_file.read()
 
         # Preprocess and predict
-        img = handler.preprocess_image(image_path)
+        img = handler.preprocess_image(io.BytesIO(image_bytes))
         if img is None:
             return jsonify({'error': 'Failed to process image'}), 400
+        stored_name = upload_store.put_async(image_bytes, image_file.filename)
 
         preds = model.predict(img)
         predicted_index = np.argmax(preds)
@@ -109,7 +97,7 @@ def api_predict():
 
         # Return JSON response
         # Attach preventive measures and causing agents when available
-        disease_entry = DISEASE_INFO.get(predicted_label, {})
+        disease_entry = disease_info_source.get(predicted_label, {})
         preventive_measures = disease_entry.get('preventive_measures', [])
         causing_agents = disease_entry.get('causing_agents', [])
 
@@ -118,7 +106,7 @@ def api_predict():
             'label': predicted_label,
             'confidence': confidence,
             'probabilities': probabilities,
-            'image_url': url_for('send_uploaded_file', filename=image_file.filename, _external=True),
+            'image_url': url_for('send_uploaded_file', filename=stored_name, _external=True),
             'preventive_measures': preventive_measures,
             'causing_agents': causing_agents,
             'timestamp': datetime.now().isoformat()
@@ -156,17 +144,15 @@ def api_model_metrics():
     GET /api/model/metrics
     """
     try:
-        # Check if metrics file exists
-        metrics_path = 'model/metrics.json'
-        if os.path.exists(metrics_path):
-            import json
-            with open(metrics_path, 'r') as f:
+        # metrics.json is written by evaluate_models.py
+        if os.path.exists(Config.METRICS_PATH):
+            with open(Config.METRICS_PATH, 'r', encoding='utf-8') as f:
                 metrics = json.load(f)
             return jsonify(metrics)
         else:
             return jsonify({
-                'message': 'Training metrics not available',
-                'accuracy': '~97%',
-            })
+                'message': 'Training metrics not available. Run evaluate_models.py to generate them.',
+                'accuracy': None,
+            }), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,18 +1,21 @@
 # app.py
-from flask import Flask, render_template, request, send_from_directory
+from flask import Flask, render_template, request
 from tensorflow.keras.models import load_model
 from disease_classifier.dataset_handler import DatasetHandler
+from serving.upload_store import UploadStore
+from config import Config
 import numpy as np
-import os
-import glob
+import io
 
 # Initialize app
 app = Flask(__name__)
 
 # Paths
-MODEL_PATH = "model/enhanced_model.h5"   # change if you prefer a specific one
+MODEL_PATH = Config.SERVING_MODEL_PATH   # e.g. model/compressed_model.h5 from compress_model.py
 UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Uploads are stored by content hash; a background GC enforces retention
+upload_store = UploadStore(UPLOAD_FOLDER).start()
 
 # Load model + dataset handler
 model = load_model(MODEL_PATH)
@@ -33,19 +36,14 @@ def predict():
     if image_file.filename == '':
         return render_template('index.html', message="Please select an image")
 
-    # Clear old uploads
-    for old_file in glob.glob(os.path.join(UPLOAD_FOLDER, '*')):
-        os.remove(old_file)
-
-    # Save new file
-    image_path = os.path.join(UPLOAD_FOLDER, image_file.filename)
-    image_file.save(image_path)
+    image_bytes = image_file.read()
 
     # Preprocess and predict
-    img = handler.preprocess_image(image_path)
+    img = handler.preprocess_image(io.BytesIO(image_bytes))
     preds = model.predict(img)
     predicted_index = np.argmax(preds)
     confidence = round(float(np.max(preds)) * 100, 2)
+    stored_name = upload_store.put_async(image_bytes, image_file.filename)
 
     # Get readable label
     _, index_to_class = handler.get_class_mapping()
@@ -54,12 +52,12 @@ def predict():
     return render_template('result.html',
                            label=predicted_label,
                            confidence=confidence,
-                           image_file=image_file.filename)
+                           image_file=stored_name)
 
 # Route to show uploaded image
 @app.route('/uploads/<filename>')
 def send_uploaded_file(filename):
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    return upload_store.serve(filename)
 
 # Run app
 if __name__ == "__main__":
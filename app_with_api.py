@@ -2,14 +2,48 @@
 # Enhanced version of app.py with JSON API support for React frontend
 # This is OPTIONAL - the original app.py still works without changes
 
-from flask import Flask, render_template, request, send_from_directory, jsonify
+from flask import Flask, render_template, request, jsonify, url_for, Response
 from flask_cors import CORS
 from tensorflow.keras.models import load_model
 from disease_classifier.dataset_handler import DatasetHandler
+from disease_classifier.tta import TTAPredictor, TTA_MODES
+from disease_classifier.tiling import TiledAnalyzer, ImageTooLarge
+from disease_classifier.explain import ActivationMapper, ExplanationCache
+from serving.frame_stream import FrameBatcher, serve_stream
+from serving.static_json import JSONCatalog, serve_preserialized
+from serving.timing import StageTimer
+from serving.telemetry import Telemetry
+from serving.capacity import configure_tensorflow_threads
+from serving.admin import admin_required
+from serving.profiler import ProfileSession, load_profile
+from serving.slow_log import SlowRequestLog
+from serving.upload_store import UploadStore
+from serving.derivatives import DerivativeGenerator
+from serving.memory import LeakDetector, load_leak_report, instrument_app as instrument_memory
+from pest_predictor.predictor import PestPredictor
+from pest_predictor.weather_risk import WeatherRiskEngine
+from remedy_engine.engine import RemedyEngine, recommendation_cache_info
+from remedy_engine.treatment_database import TREATMENT_DATABASE
+from pest_predictor.pest_database import PEST_INDEX
+from knowledge_base.search import TreatmentSearchIndex, FACETS as SEARCH_FACETS
+from knowledge_base.loader import get_disease_info_source
+from knowledge_base.store import get_store, KnowledgeView
+from knowledge_base.labels import to_knowledge_base_name, to_display_label
+from config import Config
 import numpy as np
 import os
-import glob
+import io
 import json
+import tempfile
+import datetime
+import threading
+from functools import lru_cache
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    print("flask-sock is not installed; live streaming (/api/stream) is disabled")
+    Sock = None
 
 # Initialize app
 app = Flask(__name__)
@@ -19,7 +53,8 @@ CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],
         "methods": ["GET", "POST"],
-        "allow_headers": ["Content-Type"]
+        "allow_headers": ["Content-Type"],
+        "expose_headers": ["Server-Timing"]
     },
     r"/uploads/*": {
         "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],
@@ -29,26 +64,95 @@ CORS(app, resources={
 })
 
 # Paths
-MODEL_PATH = "model/enhanced_model.h5"
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+MODEL_PATH = Config.SERVING_MODEL_PATH
+UPLOAD_FOLDER = Config.UPLOAD_FOLDER
 
-# Load model + dataset handler
+# Uploads are stored by content hash after inference; a background GC enforces retention
+upload_store = UploadStore(UPLOAD_FOLDER).start()
+# Thumbnails and previews for the History view, generated in a background pool
+derivatives = DerivativeGenerator(upload_store)
+
+# Load model + dataset handler (thread pools sized first: they are fixed once TensorFlow starts)
+configure_tensorflow_threads()
 model = load_model(MODEL_PATH)
 handler = DatasetHandler()
+tta_predictor = TTAPredictor(model)
+frame_batcher = FrameBatcher(model)
 
-# Load disease info (preventive measures & causing agents)
-DISEASE_INFO = {}
+# Class activation maps need a GAP -> Dense head; explanations are disabled otherwise
+try:
+    activation_mapper = ActivationMapper(model)
+except ValueError as e:
+    print(f"Explanations disabled: {e}")
+    activation_mapper = None
+explanation_cache = ExplanationCache()
+pest_predictor = PestPredictor()
+remedy_engine = RemedyEngine()
+
+# Weather-driven pest risk; disabled when the configured weather source cannot be opened
 try:
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    info_path = os.path.join(base_dir, 'data', 'disease_info.json')
-    if not os.path.exists(info_path):
-        info_path = os.path.join(os.getcwd(), 'data', 'disease_info.json')
-    if os.path.exists(info_path):
-        with open(info_path, 'r', encoding='utf-8') as f:
-            DISEASE_INFO = json.load(f)
-except Exception:
-    DISEASE_INFO = {}
+    weather_engine = WeatherRiskEngine()
+except (OSError, ValueError, KeyError) as e:
+    print(f"Weather risk disabled: {e}")
+    weather_engine = None
+
+
+def _parse_date(value):
+    """Optional YYYY-MM-DD request value as a date; raises ValueError when malformed"""
+    return datetime.date.fromisoformat(value) if value else None
+
+
+def _weather_risk_for(region, plot_id=None, date=None):
+    """Weather risk for a plot (or region) and date, or None when unavailable"""
+    if weather_engine is None or not region:
+        return None
+    return weather_engine.plot_risk(region, plot_id or None, date)
+
+
+@lru_cache(maxsize=1)
+def get_class_labels():
+    """Model class labels in output order, resolved once per worker"""
+    _, index_to_class = handler.get_class_mapping()
+    if index_to_class:
+        return tuple(index_to_class[i] for i in sorted(index_to_class))
+    # flow_from_directory orders classes alphabetically
+    return tuple(sorted(Config.DISEASE_CLASSES))
+
+# Disease info (preventive measures & causing agents), reloaded in the background when
+# data/disease_info.json changes; its pre-serialized catalog is rebuilt with each version
+disease_info_source = get_disease_info_source()
+disease_info_source.add_derived('catalog', lambda data: JSONCatalog(data, normalize=to_display_label))
+
+def _pest_catalog_document(disease):
+    records = PEST_INDEX.get(disease)
+    return None if records is None else [dict(record.fields) for record in records]
+
+# Static knowledge-base documents, read from the knowledge store and serialized on first request
+REMEDY_CATALOG = JSONCatalog(TREATMENT_DATABASE, normalize=to_knowledge_base_name)
+PEST_CATALOG = JSONCatalog(
+    KnowledgeView(_pest_catalog_document, lambda: PEST_INDEX.keys()),
+    normalize=to_knowledge_base_name
+)
+
+
+@lru_cache(maxsize=1)
+def get_treatment_search():
+    """Inverted index over every treatment, built on the first search in each worker"""
+    return TreatmentSearchIndex.from_knowledge_base()
+
+# Prometheus-style telemetry at /metrics: request counts, latencies, stage histograms, caches
+telemetry = Telemetry()
+telemetry.set_model(MODEL_PATH)
+telemetry.register_cache('remedy_fragments', recommendation_cache_info)
+for _cache_name in ('treatment', 'disease_pests', 'pest_details'):
+    telemetry.register_cache(f'knowledge_{_cache_name}',
+                             lambda name=_cache_name: get_store().cache_info()[name])
+telemetry.instrument_app(app)
+memory_monitor = instrument_memory(app, telemetry)
+
+# Slow /api/predict calls with input fingerprints, for benchmarks/replay_slow_requests.py
+slow_log = SlowRequestLog()
+slow_log.instrument_app(app)
 
 # ============================================================================
 # ORIGINAL ROUTES (unchanged - for backward compatibility)
@@ -69,33 +173,27 @@ def predict():
     if image_file.filename == '':
         return render_template('index.html', message="Please select an image")
 
-    # Clear old uploads
-    for old_file in glob.glob(os.path.join(UPLOAD_FOLDER, '*')):
-        os.remove(old_file)
-
-    # Save new file
-    image_path = os.path.join(UPLOAD_FOLDER, image_file.filename)
-    image_file.save(image_path)
+    image_bytes = image_file.read()
 
     # Preprocess and predict
-    img = handler.preprocess_image(image_path)
+    img = handler.preprocess_image(io.BytesIO(image_bytes))
     preds = model.predict(img)
     predicted_index = np.argmax(preds)
     confidence = round(float(np.max(preds)) * 100, 2)
+    stored_name = upload_store.put_async(image_bytes, image_file.filename)
 
     # Get readable label
-    _, index_to_class = handler.get_class_mapping()
-    predicted_label = index_to_class[predicted_index].replace('_', ' ')
+    predicted_label = get_class_labels()[predicted_index].replace('_', ' ')
 
     return render_template('result.html',
                            label=predicted_label,
                            confidence=confidence,
-                           image_file=image_file.filename)
+                           image_file=stored_name)
 
 @app.route('/uploads/<filename>')
 def send_uploaded_file(filename):
-    """Original route to serve uploaded images"""
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    """Serve a stored upload or one of its derivatives by content-addressed name (ETag, Range, sendfile)"""
+    return derivatives.serve(filename)
 
 # ============================================================================
 # NEW JSON API ROUTES (for React frontend)
@@ -114,79 +212,175 @@ def api_health():
 @app.route('/api/predict', methods=['POST'])
 def api_predict():
     """JSON prediction endpoint"""
+    timer = StageTimer()
+    slow_log.track(timer, tta=request.args.get('tta', Config.TTA_MODE), explain=request.args.get('explain'))
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file uploaded'}), 400
+        with timer.stage('receive'):
+            if 'file' not in request.files:
+                return jsonify({'error': 'No file uploaded'}), 400
 
-        image_file = request.files['file']
-        if image_file.filename == '':
-            return jsonify({'error': 'Please select an image'}), 400
-
-        # Clear old uploads
-        for old_file in glob.glob(os.path.join(UPLOAD_FOLDER, '*')):
-            try:
-                os.remove(old_file)
-            except:
-                pass
+            image_file = request.files['file']
+            if image_file.filename == '':
+                return jsonify({'error': 'Please select an image'}), 400
 
-        # Save new file
-        image_path = os.path.join(UPLOAD_FOLDER, image_file.filename)
-        image_file.save(image_path)
+            image_bytes = image_file.read()
+            slow_log.attach_input(image_bytes, image_file.filename)
 
         # Preprocess and predict
-        img = handler.preprocess_image(image_path)
-        if img is None:
-            return jsonify({'error': 'Failed to process image'}), 400
-
-        preds = model.predict(img)
-        predicted_index = np.argmax(preds)
-        confidence = round(float(np.max(preds)) * 100, 2)
-
-        # Get readable label
-        _, index_to_class = handler.get_class_mapping()
-        predicted_label = index_to_class[predicted_index].replace('_', ' ')
-
-        # Get all probabilities
-        probabilities = []
-        for idx, prob in enumerate(preds[0]):
-            class_name = index_to_class[idx].replace('_', ' ')
-            probabilities.append({
-                'class': class_name,
-                'probability': round(float(prob) * 100, 2)
-            })
-
-        from datetime import datetime
-        # Generate full URL for the uploaded image
-        image_url = f'http://127.0.0.1:5000/uploads/{image_file.filename}'
-        # Attach preventive measures and causing agents when available
-        disease_entry = DISEASE_INFO.get(predicted_label, {})
-        preventive_measures = disease_entry.get('preventive_measures', [])
-        causing_agents = disease_entry.get('causing_agents', [])
-
-        return jsonify({
+        with timer.stage('preprocess'):
+            img = handler.preprocess_image(io.BytesIO(image_bytes))
+            if img is None:
+                return jsonify({'error': 'Failed to process image'}), 400
+
+        # Optional test-time augmentation: ?tta=auto|always[&tta_views=N]
+        tta_mode = request.args.get('tta', Config.TTA_MODE)
+        if tta_mode not in TTA_MODES:
+            return jsonify({'error': f'Invalid tta mode, expected one of {list(TTA_MODES)}'}), 400
+        tta_views = request.args.get('tta_views', type=int)
+
+        # Optional class-activation map from the same forward pass: ?explain=1
+        explain = request.args.get('explain', '').lower() in ('1', 'true', 'yes')
+        if explain and activation_mapper is None:
+            return jsonify({'error': 'Explanations are not supported by the loaded model'}), 400
+        if explain and 'tta' not in request.args:
+            # The configured default TTA mode yields to an explicit explanation request
+            tta_mode = 'off'
+        if explain and tta_mode != 'off':
+            return jsonify({'error': 'explain cannot be combined with test-time augmentation'}), 400
+
+        with timer.stage('predict'):
+            if explain:
+                preds, feature_maps = activation_mapper.predict(img)
+                tta_info = None
+            else:
+                preds, tta_info = tta_predictor.predict(img, mode=tta_mode, num_views=tta_views)
+            predicted_index = np.argmax(preds)
+            confidence = round(float(np.max(preds)) * 100, 2)
+
+        with timer.stage('store'):
+            # Written by the upload store's writer pool; servable immediately from memory
+            stored_name = upload_store.put_async(image_bytes, image_file.filename)
+            derived_names = derivatives.submit(stored_name, image_bytes)
+
+        with timer.stage('labels'):
+            # Get readable label
+            class_labels = get_class_labels()
+            predicted_label = class_labels[predicted_index].replace('_', ' ')
+
+            # Get all probabilities
+            probabilities = []
+            for idx, prob in enumerate(preds[0]):
+                class_name = class_labels[idx].replace('_', ' ')
+                probabilities.append({
+                    'class': class_name,
+                    'probability': round(float(prob) * 100, 2)
+                })
+
+            from datetime import datetime
+            # Content-addressed URL: stays valid when later uploads arrive
+            image_url = url_for('send_uploaded_file', filename=stored_name, _external=True)
+            thumbnail_url = url_for('send_uploaded_file', filename=derived_names['thumb'], _external=True)
+            preview_url = url_for('send_uploaded_file', filename=derived_names['preview'], _external=True)
+            # Attach preventive measures and causing agents when available
+            disease_entry = disease_info_source.get(predicted_label, {})
+            preventive_measures = disease_entry.get('preventive_measures', [])
+            causing_agents = disease_entry.get('causing_agents', [])
+
+        response = {
             'success': True,
             'label': predicted_label,
             'confidence': confidence,
             'probabilities': probabilities,
             'image_url': image_url,
+            'thumbnail_url': thumbnail_url,
+            'preview_url': preview_url,
             'preventive_measures': preventive_measures,
             'causing_agents': causing_agents,
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        if tta_info:
+            response['tta'] = tta_info
+        if explain:
+            with timer.stage('explain'):
+                cam = activation_mapper.class_activation_map(feature_maps[0], int(predicted_index))
+                key = explanation_cache.put((img[0] * 255).astype(np.uint8), cam)
+                response['explanation'] = {
+                    'method': 'class_activation_map',
+                    'class': predicted_label,
+                    'grid': np.round(cam, 3).tolist(),
+                    'overlay_url': url_for('api_explanation_overlay', key=key, _external=True)
+                }
+
+        with timer.stage('serialize'):
+            response = jsonify(response)
+        response.headers['Server-Timing'] = timer.server_timing()
+        return response
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        telemetry.observe_stages('api_predict', timer)
+
+@app.route('/api/explain/<key>.png', methods=['GET'])
+def api_explanation_overlay(key):
+    """Overlay PNG for an explanation, encoded on first request"""
+    png = explanation_cache.overlay_png(key)
+    if png is None:
+        return jsonify({'error': 'Explanation expired or not found'}), 404
+    return Response(png, mimetype='image/png', headers={'Cache-Control': 'private, max-age=600'})
+
+def _serve_catalog(catalog, name):
+    entry = catalog.index if name is None else catalog.get(name)
+    if entry is None:
+        return jsonify({'error': f"No entry for '{name}'"}), 404
+    response = serve_preserialized(entry)
+    telemetry.cache_event('catalog_etag', hit=response.status_code == 304)
+    return response
+
+@app.route('/api/remedy', methods=['GET'])
+@app.route('/api/remedy/<disease>', methods=['GET'])
+def api_remedy(disease=None):
+    """Treatment database entry for a disease (ETag-cached, pre-serialized)"""
+    return _serve_catalog(REMEDY_CATALOG, disease)
+
+@app.route('/api/pests', methods=['GET'])
+@app.route('/api/pests/<disease>', methods=['GET'])
+def api_pests(disease=None):
+    """Pests associated with a disease, highest base confidence first"""
+    return _serve_catalog(PEST_CATALOG, disease)
+
+@app.route('/api/disease-info', methods=['GET'])
+@app.route('/api/disease-info/<disease>', methods=['GET'])
+def api_disease_info(disease=None):
+    """Preventive measures and causing agents from disease_info.json"""
+    return _serve_catalog(disease_info_source.current.derived['catalog'], disease)
+
+@app.route('/api/treatments/search', methods=['GET'])
+def api_treatments_search():
+    """
+    Search treatments by product, active ingredient, pest type and free text
+
+    Query parameters: q, limit, offset, and any of kind/disease/pest_type/urgency
+    (repeat a facet to accept several values).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
+    filters = {facet: request.args.getlist(facet) for facet in SEARCH_FACETS if request.args.getlist(facet)}
+    return jsonify(get_treatment_search().search(request.args.get('q', ''), filters, limit=limit, offset=offset))
 
 @app.route('/api/model/metadata', methods=['GET'])
 def api_model_metadata():
     """Get model metadata"""
     try:
-        _, index_to_class = handler.get_class_mapping()
-        classes = [index_to_class[i].replace('_', ' ') for i in sorted(index_to_class.keys())]
+        classes = [label.replace('_', ' ') for label in get_class_labels()]
         
         return jsonify({
             'model_name': 'DenseNet121',
-            'model_path': 'model/enhanced_model.h5',
+            'model_path': MODEL_PATH,
             'classes': classes,
             'num_classes': len(classes),
             'image_size': [224, 224],
@@ -197,11 +391,309 @@ def api_model_metadata():
 
 @app.route('/api/model/metrics', methods=['GET'])
 def api_model_metrics():
-    """Get training metrics"""
+    """Get evaluation metrics written by evaluate_models.py"""
+    try:
+        if os.path.exists(Config.METRICS_PATH):
+            with open(Config.METRICS_PATH, 'r', encoding='utf-8') as f:
+                metrics = json.load(f)
+            return jsonify(metrics)
+        return jsonify({
+            'message': 'Training metrics not available. Run evaluate_models.py to generate them.',
+            'accuracy': None,
+        }), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/diagnose', methods=['POST'])
+def api_diagnose():
+    """
+    Full diagnosis in one request: classify -> pest prediction -> remedy planning
+    Per-stage durations are returned in the Server-Timing header
+    """
+    timer = StageTimer()
+    try:
+        with timer.stage('receive'):
+            if 'file' not in request.files:
+                return jsonify({'error': 'No file uploaded'}), 400
+            image_file = request.files['file']
+            if image_file.filename == '':
+                return jsonify({'error': 'Please select an image'}), 400
+            image_bytes = image_file.read()
+            try:
+                plot_date = _parse_date(request.form.get('date'))
+            except ValueError:
+                return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+
+        with timer.stage('preprocess'):
+            img = handler.preprocess_image(io.BytesIO(image_bytes))
+            if img is None:
+                return jsonify({'error': 'Failed to process image'}), 400
+
+        with timer.stage('classify'):
+            probs = model.predict(img, verbose=0)[0]
+            class_labels = get_class_labels()
+            order = np.argsort(-probs)
+            disease_predictions = [
+                {
+                    'disease': to_knowledge_base_name(class_labels[i]),
+                    'label': to_display_label(class_labels[i]),
+                    'confidence': round(float(probs[i]), 4)
+                }
+                for i in order
+            ]
+            primary = disease_predictions[0]
+
+        with timer.stage('pests'):
+            pests = pest_predictor.predict_from_probabilities(
+                probs, class_labels=class_labels, top_k=Config.DIAGNOSE_TOP_PESTS
+            )
+            pest_priority = pest_predictor.get_pest_management_priority(pests)
+
+        with timer.stage('weather'):
+            # Optional plot context: region, plot_id and date (YYYY-MM-DD) form fields
+            weather_risk = _weather_risk_for(request.form.get('region'), request.form.get('plot_id'), plot_date)
+            seasonal_risk = (pest_predictor.get_seasonal_risk_assessment(pests, weather_risk=weather_risk)
+                             if weather_risk else None)
+
+        with timer.stage('remedy'):
+            management_plan = remedy_engine.get_integrated_management_plan(
+                disease_predictions, pests, weather_risk=weather_risk
+            )
+            disease_entry = disease_info_source.get(primary['label'], {})
+
+        with timer.stage('serialize'):
+            response = jsonify({
+                'success': True,
+                'label': primary['label'],
+                'disease': primary['disease'],
+                'confidence': round(primary['confidence'] * 100, 2),
+                'predictions': disease_predictions,
+                'pests': pests,
+                'pest_priority': pest_priority,
+                'seasonal_risk': seasonal_risk,
+                # True when weather-adjusted risk and timing come from the synthetic stub service
+                'weather_synthetic': bool(weather_risk and weather_risk.get('synthetic')),
+                'management_plan': management_plan,
+                'preventive_measures': disease_entry.get('preventive_measures', []),
+                'causing_agents': disease_entry.get('causing_agents', []),
+                'timing_ms': timer.as_milliseconds()
+            })
+
+        response.headers['Server-Timing'] = timer.server_timing()
+        response.headers['Timing-Allow-Origin'] = '*'
+        return response
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        telemetry.observe_stages('api_diagnose', timer)
+
+@app.route('/api/plan/batch', methods=['POST'])
+def api_plan_batch():
+    """
+    Management plans for many plots in one request
+
+    JSON body:
+        probabilities: per-plot disease probabilities, one row per plot
+        labels: class label of each column (default: the model's class labels)
+        pest_confidences / pests: optional per-plot pest confidences and their pest names;
+            derived from the disease probabilities when omitted
+        min_pest_confidence: pests at or above this confidence get pest-specific treatments
+
+    Plans have the shape of /api/diagnose's management_plan, but each is shared by every
+    plot in plan_index that maps to it, so secondary_considerations entries carry
+    'confidence': null; a plot's own confidences are its row of probabilities.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        if not payload.get('probabilities'):
+            return jsonify({'error': 'probabilities is required'}), 400
+
+        probs = np.asarray(payload['probabilities'], dtype=np.float32)
+        labels = payload.get('labels') or list(get_class_labels())
+        if probs.ndim != 2 or probs.shape[1] != len(labels):
+            return jsonify({'error': f'probabilities must have one column per label ({len(labels)})'}), 400
+
+        if payload.get('pest_confidences') is not None:
+            pest_confidences = np.asarray(payload['pest_confidences'], dtype=np.float32)
+            known_pests = {record.pest_name: record.fields for record in pest_predictor.pest_matrix.records}
+            pest_columns = [
+                known_pests.get(name, {'pest_name': name, 'pest_type': 'unknown'}) for name in payload.get('pests') or []
+            ]
+        else:
+            pest_confidences = pest_predictor.pest_confidence_matrix(probs, labels)
+            pest_columns = [record.fields for record in pest_predictor.pest_matrix.records]
+
+        result = remedy_engine.plan_batch(
+            probs, [to_knowledge_base_name(label) for label in labels],
+            pest_confidences=pest_confidences, pest_columns=pest_columns,
+            min_pest_confidence=float(payload.get('min_pest_confidence', 0.5))
+        )
+        levels, counts = np.unique(result['urgency_levels'], return_counts=True)
+        return jsonify({
+            'success': True,
+            'plots': len(result['plan_index']),
+            'plans': result['plans'],
+            'plan_index': result['plan_index'].tolist(),
+            'urgency_scores': np.round(result['urgency_scores'], 3).tolist(),
+            'urgency_levels': result['urgency_levels'].tolist(),
+            'urgency_counts': {str(level): int(count) for level, count in zip(levels, counts)}
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/risk/weather', methods=['GET'])
+def api_weather_risk():
+    """Pest favourability from recent weather for a region (or one plot) on a date"""
+    if weather_engine is None:
+        return jsonify({'error': 'Weather risk is not configured'}), 503
+    region = request.args.get('region')
+    if not region:
+        return jsonify({'error': 'region is required'}), 400
+    try:
+        date = _parse_date(request.args.get('date'))
+    except ValueError:
+        return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+    risk = _weather_risk_for(region, request.args.get('plot_id'), date)
+    if risk is None:
+        return jsonify({'error': f"No weather data for region '{region}'"}), 404
+    return jsonify(risk)
+
+@app.route('/api/analyze/tiled', methods=['POST'])
+def api_analyze_tiled():
+    """Tiled analysis for large drone/field images: per-tile heatmap plus summary"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        image_file = request.files['file']
+        if image_file.filename == '':
+            return jsonify({'error': 'Please select an image'}), 400
+
+        overlap = request.args.get('overlap', type=float)
+        if overlap is not None and not 0 <= overlap < 1:
+            return jsonify({'error': 'overlap must be in [0, 1)'}), 400
+
+        # Spool to a temporary file so the strip reader can seek instead of decoding in memory
+        suffix = os.path.splitext(image_file.filename)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            image_file.save(tmp)
+            tmp_path = tmp.name
+
+        try:
+            index_to_class = dict(enumerate(get_class_labels()))
+            analyzer = TiledAnalyzer(model, index_to_class, overlap=overlap)
+            result = analyzer.analyze(tmp_path)
+        finally:
+            os.remove(tmp_path)
+
+        result['success'] = True
+        return jsonify(result)
+
+    except ImageTooLarge as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/admin/profile', methods=['POST'])
+@admin_required
+def api_admin_profile_start():
+    """
+    Start sampling this worker's Python stacks for `seconds` (capped by PROFILER_MAX_SECONDS)
+
+    Optional: hz (sampling rate), match (keep only stacks containing it, e.g. api_predict),
+    tf_trace=1 (also record a TensorFlow op-level trace for TensorBoard)
+    """
+    seconds = request.args.get('seconds', 10, type=float)
+    hz = request.args.get('hz', type=int)
+    if seconds <= 0 or (hz is not None and hz <= 0):
+        return jsonify({'error': 'seconds and hz must be positive'}), 400
+    tf_trace = request.args.get('tf_trace', '0').lower() in ('1', 'true', 'yes')
+    session = ProfileSession.start(seconds, hz=hz, match=request.args.get('match') or None, tf_trace=tf_trace)
+    if session is None:
+        return jsonify({'error': 'A profile is already running in this worker'}), 409
     return jsonify({
-        'message': 'Training metrics not available',
-        'accuracy': '~97%',
-    })
+        'id': session.id,
+        'pid': os.getpid(),
+        'seconds': session.seconds,
+        'hz': session.hz,
+        'result_url': url_for('api_admin_profile_result', profile_id=session.id)
+    }), 202
+
+@app.route('/api/admin/profile/<profile_id>', methods=['GET'])
+@admin_required
+def api_admin_profile_result(profile_id):
+    """Folded stacks (flamegraph.pl / speedscope input) of a finished profile, or its status"""
+    meta, folded = load_profile(profile_id)
+    if meta is None:
+        return jsonify({'error': 'Unknown profile'}), 404
+    if folded is None or request.args.get('format') == 'json':
+        return jsonify(meta), 200 if meta['status'] != 'running' else 202
+    response = Response(folded, mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(meta.get('samples', 0))
+    return response
+
+@app.route('/api/admin/profile', methods=['DELETE'])
+@admin_required
+def api_admin_profile_stop():
+    """Stop this worker's running profile early; its result is still written"""
+    session = ProfileSession.stop_active()
+    if session is None:
+        return jsonify({'error': 'No profile is running in this worker'}), 404
+    return jsonify({'id': session.id, 'stopping': True})
+
+@app.route('/api/admin/memory', methods=['GET'])
+@admin_required
+def api_admin_memory():
+    """Fresh memory sample, including the object-type census, of the worker handling this request"""
+    return jsonify(memory_monitor.sample(type_census=True))
+
+@app.route('/api/admin/memory/leaks', methods=['POST'])
+@admin_required
+def api_admin_leaks_start():
+    """Trace allocations over `rounds` windows of `requests` requests in this worker"""
+    requests_per_round = request.args.get('requests', 100, type=int)
+    rounds = request.args.get('rounds', 3, type=int)
+    if requests_per_round <= 0 or rounds <= 0:
+        return jsonify({'error': 'requests and rounds must be positive'}), 400
+    detector = LeakDetector.start(requests_per_round, rounds)
+    if detector is None:
+        return jsonify({'error': 'A leak check is already running in this worker'}), 409
+    return jsonify({
+        'id': detector.id,
+        'pid': os.getpid(),
+        'result_url': url_for('api_admin_leaks_result', report_id=detector.id)
+    }), 202
+
+@app.route('/api/admin/memory/leaks/<report_id>', methods=['GET'])
+@admin_required
+def api_admin_leaks_result(report_id):
+    """Top growing allocation sites of a finished leak check, or its progress"""
+    report = load_leak_report(report_id)
+    if report is None:
+        return jsonify({'error': 'Unknown leak report'}), 404
+    return jsonify(report), 202 if report['status'] == 'running' else 200
+
+# Live camera stream: binary JPEG frames in, smoothed predictions out.
+# gunicorn.conf.py runs the threaded worker with STREAM_MAX_CONNECTIONS threads reserved for streams
+if Sock is not None:
+    sock = Sock(app)
+    stream_slots = threading.BoundedSemaphore(Config.STREAM_MAX_CONNECTIONS)
+
+    @sock.route('/api/stream')
+    def api_stream(ws):
+        """Streaming prediction endpoint for CameraCapture"""
+        # Streams beyond the reserved threads would starve regular requests
+        if not stream_slots.acquire(blocking=False):
+            ws.send(json.dumps({'error': 'Too many live streams, try again later'}))
+            return
+        try:
+            serve_stream(ws, frame_batcher, handler, dict(enumerate(get_class_labels())))
+        finally:
+            stream_slots.release()
 
 # ============================================================================
 # OPTIONAL: Serve React build in production
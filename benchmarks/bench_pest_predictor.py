@@ -0,0 +1,62 @@
+"""
+Pest Predictor Microbenchmark
+Compares per-call cost of PestPredictor.predict_pests against the original per-request merge and sort
+
+Usage: python -m benchmarks.bench_pest_predictor [--number 20000]
+"""
+import argparse
+import timeit
+from pest_predictor.pest_database import DISEASE_PEST_MAPPING, get_pest_info
+from pest_predictor.predictor import PestPredictor
+
+
+def legacy_predict_pests(disease_name, disease_confidence=1.0):
+    """The copy -> merge PEST_DETAILS -> sort implementation used before the precompiled index"""
+    if disease_name not in DISEASE_PEST_MAPPING:
+        return []
+
+    adjusted_pests = []
+    for pest in DISEASE_PEST_MAPPING[disease_name]:
+        adjusted_pest = pest.copy()
+        adjusted_pest['confidence'] = pest['confidence'] * disease_confidence
+        adjusted_pest.update(get_pest_info(pest['pest_name']))
+        adjusted_pests.append(adjusted_pest)
+
+    adjusted_pests.sort(key=lambda x: x['confidence'], reverse=True)
+    return adjusted_pests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pest prediction")
+    parser.add_argument('--number', type=int, default=20000, help="Calls per measurement")
+    parser.add_argument('--repeat', type=int, default=5, help="Measurements per case (best is reported)")
+    args = parser.parse_args()
+
+    predictor = PestPredictor()
+    diseases = list(DISEASE_PEST_MAPPING)
+
+    # The index must produce exactly what the original implementation produced
+    for disease in diseases:
+        for confidence in (1.0, 0.73, 0.0):
+            assert predictor.predict_pests(disease, confidence) == legacy_predict_pests(disease, confidence), disease
+
+    def run_legacy():
+        for disease in diseases:
+            legacy_predict_pests(disease, 0.87)
+
+    def run_indexed():
+        for disease in diseases:
+            predictor.predict_pests(disease, 0.87)
+
+    calls = args.number * len(diseases)
+    legacy = min(timeit.repeat(run_legacy, number=args.number, repeat=args.repeat)) / calls * 1e6
+    indexed = min(timeit.repeat(run_indexed, number=args.number, repeat=args.repeat)) / calls * 1e6
+
+    print(f"{'Implementation':<28}{'us/call':>10}")
+    print(f"{'copy + merge + sort':<28}{legacy:>10.3f}")
+    print(f"{'precompiled index':<28}{indexed:>10.3f}")
+    print(f"Speedup: {legacy / indexed:.2f}x over {len(diseases)} diseases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Performance Regression Gate
+Runs a fixed micro/macro benchmark set and compares it with a stored baseline
+
+Usage: python -m benchmarks.perf_gate [--update-baseline] [--only preprocess,forward_pass]
+The first run on a machine records the baseline; later runs exit 1 on a regression
+or when a benchmark fails.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+from config import Config
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_baseline.json')
+
+# Scale factor that makes the median absolute deviation comparable to a standard deviation
+MAD_SCALE = 1.4826
+
+
+class BenchmarkUnavailable(Exception):
+    """A benchmark cannot run here (missing model file or optional dependency)"""
+
+
+def _synthetic_jpeg(side=1024):
+    from benchmarks.bench_tiling import make_image
+    path = os.path.join(tempfile.mkdtemp(prefix='perf_gate_'), f'leaf_{side}.jpg')
+    make_image(path, side)
+    return path
+
+
+def _load_serving_model(model_path):
+    from tensorflow.keras.models import load_model
+    try:
+        return load_model(model_path, compile=False)
+    except (OSError, ValueError) as e:
+        raise BenchmarkUnavailable(f"cannot load {model_path}: {e}")
+
+
+def _dataset_handler():
+    try:
+        from disease_classifier.dataset_handler import DatasetHandler
+    except ImportError as e:
+        raise BenchmarkUnavailable(str(e))
+    return DatasetHandler()
+
+
+def setup_preprocess(args):
+    handler = _dataset_handler()
+    path = _synthetic_jpeg()
+    return lambda: handler.preprocess_image(path)
+
+
+def setup_forward_pass(args):
+    model = _load_serving_model(args.model)
+    batch = np.random.default_rng(0).random((1,) + tuple(model.input_shape[1:]), dtype=np.float32)
+    return lambda: model.predict(batch, verbose=0)
+
+
+def setup_pest_remedy_assembly(args):
+    from knowledge_base.labels import to_knowledge_base_name, to_display_label
+    from pest_predictor.predictor import PestPredictor
+    from remedy_engine.engine import RemedyEngine
+    pest_predictor, remedy_engine = PestPredictor(), RemedyEngine()
+    class_labels = sorted(Config.DISEASE_CLASSES)
+    probs = np.random.default_rng(0).dirichlet(np.ones(len(class_labels)))
+
+    def assemble():
+        # Mirrors the pests and remedy stages of /api/diagnose
+        order = np.argsort(-probs)
+        disease_predictions = [{
+            'disease': to_knowledge_base_name(class_labels[i]),
+            'label': to_display_label(class_labels[i]),
+            'confidence': round(float(probs[i]), 4)
+        } for i in order]
+        pests = pest_predictor.predict_from_probabilities(probs, class_labels=class_labels,
+                                                          top_k=Config.DIAGNOSE_TOP_PESTS)
+        pest_predictor.get_pest_management_priority(pests)
+        return remedy_engine.get_integrated_management_plan(disease_predictions, pests)
+    return assemble
+
+
+def _isolate_app():
+    """
+    Settings read by app_with_api at import: keep its files in a temp directory and
+    its background threads (upload GC, memory sampler, reload polling, slow log) off,
+    so they neither compete with the timed rounds nor leave files in the checkout
+    """
+    workdir = tempfile.mkdtemp(prefix='perf_gate_app_')
+    Config.UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+    Config.SLOW_LOG_DIR = os.path.join(workdir, 'slow_requests')
+    Config.EXPLANATION_DIR = os.path.join(workdir, 'explanations')
+    Config.PROFILE_DIR = os.path.join(workdir, 'profiles')
+    Config.METRICS_MULTIPROC_DIR = ''
+    Config.UPLOAD_GC_INTERVAL = 0
+    Config.MEMORY_SAMPLE_INTERVAL = 0
+    Config.KNOWLEDGE_RELOAD_INTERVAL = 0
+    Config.SLOW_LOG_THRESHOLD_MS = 0
+
+
+def _route(path):
+    def setup(args):
+        Config.SERVING_MODEL_PATH = args.model  # read by app_with_api at import
+        if 'app_with_api' not in sys.modules:
+            _isolate_app()
+        try:
+            import app_with_api
+        except (ImportError, OSError, ValueError) as e:
+            raise BenchmarkUnavailable(f"cannot import app_with_api: {e}")
+        # Pin the labels the pest/remedy benchmark uses, so the routes never scan (or need) dataset/train
+        labels = tuple(sorted(Config.DISEASE_CLASSES))
+        if app_with_api.model.output_shape[-1] != len(labels):
+            raise BenchmarkUnavailable(f"{args.model} has {app_with_api.model.output_shape[-1]} outputs, "
+                                       f"expected {len(labels)} classes")
+        app_with_api.get_class_labels = lambda: labels
+        client = app_with_api.app.test_client()
+        with open(_synthetic_jpeg(), 'rb') as f:
+            image = f.read()
+
+        def post():
+            response = client.post(path, data={'file': (io.BytesIO(image), 'leaf.jpg')})
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return post
+    return setup
+
+
+# name -> (kind, setup, calls per round)
+BENCHMARKS = {
+    'preprocess': ('micro', setup_preprocess, 20),
+    'forward_pass': ('micro', setup_forward_pass, 10),
+    'pest_remedy_assembly': ('micro', setup_pest_remedy_assembly, 2000),
+    'route_predict': ('macro', _route('/api/predict'), 5),
+    'route_diagnose': ('macro', _route('/api/diagnose'), 5),
+}
+
+
+def run_benchmark(fn, number, rounds, warmup=2):
+    """
+    Median and MAD of the per-call time over `rounds` rounds of `number` calls
+
+    Returns:
+        dict: median_s, mad_s, rounds, number
+    """
+    for _ in range(warmup):
+        fn()
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+    median = statistics.median(per_call)
+    mad = statistics.median(abs(value - median) for value in per_call)
+    return {'median_s': median, 'mad_s': mad, 'rounds': rounds, 'number': number}
+
+
+def compare(current, baseline, tolerance, mad_factor):
+    """
+    Noise-aware verdict: the allowed slowdown is a relative tolerance plus mad_factor
+    robust standard deviations of whichever run was noisier
+
+    Returns:
+        tuple: (status, allowed median seconds)
+    """
+    tolerance = baseline.get('tolerance', tolerance)
+    noise = mad_factor * MAD_SCALE * max(baseline['mad_s'], current['mad_s'])
+    allowed = baseline['median_s'] * (1 + tolerance) + noise
+    if current['median_s'] > allowed:
+        return 'REGRESSED', allowed
+    if current['median_s'] < baseline['median_s'] * (1 - tolerance) - noise:
+        return 'improved', allowed
+    return 'ok', allowed
+
+
+def host_info():
+    return {'machine': platform.machine(), 'processor': platform.processor(),
+            'cpus': os.cpu_count(), 'python': platform.python_version()}
+
+
+def _format_time(seconds):
+    if seconds >= 1:
+        return f'{seconds:.2f} s'
+    if seconds >= 1e-3:
+        return f'{seconds * 1e3:.2f} ms'
+    return f'{seconds * 1e6:.1f} us'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fail when benchmarks regress against the stored baseline")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Record the current results as the new baseline")
+    parser.add_argument('--only', default=None, help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--rounds', type=int, default=7, help="Timed rounds per benchmark")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Allowed relative slowdown before noise (per-benchmark 'tolerance' in the baseline wins)")
+    parser.add_argument('--mad-factor', type=float, default=3.0,
+                        help="Extra allowance in robust standard deviations of run-to-run noise")
+    parser.add_argument('--model', default=Config.SERVING_MODEL_PATH)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmarks: {', '.join(unknown)}")
+        return False
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print("=" * 60)
+    print("Cotton Disease Performance Gate")
+    print("=" * 60)
+    if baseline is not None and baseline.get('host') != host_info():
+        print(f"⚠️  Baseline was recorded on a different host: {baseline.get('host')}")
+
+    results, skipped, failed = {}, {}, {}
+    for name in names:
+        kind, setup, number = BENCHMARKS[name]
+        try:
+            fn = setup(args)
+            results[name] = run_benchmark(fn, number, args.rounds)
+        except BenchmarkUnavailable as e:
+            skipped[name] = str(e)
+            print(f"  {name:<24} skipped: {e}")
+            continue
+        except Exception as e:
+            # One broken benchmark must not discard the others' results
+            failed[name] = f"{type(e).__name__}: {e}"
+            print(f"  {name:<24} FAILED: {failed[name]}")
+            continue
+        results[name]['kind'] = kind
+        print(f"  {name:<24} {_format_time(results[name]['median_s']):>10} "
+              f"± {_format_time(results[name]['mad_s'] * MAD_SCALE)}")
+
+    if baseline is None:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                stored = json.load(f).get('benchmarks', {})
+        stored.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'host': host_info(), 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'benchmarks': stored}, f, indent=2, sort_keys=True)
+        print("-" * 60)
+        print(f"✅ Baseline for {len(results)} benchmarks written to {args.baseline}")
+        if failed:
+            print(f"❌ {len(failed)} benchmark(s) failed and were not recorded: {', '.join(failed)}")
+            return False
+        return True
+
+    print("-" * 60)
+    print(f"{'Benchmark':<24}{'Baseline':>11}{'Current':>11}{'Change':>9}{'Allowed':>11}  Status")
+    regressions = []
+    for name in names:
+        current, base = results.get(name), baseline['benchmarks'].get(name)
+        if name in failed:
+            print(f"{name:<24}{_format_time(base['median_s']) if base else '-':>11}{'':>11}{'':>9}{'':>11}  "
+                  f"FAILED ({failed[name]})")
+            continue
+        if current is None:
+            print(f"{name:<24}{'':>11}{'':>11}{'':>9}{'':>11}  skipped ({skipped[name]})")
+            continue
+        if base is None:
+            print(f"{name:<24}{'-':>11}{_format_time(current['median_s']):>11}{'':>9}{'':>11}  "
+                  f"new (record with --update-baseline)")
+            continue
+        status, allowed = compare(current, base, args.tolerance, args.mad_factor)
+        change = current['median_s'] / base['median_s'] - 1
+        print(f"{name:<24}{_format_time(base['median_s']):>11}{_format_time(current['median_s']):>11}"
+              f"{change:>+9.1%}{_format_time(allowed):>11}  {status}")
+        if status == 'REGRESSED':
+            regressions.append(name)
+
+    print("-" * 60)
+    if failed:
+        print(f"❌ {len(failed)} benchmark(s) failed: {', '.join(failed)}")
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) regressed beyond tolerance: {', '.join(regressions)}")
+    if failed or regressions:
+        return False
+    print("✅ No regressions")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
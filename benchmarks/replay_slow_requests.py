@@ -0,0 +1,97 @@
+"""
+Slow Request Replay
+Re-runs inputs captured by the slow-request log and compares stage timings with the logged ones
+
+Usage: python -m benchmarks.replay_slow_requests [--log-dir logs/slow_requests] [--repeat 3]
+       [--url http://127.0.0.1:5000/api/predict]
+"""
+import argparse
+import os
+import time
+import numpy as np
+from serving.slow_log import read_entries
+from config import Config
+
+
+def unique_inputs(entries, log_dir):
+    """Latest entry per stored input (by content hash), skipping entries without a stored file"""
+    latest = {}
+    for entry in entries:
+        stored = entry.get('input', {}).get('stored_as')
+        if stored and os.path.exists(os.path.join(log_dir, stored)):
+            latest[entry['input']['sha256']] = entry
+    return list(latest.values())
+
+
+def replay_local(path, handler, model, repeat):
+    """Median preprocess and predict milliseconds of one input"""
+    preprocess, predict = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        img = handler.preprocess_image(path)
+        preprocess.append(time.perf_counter() - start)
+        if img is None:
+            return None
+        start = time.perf_counter()
+        model.predict(img, verbose=0)
+        predict.append(time.perf_counter() - start)
+    return {'preprocess': np.median(preprocess) * 1000, 'predict': np.median(predict) * 1000}
+
+
+def replay_http(path, url, repeat):
+    """Median stage milliseconds reported by a running server's Server-Timing header"""
+    import requests
+    timings = {}
+    for _ in range(repeat):
+        with open(path, 'rb') as f:
+            response = requests.post(url, files={'file': (os.path.basename(path), f)}, timeout=120)
+        for part in response.headers.get('Server-Timing', '').split(','):
+            name, _, duration = part.strip().partition(';dur=')
+            if duration:
+                timings.setdefault(name, []).append(float(duration))
+    return {name: float(np.median(values)) for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay inputs from the slow-request log")
+    parser.add_argument('--log-dir', default=Config.SLOW_LOG_DIR)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per input; the median is reported")
+    parser.add_argument('--limit', type=int, default=20, help="Replay at most this many (slowest first)")
+    parser.add_argument('--model', default=Config.SERVING_MODEL_PATH)
+    parser.add_argument('--url', help="POST to a running /api/predict instead of loading the model")
+    args = parser.parse_args()
+
+    entries = unique_inputs(read_entries(args.log_dir), args.log_dir)
+    if not entries:
+        print(f"No replayable entries in {args.log_dir} (is SLOW_LOG_KEEP_INPUTS enabled?)")
+        return
+    entries.sort(key=lambda entry: entry['total_ms'], reverse=True)
+    entries = entries[:args.limit]
+
+    if args.url is None:
+        from tensorflow.keras.models import load_model
+        from disease_classifier.dataset_handler import DatasetHandler
+        model = load_model(args.model, compile=False)
+        handler = DatasetHandler()
+
+    print(f"Replaying {len(entries)} inputs, {args.repeat} runs each")
+    print(f"{'Input':<14}{'Format':>8}{'Mode':>6}{'Size':>12}{'KB':>9}"
+          f"{'Logged ms':>11}{'Pre ms':>9}{'Pred ms':>9}")
+    for entry in entries:
+        image = entry['input']
+        path = os.path.join(args.log_dir, image['stored_as'])
+        if args.url is None:
+            replayed = replay_local(path, handler, model, args.repeat)
+        else:
+            replayed = replay_http(path, args.url, args.repeat)
+        size = f"{image.get('width')}x{image.get('height')}"
+        row = (f"{image['sha256'][:12]:<14}{str(image.get('format')):>8}{str(image.get('mode')):>6}"
+               f"{size:>12}{image['bytes'] / 1024:>9.0f}{entry['total_ms']:>11.1f}")
+        if not replayed:
+            print(f"{row}  failed to process")
+            continue
+        print(f"{row}{replayed.get('preprocess', float('nan')):>9.1f}{replayed.get('predict', float('nan')):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Bulk Scoring Script
+Scores a directory or archive of field-survey images offline and writes results to CSV or Parquet
+"""
+import argparse
+import sys
+from config import Config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score a large image directory or archive")
+    parser.add_argument('source', help="Image directory, .zip or .tar(.gz) archive")
+    parser.add_argument('output', help="Output .csv file, or a .parquet directory (needs pyarrow)")
+    parser.add_argument('--model', default=Config.SERVING_MODEL_PATH, help="Model to score with")
+    parser.add_argument('--batch-size', type=int, default=Config.INFERENCE_BATCH_SIZE, help="Inference batch size")
+    parser.add_argument('--workers', type=int, default=None, help="Decode worker processes")
+    parser.add_argument('--pests', type=int, default=0,
+                        help="Attach the top N predicted pests to every row")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Checkpoint file (default: <output>.checkpoint.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Import TensorFlow only after argument parsing so --help stays fast
+    from tensorflow.keras.models import load_model
+    from disease_classifier.dataset_handler import DatasetHandler
+    from disease_classifier.bulk_scorer import BulkScorer
+
+    print("=" * 60)
+    print("Cotton Disease Bulk Scoring")
+    print("=" * 60)
+
+    _, index_to_class = DatasetHandler().get_class_mapping()
+    if index_to_class:
+        class_names = [index_to_class[i] for i in sorted(index_to_class)]
+    else:
+        class_names = sorted(Config.DISEASE_CLASSES)
+
+    model = load_model(args.model)
+    scorer = BulkScorer(model, class_names, batch_size=args.batch_size, workers=args.workers,
+                        pest_top_k=args.pests)
+
+    print(f"Source:  {args.source}")
+    print(f"Output:  {args.output}")
+    print(f"Workers: {scorer.workers} decode processes, batch size {scorer.batch_size}")
+    print("-" * 60)
+
+    try:
+        summary = scorer.run(args.source, args.output, args.checkpoint)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted - run the same command again to resume from the checkpoint")
+        return False
+    except Exception as e:
+        print(f"❌ Bulk scoring failed: {e}")
+        return False
+
+    print("-" * 60)
+    print(f"✅ Scored {summary['processed']} images ({summary['failed']} failed to decode)")
+    print(f"This run: {summary['scored_this_run']} images in {summary['seconds']}s "
+          f"({summary['images_per_sec']} images/s)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
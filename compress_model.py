@@ -0,0 +1,96 @@
+"""
+Model Compression Script
+Prunes and clusters the trained DenseNet121 and writes a smaller serving artifact into model/
+"""
+import argparse
+import json
+import os
+import sys
+from tensorflow.keras.models import load_model
+from disease_classifier.dataset_handler import DatasetHandler
+from disease_classifier.compression import ModelCompressor, evaluate_accuracy, format_report
+from config import Config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compress the cotton disease model")
+    parser.add_argument('--model', default=Config.SERVING_MODEL_PATH,
+                        help="Source model to compress")
+    parser.add_argument('--output', default=Config.COMPRESSED_MODEL_PATH,
+                        help="Where to save the selected compressed model")
+    parser.add_argument('--sparsities', default="0,0.25,0.5,0.75",
+                        help="Comma-separated channel sparsity levels to sweep")
+    parser.add_argument('--clusters', type=int, default=16,
+                        help="Weight clusters per kernel (0 disables clustering)")
+    parser.add_argument('--prune-epochs', type=int, default=2,
+                        help="Fine-tuning epochs after pruning")
+    parser.add_argument('--cluster-epochs', type=int, default=1,
+                        help="Fine-tuning epochs while clustering")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help="Largest accepted test accuracy drop versus the uncompressed model")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Cotton Disease Model Compression")
+    print("=" * 60)
+
+    dataset_handler = DatasetHandler()
+    if not dataset_handler.validate_dataset():
+        print("❌ Dataset not found or invalid!")
+        print("Please run 'python download_dataset.py' first to download the dataset.")
+        return False
+
+    train_gen, val_gen, test_gen = dataset_handler.create_data_generators()
+    if not all([train_gen, val_gen, test_gen]):
+        print("❌ Failed to create data generators!")
+        return False
+
+    sparsities = [float(value) for value in args.sparsities.split(',')]
+
+    print("\nEvaluating uncompressed model...")
+    baseline_accuracy = evaluate_accuracy(load_model(args.model, compile=False), test_gen)
+    print(f"Baseline test accuracy: {baseline_accuracy * 100:.2f}%")
+
+    compressor = ModelCompressor(args.model)
+    rows, models = compressor.sweep(
+        sparsities, train_gen, val_gen, test_gen,
+        number_of_clusters=args.clusters,
+        prune_epochs=args.prune_epochs,
+        cluster_epochs=args.cluster_epochs
+    )
+
+    report = format_report(rows)
+    print("\n" + report)
+
+    # Pick the sparsest model that stays within the accuracy budget
+    accepted = [row for row in rows if baseline_accuracy - row['accuracy'] <= args.max_accuracy_drop]
+    if not accepted:
+        print(f"❌ No compressed model stayed within {args.max_accuracy_drop:.1%} of the baseline accuracy")
+        return False
+    selected = max(accepted, key=lambda row: row['sparsity'])
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    models[selected['sparsity']].save(args.output, include_optimizer=False)
+
+    with open(Config.COMPRESSION_REPORT_PATH, 'w', encoding='utf-8') as f:
+        f.write(f"# Compression report for {args.model}\n\n")
+        f.write(f"Uncompressed test accuracy: {baseline_accuracy * 100:.2f}%\n\n")
+        f.write(report + "\n\n")
+        f.write(f"Selected sparsity: {selected['sparsity']:.0%} -> {args.output}\n")
+    with open(os.path.splitext(Config.COMPRESSION_REPORT_PATH)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'source': args.model, 'output': args.output, 'baseline_accuracy': baseline_accuracy, 'rows': rows,
+                   'selected_sparsity': selected['sparsity']}, f, indent=2)
+
+    print(f"\n✅ Compressed model saved to: {args.output}")
+    print(f"✅ Report written to: {Config.COMPRESSION_REPORT_PATH}")
+    print(f"To serve it, set SERVING_MODEL_PATH={args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
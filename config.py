@@ -1,9 +1,29 @@
+import json
 import os
+import tempfile
+
+TUNING_PATH = os.getenv("TUNING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tuning.json"))
+
+
+def _load_tuning(path):
+    """Recommended settings written by tune_capacity.py for this host, if any"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('recommended', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+_TUNING = _load_tuning(TUNING_PATH)
 
 class Config:
     # Model paths
     ENHANCED_MODEL_PATH = os.getenv("ENHANCED_MODEL_PATH", "model/enhanced_cotton_disease_model.h5")
     FALLBACK_MODEL_PATH = os.getenv("FALLBACK_MODEL_PATH", "model/DenseNet121.h5")
+    SERVING_MODEL_PATH = os.getenv("SERVING_MODEL_PATH", "model/enhanced_model.h5")
+    COMPRESSED_MODEL_PATH = os.getenv("COMPRESSED_MODEL_PATH", "model/compressed_model.h5")
+    METRICS_PATH = os.getenv("METRICS_PATH", "model/metrics.json")
+    COMPRESSION_REPORT_PATH = os.getenv("COMPRESSION_REPORT_PATH", "model/compression_report.md")
     
     # Dataset configuration
     KAGGLE_DATASET = os.getenv("KAGGLE_DATASET", "paridhijain02122001/cotton-crop-disease-detection")
@@ -16,11 +36,110 @@ class Config:
     # Prediction settings
     CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.5))
     MAX_PREDICTION_TIME = int(os.getenv("MAX_PREDICTION_TIME", 10))
+
+    # Test-time augmentation ('off', 'auto' below the threshold, or 'always')
+    TTA_MODE = os.getenv("TTA_MODE", "off")
+    TTA_VIEWS = int(os.getenv("TTA_VIEWS", 8))
+    TTA_CONFIDENCE_THRESHOLD = float(os.getenv("TTA_CONFIDENCE_THRESHOLD", 0.8))
+
+    # Class activation map explanations (?explain=1), shared by every worker through files
+    EXPLANATION_DIR = os.getenv("EXPLANATION_DIR", os.path.join(tempfile.gettempdir(), "cottonaid-explanations"))
+    EXPLANATION_MAX_ENTRIES = int(os.getenv("EXPLANATION_MAX_ENTRIES", 256))
+
+    # Live camera streaming over WebSocket (/api/stream)
+    STREAM_EMIT_HZ = float(os.getenv("STREAM_EMIT_HZ", 4))
+    STREAM_MAX_BATCH = int(os.getenv("STREAM_MAX_BATCH", 16))
+    STREAM_MAX_FRAME_AGE = float(os.getenv("STREAM_MAX_FRAME_AGE", 1.0))
+    STREAM_SIMILARITY_THRESHOLD = float(os.getenv("STREAM_SIMILARITY_THRESHOLD", 2.0))
+    STREAM_SMOOTHING = float(os.getenv("STREAM_SMOOTHING", 0.6))
+    # Each stream holds a gunicorn thread while connected; these are added on top of GUNICORN_THREADS
+    STREAM_MAX_CONNECTIONS = int(os.getenv("STREAM_MAX_CONNECTIONS", 4))
+
+    # Tiled analysis of large drone/field images (/api/analyze/tiled)
+    TILE_OVERLAP = float(os.getenv("TILE_OVERLAP", 0.25))
+    # Larger inputs are rejected; without rasterio the whole image is decoded, so the lower limit applies
+    TILE_MAX_MEGAPIXELS = float(os.getenv("TILE_MAX_MEGAPIXELS", 1000))
+    TILE_MAX_DECODED_MEGAPIXELS = float(os.getenv("TILE_MAX_DECODED_MEGAPIXELS", 80))
+    # GDAL's block cache otherwise grows to 5% of RAM and ends up holding most of a large image
+    TILE_GDAL_CACHE_MB = int(os.getenv("TILE_GDAL_CACHE_MB", 64))
+
+    # Knowledge-base endpoints (/api/remedy, /api/pests, /api/disease-info)
+    KNOWLEDGE_CACHE_MAX_AGE = int(os.getenv("KNOWLEDGE_CACHE_MAX_AGE", 3600))
+
+    # Unified diagnosis (/api/diagnose)
+    DIAGNOSE_TOP_PESTS = int(os.getenv("DIAGNOSE_TOP_PESTS", 5))
+
+    # Knowledge store (treatments and pests, built from the JSON sources into SQLite)
+    KNOWLEDGE_SOURCE_DIR = os.getenv("KNOWLEDGE_SOURCE_DIR", "data/knowledge")
+    KNOWLEDGE_DB_PATH = os.getenv("KNOWLEDGE_DB_PATH", "data/knowledge.db")
+    KNOWLEDGE_CACHE_SIZE = int(os.getenv("KNOWLEDGE_CACHE_SIZE", 256))
+
+    # disease_info.json is re-read when it changes (polling interval in seconds; 0 = signal only)
+    DISEASE_INFO_PATH = os.getenv("DISEASE_INFO_PATH", "data/disease_info.json")
+    KNOWLEDGE_RELOAD_INTERVAL = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", 5.0))
+    KNOWLEDGE_RELOAD_SIGNAL = os.getenv("KNOWLEDGE_RELOAD_SIGNAL", "SIGHUP")
+
+    # Weather risk engine: a CSV of daily plot weather; empty disables weather risk.
+    # 'stub' serves synthetic weather for development only (responses are marked synthetic)
+    WEATHER_SOURCE = os.getenv("WEATHER_SOURCE", "")
+    WEATHER_WINDOW_DAYS = int(os.getenv("WEATHER_WINDOW_DAYS", 14))
+    WEATHER_HALF_LIFE_DAYS = float(os.getenv("WEATHER_HALF_LIFE_DAYS", 5.0))
+    WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", 256))
+
+    # Telemetry (/metrics); set METRICS_MULTIPROC_DIR to merge metrics across gunicorn workers
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 10.0))
+    
+    # Admin endpoints (profiling, diagnostics) are disabled unless ADMIN_TOKEN is set
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    
+    # On-demand sampling profiler
+    PROFILER_DEFAULT_HZ = int(os.getenv("PROFILER_DEFAULT_HZ", 100))
+    PROFILER_MAX_HZ = int(os.getenv("PROFILER_MAX_HZ", 1000))
+    PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", 60))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "cottonaid-profiles"))
+    
+    # Per-worker memory monitoring; MEMORY_RECYCLE_RSS_MB > 0 restarts a gunicorn worker above it
+    MEMORY_SAMPLE_INTERVAL = float(os.getenv("MEMORY_SAMPLE_INTERVAL", 60.0))
+    MEMORY_TOP_TYPES = int(os.getenv("MEMORY_TOP_TYPES", 20))
+    # The object-type census walks the whole heap (hundreds of ms); 0 runs it only for /api/admin/memory
+    MEMORY_TYPE_CENSUS_INTERVAL = float(os.getenv("MEMORY_TYPE_CENSUS_INTERVAL", 0))
+    MEMORY_RECYCLE_RSS_MB = float(os.getenv("MEMORY_RECYCLE_RSS_MB", 0))
+    MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", 10))
+    MEMORY_LEAK_TOP = int(os.getenv("MEMORY_LEAK_TOP", 10))
+    
+    # Slow-request log for /api/predict (SLOW_LOG_THRESHOLD_MS = 0 disables it)
+    SLOW_LOG_THRESHOLD_MS = float(os.getenv("SLOW_LOG_THRESHOLD_MS", 2000))
+    SLOW_LOG_DIR = os.getenv("SLOW_LOG_DIR", "logs/slow_requests")
+    SLOW_LOG_MAX_BYTES = int(os.getenv("SLOW_LOG_MAX_BYTES", 5 * 1024 * 1024))
+    SLOW_LOG_BACKUPS = int(os.getenv("SLOW_LOG_BACKUPS", 5))
+    SLOW_LOG_KEEP_INPUTS = os.getenv("SLOW_LOG_KEEP_INPUTS", "true").lower() in ("1", "true", "yes")
+    SLOW_LOG_MAX_INPUTS = int(os.getenv("SLOW_LOG_MAX_INPUTS", 200))
+    
+    # Serving capacity: environment variables win, then tuning.json (tune_capacity.py), then defaults.
+    # 0 threads keeps TensorFlow's default of one pool thread per core.
+    TUNING_PATH = TUNING_PATH
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", _TUNING.get("workers", 1)))
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", _TUNING.get("threads", 1)))
+    TF_INTRA_OP_THREADS = int(os.getenv("TF_INTRA_OP_THREADS", _TUNING.get("intra_op_threads", 0)))
+    TF_INTER_OP_THREADS = int(os.getenv("TF_INTER_OP_THREADS", _TUNING.get("inter_op_threads", 0)))
+    INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", _TUNING.get("batch_size", BATCH_SIZE)))
     
     # Upload settings
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads")
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
     MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+    # Content-addressed upload store: retention age, total size cap (0 disables either) and GC period
+    UPLOAD_MAX_AGE_HOURS = float(os.getenv("UPLOAD_MAX_AGE_HOURS", 168))
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 1024 * 1024 * 1024))
+    UPLOAD_GC_INTERVAL = float(os.getenv("UPLOAD_GC_INTERVAL", 600))
+    UPLOAD_WRITERS = int(os.getenv("UPLOAD_WRITERS", 2))
+    # Thumbnails and previews of uploads (longest side in pixels; webp falls back to jpeg)
+    DERIVATIVE_THUMB_SIZE = int(os.getenv("DERIVATIVE_THUMB_SIZE", 160))
+    DERIVATIVE_PREVIEW_SIZE = int(os.getenv("DERIVATIVE_PREVIEW_SIZE", 640))
+    DERIVATIVE_FORMAT = os.getenv("DERIVATIVE_FORMAT", "webp")
+    DERIVATIVE_QUALITY = int(os.getenv("DERIVATIVE_QUALITY", 75))
+    DERIVATIVE_WORKERS = int(os.getenv("DERIVATIVE_WORKERS", 2))
     
     # Disease classes (static list)
     DISEASE_CLASSES = [
@@ -0,0 +1,343 @@
+"""
+Bulk Scorer for Cotton Disease Detection
+Streams large image directories or archives through multi-process decoding and batched inference
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from config import Config
+
+IMAGE_EXTENSIONS = tuple('.' + ext for ext in Config.ALLOWED_EXTENSIONS)
+
+# Per-process state for decode workers
+_worker_handler = None
+_worker_archives = {}
+
+
+def _is_image(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def iter_source(source):
+    """
+    Enumerate images in a directory, .zip or .tar(.gz) archive in a stable order
+
+    Yields:
+        tuple: (key, payload) where payload is something a decode worker can open
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if _is_image(name):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), ('file', path)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(name for name in archive.namelist() if _is_image(name))
+        for name in names:
+            yield name, ('zip', source, name)
+    elif tarfile.is_tarfile(source):
+        # Tar archives can only be read sequentially, so member bytes are shipped to the workers
+        with tarfile.open(source, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and _is_image(member.name):
+                    yield member.name, ('bytes', archive.extractfile(member).read())
+    else:
+        raise ValueError(f"Unsupported source: {source}")
+
+
+def _init_worker():
+    global _worker_handler
+    from disease_classifier.dataset_handler import DatasetHandler
+    _worker_handler = DatasetHandler()
+
+
+def _open_payload(payload):
+    kind = payload[0]
+    if kind == 'file':
+        return payload[1]
+    if kind == 'zip':
+        archive = _worker_archives.get(payload[1])
+        if archive is None:
+            archive = _worker_archives[payload[1]] = zipfile.ZipFile(payload[1])
+        return io.BytesIO(archive.read(payload[2]))
+    return io.BytesIO(payload[1])
+
+
+def _decode_chunk(chunk):
+    """Decode a chunk of (key, payload) items with DatasetHandler.preprocess_image"""
+    decoded = []
+    for key, payload in chunk:
+        try:
+            image = _worker_handler.preprocess_image(_open_payload(payload))
+            decoded.append((key, None if image is None else image[0], None if image is not None else 'decode failed'))
+        except Exception as e:
+            decoded.append((key, None, str(e)))
+    return decoded
+
+
+def _chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _truncate_to_last_line(f, block_size=65536):
+    """Cut a binary file back to the end of its last complete line"""
+    end = f.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(position - block_size, 0)
+        f.seek(start)
+        newline = f.read(position - start).rfind(b'\n')
+        if newline != -1:
+            if start + newline + 1 != end:
+                f.truncate(start + newline + 1)
+            return
+        position = start
+    f.truncate(0)
+
+
+class ResultWriter:
+    """Incremental CSV or Parquet writer that can be rolled back to a checkpoint"""
+
+    def __init__(self, output_path, class_names, resume_state=None, rows_per_part=10000, with_pests=False):
+        self.output_path = output_path
+        self.class_names = class_names
+        self.columnar = output_path.endswith('.parquet')
+        self.columns = (['image', 'label', 'confidence'] + [f'prob_{name}' for name in class_names]
+                        + (['top_pests'] if with_pests else []) + ['error'])
+        self.rows_per_part = rows_per_part
+
+        if self.columnar:
+            import pyarrow  # noqa: F401 - fail early when the optional dependency is missing
+            # Parquet output is a directory of complete part files; a part is only
+            # written once it is full, so a crash never leaves a truncated file behind
+            os.makedirs(output_path, exist_ok=True)
+            self._buffer = []
+            self._part = len([name for name in os.listdir(output_path) if name.endswith('.parquet')])
+        else:
+            offset = (resume_state or {}).get('output_bytes')
+            if offset is not None and os.path.exists(output_path):
+                # Drop any rows written after the last checkpoint, including a torn last row
+                with open(output_path, 'r+b') as f:
+                    f.truncate(offset)
+                    _truncate_to_last_line(f)
+                self._file = open(output_path, 'a', newline='', encoding='utf-8')
+            else:
+                self._file = open(output_path, 'w', newline='', encoding='utf-8')
+                csv.writer(self._file).writerow(self.columns)
+            self._csv = csv.writer(self._file)
+
+    def write(self, rows):
+        if self.columnar:
+            self._buffer.extend(rows)
+        else:
+            self._csv.writerows(rows)
+
+    def _write_part(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist([dict(zip(self.columns, row)) for row in self._buffer])
+        part_path = os.path.join(self.output_path, f'part-{self._part:05d}.parquet')
+        pq.write_table(table, part_path + '.tmp')
+        os.replace(part_path + '.tmp', part_path)
+        self._part += 1
+        self._buffer = []
+
+    def flush(self, force=False):
+        """
+        Make written rows durable
+
+        Returns:
+            bool: True when every row written so far is on disk and can be checkpointed
+        """
+        if self.columnar:
+            if self._buffer and (force or len(self._buffer) >= self.rows_per_part):
+                self._write_part()
+            return not self._buffer
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return True
+
+    def offset(self):
+        """Byte offset of the CSV output, used to truncate rows written after a checkpoint"""
+        return None if self.columnar else self._file.tell()
+
+    def close(self):
+        if not self.columnar:
+            self._file.close()
+
+
+class BulkScorer:
+    def __init__(self, model, class_names, batch_size=None, workers=None, chunk_size=32, pest_top_k=0):
+        self.model = model
+        self.class_names = list(class_names)
+        self.batch_size = batch_size or Config.INFERENCE_BATCH_SIZE
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.chunk_size = chunk_size
+        self.pest_top_k = pest_top_k
+        self.pest_predictor = None
+        if pest_top_k:
+            from pest_predictor.predictor import PestPredictor
+            self.pest_predictor = PestPredictor()
+
+    @staticmethod
+    def load_checkpoint(checkpoint_path):
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    @staticmethod
+    def save_checkpoint(checkpoint_path, state):
+        tmp_path = checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    def _decoded(self, source, skip):
+        """Decode images in worker processes with a bounded number of chunks in flight"""
+        items = iter_source(source)
+        for _ in range(skip):
+            if next(items, None) is None:
+                return
+
+        # A worker that fails to start (e.g. an import error) breaks the executor
+        # instead of being respawned forever as multiprocessing.Pool would do
+        executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_worker)
+        try:
+            pending = deque()
+            max_in_flight = self.workers * 4
+            for chunk in _chunked(items, self.chunk_size):
+                pending.append(executor.submit(_decode_chunk, chunk))
+                if len(pending) >= max_in_flight:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        except BrokenProcessPool as e:
+            raise RuntimeError(f"Decode workers died or failed to start: {e}") from e
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _score_batch(self, batch):
+        rows = []
+        images = [image for _, image, _ in batch if image is not None]
+        probs = self.model.predict(np.stack(images), batch_size=len(images), verbose=0) if images else []
+
+        pests = iter(())
+        if self.pest_predictor is not None and len(probs):
+            # One vectorized call attaches pests to the whole batch
+            pests = iter(self.pest_predictor.predict_from_probabilities(
+                probs, class_labels=self.class_names, top_k=self.pest_top_k
+            ))
+        pest_columns = 1 if self.pest_predictor is not None else 0
+
+        probs = iter(probs)
+        for key, image, error in batch:
+            if image is None:
+                rows.append([key, '', ''] + [''] * (len(self.class_names) + pest_columns) + [error])
+                continue
+            prob = next(probs)
+            index = int(np.argmax(prob))
+            row = ([key, self.class_names[index].replace('_', ' '), round(float(prob[index]) * 100, 2)]
+                   + [round(float(p), 6) for p in prob])
+            if pest_columns:
+                row.append('; '.join(f"{pest['pest_name']} ({pest['confidence'] * 100:.1f}%)" for pest in next(pests)))
+            rows.append(row + [''])
+        return rows
+
+    def run(self, source, output_path, checkpoint_path=None, report_every=10.0):
+        """
+        Score every image in the source, writing results incrementally
+
+        Progress is checkpointed after each batch is flushed, so an interrupted run
+        resumes from the first unscored image when started again with the same arguments.
+
+        Returns:
+            dict: Summary with processed/failed counts and throughput
+        """
+        checkpoint_path = checkpoint_path or output_path + '.checkpoint.json'
+        state = self.load_checkpoint(checkpoint_path)
+        if state and (state.get('source') != os.path.abspath(source) or state.get('output') != output_path):
+            raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different run")
+
+        state = state or {'source': os.path.abspath(source), 'output': output_path, 'processed': 0, 'failed': 0}
+        already_done = state['processed']
+        if already_done:
+            print(f"Resuming after {already_done} already scored images")
+
+        writer = ResultWriter(output_path, self.class_names, state, with_pests=self.pest_predictor is not None)
+        start = last_report = time.perf_counter()
+        scored = 0
+        batch = []
+        # offset: end of the last row counted in `pending`, so an interrupt in the
+        # middle of a write never checkpoints rows that were not counted
+        pending = {'rows': 0, 'failed': 0, 'offset': writer.offset()}
+
+        def commit():
+            state['processed'] += pending['rows']
+            state['failed'] += pending['failed']
+            state['output_bytes'] = pending['offset']
+            state['updated_at'] = time.time()
+            self.save_checkpoint(checkpoint_path, state)
+            pending['rows'] = pending['failed'] = 0
+
+        def flush_batch():
+            nonlocal scored
+            rows = self._score_batch(batch)
+            writer.write(rows)
+            pending['rows'] += len(rows)
+            pending['failed'] += sum(1 for row in rows if row[-1])
+            pending['offset'] = writer.offset()
+            scored += len(rows)
+            batch.clear()
+            if writer.flush():
+                commit()
+
+        try:
+            for item in self._decoded(source, already_done):
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    flush_batch()
+
+                now = time.perf_counter()
+                if now - last_report >= report_every:
+                    print(f"  {state['processed'] + pending['rows']} images scored, "
+                          f"{scored / (now - start):.1f} images/s")
+                    last_report = now
+
+            if batch:
+                flush_batch()
+        finally:
+            # Rows already scored are kept even when the run is interrupted
+            if writer.flush(force=True):
+                commit()
+            writer.close()
+
+        elapsed = time.perf_counter() - start
+        state['completed'] = True
+        self.save_checkpoint(checkpoint_path, state)
+        return {
+            'processed': state['processed'],
+            'failed': state['failed'],
+            'scored_this_run': scored,
+            'seconds': round(elapsed, 2),
+            'images_per_sec': round(scored / elapsed, 2) if elapsed else None
+        }
@@ -0,0 +1,355 @@
+"""
+Model Compression for Cotton Disease Detection
+Structured channel pruning and weight clustering for the trained DenseNet121 classifier
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from tensorflow.keras.models import Model, load_model
+from tensorflow.keras.layers import Conv2D, Dense
+from tensorflow.keras.optimizers import Adam
+from config import Config
+
+try:
+    import tensorflow_model_optimization as tfmot
+except ImportError:  # clustering falls back to a post-hoc numpy k-means
+    tfmot = None
+
+# Layers that keep a per-channel layout between a producer and its consumer,
+# so pruning the producer's output channels only requires slicing them.
+CHANNELWISE_LAYERS = {'BatchNormalization', 'Activation', 'ReLU', 'Dropout', 'ZeroPadding2D'}
+PRODUCER_LAYERS = {'Conv2D': 'filters', 'Dense': 'units'}
+MIN_CHANNELS = 8
+
+
+def _inbound_names(layer_config):
+    """Names of the layers feeding a layer in a functional model config"""
+    names = []
+    for node in layer_config.get('inbound_nodes', []):
+        for inbound in node:
+            names.append(inbound[0])
+    return names
+
+
+def _iter_layers(model):
+    """Yield every leaf layer, descending into nested models"""
+    for layer in model.layers:
+        if isinstance(layer, Model):
+            yield from _iter_layers(layer)
+        else:
+            yield layer
+
+
+def _iter_layer_configs(config):
+    """Yield (layer_configs, layer_config) pairs, descending into nested functional models"""
+    for layer_config in config['layers']:
+        nested = layer_config.get('config', {})
+        if layer_config['class_name'] in ('Functional', 'Model') and 'layers' in nested:
+            yield from _iter_layer_configs(nested)
+        else:
+            yield config['layers'], layer_config
+
+
+def find_prunable_chains(model):
+    """
+    Find producer -> channelwise layers -> consumer chains that can be channel pruned
+
+    In DenseNet121 this matches every bottleneck (``convX_blockY_1_conv`` -> BN -> ReLU ->
+    ``convX_blockY_2_conv``) and any hidden Dense layer in the classification head.
+    Concatenation inputs and the output layer are never pruned.
+
+    Returns:
+        list: Dicts with 'producer', 'followers' and 'consumer' layer names
+    """
+    chains = []
+    graphs = {}
+    for layers, layer_config in _iter_layer_configs(model.get_config()):
+        graphs.setdefault(id(layers), {})[layer_config['name']] = layer_config
+
+    for graph in graphs.values():
+        consumers = {}
+        for name, layer_config in graph.items():
+            for inbound in _inbound_names(layer_config):
+                consumers.setdefault(inbound, []).append(name)
+
+        for name, layer_config in graph.items():
+            if layer_config['class_name'] not in PRODUCER_LAYERS:
+                continue
+
+            followers = []
+            current = name
+            while True:
+                next_layers = consumers.get(current, [])
+                if len(next_layers) != 1:
+                    current = None
+                    break
+                current = next_layers[0]
+                class_name = graph[current]['class_name']
+                if class_name in CHANNELWISE_LAYERS:
+                    followers.append(current)
+                    continue
+                break
+
+            if current is None or graph[current]['class_name'] not in PRODUCER_LAYERS:
+                continue
+            if len(_inbound_names(graph[current])) != 1:
+                continue
+
+            chains.append({'producer': name, 'followers': followers, 'consumer': current})
+
+    return chains
+
+
+def _channel_importance(producer, followers):
+    """Rank output channels by L1 weight norm, scaled by the BN gamma when present"""
+    kernel = producer.get_weights()[0]
+    axes = tuple(range(kernel.ndim - 1))
+    importance = np.abs(kernel).sum(axis=axes)
+
+    for follower in followers:
+        if follower.__class__.__name__ == 'BatchNormalization' and follower.scale:
+            importance = importance * np.abs(follower.gamma.numpy())
+            break
+
+    return importance
+
+
+def prune_channels(model, sparsity):
+    """
+    Remove the least important output channels from every prunable chain
+
+    Unlike magnitude pruning this physically shrinks the producer/consumer kernels,
+    so the pruned model has fewer parameters and FLOPs and loads with plain ``load_model``.
+
+    Args:
+        model: Trained Keras model
+        sparsity (float): Fraction of channels to remove from each chain (0-1)
+
+    Returns:
+        tuple: (pruned model, dict of layer name -> kept channel indices)
+    """
+    if sparsity <= 0:
+        return model, {}
+
+    layers = {layer.name: layer for layer in _iter_layers(model)}
+    keep_indices = {}
+    consumer_of = {}
+    follower_of = {}
+
+    for chain in find_prunable_chains(model):
+        producer = layers[chain['producer']]
+        followers = [layers[name] for name in chain['followers']]
+        importance = _channel_importance(producer, followers)
+
+        channels = importance.shape[0]
+        keep = max(MIN_CHANNELS, int(round(channels * (1.0 - sparsity))))
+        if keep >= channels:
+            continue
+
+        kept = np.sort(np.argsort(importance)[::-1][:keep])
+        keep_indices[producer.name] = kept
+        consumer_of[chain['consumer']] = kept
+        for name in chain['followers']:
+            follower_of[name] = kept
+
+    config = model.get_config()
+    for _, layer_config in _iter_layer_configs(config):
+        name = layer_config['name']
+        if name in keep_indices:
+            field = PRODUCER_LAYERS[layer_config['class_name']]
+            layer_config['config'][field] = int(len(keep_indices[name]))
+
+    pruned = Model.from_config(config)
+    for layer in _iter_layers(pruned):
+        weights = layers[layer.name].get_weights()
+        if not weights:
+            continue
+
+        if layer.name in keep_indices:
+            kept = keep_indices[layer.name]
+            weights = [weights[0][..., kept]] + [w[kept] for w in weights[1:]]
+        if layer.name in follower_of:
+            kept = follower_of[layer.name]
+            weights = [w[kept] for w in weights]
+        if layer.name in consumer_of:
+            kept = consumer_of[layer.name]
+            kernel = weights[0]
+            kernel = kernel[kept, :] if kernel.ndim == 2 else kernel[:, :, kept, :]
+            weights = [kernel] + weights[1:]
+
+        layer.set_weights(weights)
+
+    return pruned, keep_indices
+
+
+def _kmeans_1d(values, clusters, iterations=10):
+    """Cluster a flat weight array with linearly initialised 1-D k-means"""
+    centroids = np.linspace(values.min(), values.max(), clusters)
+    for _ in range(iterations):
+        assignments = np.abs(values[:, None] - centroids[None, :]).argmin(axis=1)
+        for index in range(clusters):
+            members = values[assignments == index]
+            if members.size:
+                centroids[index] = members.mean()
+    assignments = np.abs(values[:, None] - centroids[None, :]).argmin(axis=1)
+    return centroids[assignments]
+
+
+def cluster_weights(model, number_of_clusters=16, train_generator=None, validation_generator=None,
+                    epochs=1, learning_rate=1e-5):
+    """
+    Share kernel weights between a small number of centroids
+
+    Uses cluster-aware fine-tuning from tensorflow-model-optimization when it is installed,
+    otherwise clusters each kernel post hoc with numpy k-means.
+
+    Returns:
+        Keras model with clustered kernels and no clustering wrappers
+    """
+    if tfmot is not None:
+        clustering = tfmot.clustering.keras
+        clustered = clustering.cluster_weights(
+            model,
+            number_of_clusters=number_of_clusters,
+            cluster_centroids_init=clustering.CentroidInitialization.KMEANS_PLUS_PLUS
+        )
+        if train_generator is not None and epochs > 0:
+            clustered.compile(optimizer=Adam(learning_rate=learning_rate),
+                              loss='categorical_crossentropy', metrics=['accuracy'])
+            clustered.fit(train_generator, validation_data=validation_generator, epochs=epochs, verbose=1)
+        return clustering.strip_clustering(clustered)
+
+    for layer in _iter_layers(model):
+        if not isinstance(layer, (Conv2D, Dense)):
+            continue
+        weights = layer.get_weights()
+        kernel = weights[0]
+        if kernel.size <= number_of_clusters:
+            continue
+        weights[0] = _kmeans_1d(kernel.ravel(), number_of_clusters).reshape(kernel.shape).astype(kernel.dtype)
+        layer.set_weights(weights)
+    return model
+
+
+def fine_tune(model, train_generator, validation_generator, epochs=2, learning_rate=1e-5):
+    """Briefly retrain a compressed model to recover accuracy"""
+    model.compile(optimizer=Adam(learning_rate=learning_rate),
+                  loss='categorical_crossentropy', metrics=['accuracy'])
+    if epochs > 0:
+        model.fit(train_generator, validation_data=validation_generator, epochs=epochs, verbose=1)
+    return model
+
+
+def measure_latency(model, runs=50, warmup=5):
+    """Median and p95 single-image latency in milliseconds"""
+    sample = np.random.rand(1, *Config.IMAGE_SIZE, 3).astype(np.float32)
+    for _ in range(warmup):
+        model(sample, training=False)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(sample, training=False)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return float(np.median(timings)), float(np.percentile(timings, 95))
+
+
+def artifact_sizes(model):
+    """Saved .h5 size and gzip-compressed size in bytes"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'model.h5')
+        model.save(path, include_optimizer=False)
+        with open(path, 'rb') as f:
+            compressed = len(gzip.compress(f.read()))
+        return os.path.getsize(path), compressed
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def evaluate_accuracy(model, test_generator):
+    """Top-1 accuracy of a model on the test generator"""
+    test_generator.reset()
+    correct = 0
+    total = 0
+    for _ in range(len(test_generator)):
+        images, labels = next(test_generator)
+        preds = model(images, training=False).numpy()
+        correct += int((preds.argmax(axis=1) == labels.argmax(axis=1)).sum())
+        total += len(labels)
+    return correct / total if total else 0.0
+
+
+class ModelCompressor:
+    def __init__(self, model_path=None):
+        self.model_path = model_path or Config.SERVING_MODEL_PATH
+
+    def compress(self, sparsity, train_generator=None, validation_generator=None,
+                 number_of_clusters=16, prune_epochs=2, cluster_epochs=1):
+        """
+        Run prune -> fine-tune -> cluster on a fresh copy of the source model
+
+        Args:
+            sparsity (float): Fraction of channels removed from each prunable chain
+            number_of_clusters (int): Centroids per kernel, 0 disables clustering
+
+        Returns:
+            Keras model ready to be saved into ``model/``
+        """
+        model = load_model(self.model_path, compile=False)
+        model, _ = prune_channels(model, sparsity)
+
+        if train_generator is not None:
+            model = fine_tune(model, train_generator, validation_generator, epochs=prune_epochs)
+
+        if number_of_clusters:
+            model = cluster_weights(model, number_of_clusters, train_generator,
+                                    validation_generator, epochs=cluster_epochs)
+
+        return model
+
+    def sweep(self, sparsities, train_generator, validation_generator, test_generator, **kwargs):
+        """
+        Compress at each sparsity level and measure accuracy, size and latency
+
+        Returns:
+            tuple: (list of result rows, dict of sparsity -> compressed model)
+        """
+        rows = []
+        models = {}
+        for sparsity in sparsities:
+            print(f"\nCompressing at {sparsity:.0%} channel sparsity...")
+            model = self.compress(sparsity, train_generator, validation_generator, **kwargs)
+            median_ms, p95_ms = measure_latency(model)
+            size, gzip_size = artifact_sizes(model)
+
+            rows.append({
+                'sparsity': sparsity,
+                'accuracy': evaluate_accuracy(model, test_generator),
+                'parameters': int(model.count_params()),
+                'size_mb': size / (1024 * 1024),
+                'gzip_mb': gzip_size / (1024 * 1024),
+                'latency_ms': median_ms,
+                'latency_p95_ms': p95_ms
+            })
+            models[sparsity] = model
+
+        return rows, models
+
+
+def format_report(rows):
+    """Render sweep results as a markdown table"""
+    lines = [
+        '| Sparsity | Accuracy | Parameters | Size (MB) | Gzip (MB) | Latency (ms) | p95 (ms) |',
+        '|---------:|---------:|-----------:|----------:|----------:|-------------:|---------:|'
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['sparsity']:.0%} | {row['accuracy'] * 100:.2f}% | {row['parameters']:,} | "
+            f"{row['size_mb']:.1f} | {row['gzip_mb']:.1f} | {row['latency_ms']:.1f} | {row['latency_p95_ms']:.1f} |"
+        )
+    return '\n'.join(lines)
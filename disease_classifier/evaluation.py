@@ -0,0 +1,132 @@
+"""
+Model Evaluation for Cotton Disease Detection
+Scores several trained models over a single decode of the test split
+"""
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+from tensorflow.keras.models import load_model
+from config import Config
+
+
+class ModelEvaluator:
+    def __init__(self, model_paths):
+        self.model_paths = list(model_paths)
+        self.models = {}
+
+    def load_models(self):
+        """Load every model once; models that fail to load are reported and skipped"""
+        for path in self.model_paths:
+            try:
+                self.models[path] = load_model(path, compile=False)
+                print(f"✅ Loaded {path}")
+            except Exception as e:
+                print(f"❌ Could not load {path}: {e}")
+        return self.models
+
+    def evaluate(self, test_generator):
+        """
+        Run every loaded model over the same decoded test batches
+
+        Each batch is decoded once by the generator and then fed to all models,
+        so adding a model costs one forward pass, not another pass over the images.
+
+        Args:
+            test_generator: Non-shuffled test generator from DatasetHandler
+
+        Returns:
+            dict: Per-model metrics keyed by model path
+        """
+        if not self.models:
+            self.load_models()
+
+        test_generator.reset()
+        true_labels = []
+        predictions = {path: [] for path in self.models}
+        batch_timings = {path: [] for path in self.models}
+
+        for _ in range(len(test_generator)):
+            images, labels = next(test_generator)
+            true_labels.append(labels.argmax(axis=1))
+
+            for path, model in self.models.items():
+                start = time.perf_counter()
+                preds = model(images, training=False).numpy()
+                batch_timings[path].append((time.perf_counter() - start, len(images)))
+                predictions[path].append(preds.argmax(axis=1))
+
+        y_true = np.concatenate(true_labels) if true_labels else np.array([], dtype=int)
+        class_names = [name for name, _ in sorted(test_generator.class_indices.items(), key=lambda item: item[1])]
+
+        return {
+            path: self._summarize(y_true, np.concatenate(predictions[path]), batch_timings[path], class_names)
+            for path in self.models
+        }
+
+    def _summarize(self, y_true, y_pred, batch_timings, class_names):
+        """Accuracy, per-class precision/recall, confusion matrix and timing for one model"""
+        labels = list(range(len(class_names)))
+        precision, recall, f1, support = precision_recall_fscore_support(
+            y_true, y_pred, labels=labels, zero_division=0
+        )
+
+        # The first batch includes graph tracing, so it is left out of the timing stats
+        timed = batch_timings[1:] or batch_timings
+        seconds = np.array([elapsed for elapsed, _ in timed])
+        images = sum(count for _, count in timed)
+
+        return {
+            'accuracy': float((y_true == y_pred).mean()) if len(y_true) else 0.0,
+            'per_class': {
+                name: {
+                    'precision': round(float(precision[i]), 4),
+                    'recall': round(float(recall[i]), 4),
+                    'f1': round(float(f1[i]), 4),
+                    'support': int(support[i])
+                }
+                for i, name in enumerate(class_names)
+            },
+            'confusion_matrix': confusion_matrix(y_true, y_pred, labels=labels).tolist(),
+            'throughput_images_per_sec': round(images / seconds.sum(), 2) if seconds.sum() else None,
+            'latency_ms': {
+                'batch_p50': round(float(np.percentile(seconds, 50)) * 1000, 2),
+                'batch_p95': round(float(np.percentile(seconds, 95)) * 1000, 2),
+                'per_image': round(float(seconds.sum()) / images * 1000, 3) if images else None
+            }
+        }
+
+
+def build_metrics_document(results, class_names, test_samples, serving_model=None):
+    """Shape evaluation results into the document served by /api/model/metrics"""
+    serving_model = serving_model or Config.SERVING_MODEL_PATH
+    models = {}
+    for path, metrics in results.items():
+        entry = dict(metrics)
+        entry['path'] = path
+        models[os.path.basename(path)] = entry
+
+    serving = results.get(serving_model)
+    return {
+        'message': 'Metrics computed on the test split',
+        'accuracy': f"{serving['accuracy'] * 100:.2f}%" if serving else None,
+        'serving_model': serving_model,
+        'classes': class_names,
+        'test_samples': test_samples,
+        'batch_size': Config.BATCH_SIZE,
+        'generated_at': datetime.now().isoformat(),
+        'models': models
+    }
+
+
+def write_metrics(document, path=None):
+    """Atomically write metrics.json so readers never see a partial file"""
+    path = path or Config.METRICS_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,155 @@
+"""
+Class Activation Maps for Cotton Disease Detection
+Explains predictions from the last convolutional feature map of the same forward pass
+"""
+import glob
+import io
+import os
+import re
+import uuid
+import numpy as np
+from PIL import Image
+from tensorflow.keras.models import Model
+from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
+from config import Config
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ActivationMapper:
+    """
+    Wraps a GAP -> (Dropout) -> Dense classifier so one call returns both the softmax
+    and the final feature map; the CAM is then a weighted sum with the Dense kernel.
+    """
+
+    def __init__(self, model):
+        layers = model.layers
+        head = layers[-1]
+        if not isinstance(head, Dense):
+            raise ValueError("Class activation maps need a Dense output layer")
+
+        pooling = None
+        for layer in reversed(layers[:-1]):
+            if isinstance(layer, Dropout):
+                continue
+            if isinstance(layer, GlobalAveragePooling2D):
+                pooling = layer
+            break
+        if pooling is None:
+            raise ValueError("Class activation maps need a GlobalAveragePooling2D -> Dense head")
+
+        self.model = model
+        self.class_weights = head.get_weights()[0]
+        self.dual_model = Model(inputs=model.inputs, outputs=[pooling.input, model.output])
+
+    def predict(self, images):
+        """
+        Run one forward pass returning (probabilities, feature maps)
+
+        Args:
+            images (np.ndarray): Preprocessed batch of shape (N, H, W, 3)
+        """
+        feature_maps, probs = self.dual_model.predict(images, batch_size=len(images), verbose=0)
+        return probs, feature_maps
+
+    def class_activation_map(self, feature_map, class_index):
+        """Normalized (h, w) activation map for one image and class"""
+        cam = feature_map @ self.class_weights[:, class_index]
+        cam = np.maximum(cam, 0)
+        peak = cam.max()
+        return cam / peak if peak > 0 else cam
+
+
+def _jet(values):
+    """Map values in [0, 1] to RGB with a jet-like colormap"""
+    r = np.clip(1.5 - np.abs(4 * values - 3), 0, 1)
+    g = np.clip(1.5 - np.abs(4 * values - 2), 0, 1)
+    b = np.clip(1.5 - np.abs(4 * values - 1), 0, 1)
+    return (np.stack([r, g, b], axis=-1) * 255).astype(np.uint8)
+
+
+def render_overlay_png(image, cam, alpha=0.45):
+    """
+    Blend an upsampled activation map over the model input image
+
+    Args:
+        image (np.ndarray): uint8 image of shape (H, W, 3)
+        cam (np.ndarray): Activation map in [0, 1] of shape (h, w)
+
+    Returns:
+        bytes: PNG-encoded overlay
+    """
+    height, width = image.shape[:2]
+    cam_image = Image.fromarray((cam * 255).astype(np.uint8)).resize((width, height), Image.BILINEAR)
+    heat = _jet(np.asarray(cam_image, dtype=np.float32) / 255.0)
+    blended = (image.astype(np.float32) * (1 - alpha) + heat.astype(np.float32) * alpha).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(blended).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _write_atomic(path, write):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class ExplanationCache:
+    """
+    Activation maps kept as files in EXPLANATION_DIR, so any worker can serve an overlay URL
+
+    Each explanation stores the model input and its CAM; the overlay PNG is encoded on
+    the first request and saved next to them. Only the newest max_entries are kept.
+    """
+
+    def __init__(self, directory=None, max_entries=None):
+        self.directory = directory or Config.EXPLANATION_DIR
+        self.max_entries = max_entries or Config.EXPLANATION_MAX_ENTRIES
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def put(self, image, cam):
+        key = uuid.uuid4().hex
+        _write_atomic(self._path(key, '.npz'), lambda f: np.savez(f, image=image, cam=cam))
+        self._prune()
+        return key
+
+    def _prune(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, '*.npz')):
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue  # pruned by another worker
+        entries.sort()
+        for _, path in entries[:-self.max_entries]:
+            for stale in (path, path[:-len('.npz')] + '.png'):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+    def overlay_png(self, key):
+        """Encode (once) and return the overlay PNG, or None if the entry was evicted"""
+        if not KEY_PATTERN.match(key):
+            return None
+        try:
+            with open(self._path(key, '.png'), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        try:
+            with np.load(self._path(key, '.npz')) as data:
+                image, cam = data['image'], data['cam']
+        except FileNotFoundError:
+            return None
+        png = render_overlay_png(image, cam)
+        try:
+            _write_atomic(self._path(key, '.png'), lambda f: f.write(png))
+        except OSError as e:
+            print(f"Error caching explanation overlay {key}: {e}")
+        return png
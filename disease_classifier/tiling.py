@@ -0,0 +1,209 @@
+"""
+Tiled Inference for Cotton Disease Detection
+Scores large drone and field-scale images as overlapping 224x224 tiles
+"""
+import os
+import time
+import warnings
+import numpy as np
+from config import Config
+
+# Read by GDAL when its block cache is first used, so it has to be set before rasterio loads
+os.environ.setdefault('GDAL_CACHEMAX', str(Config.TILE_GDAL_CACHE_MB))
+
+try:
+    import rasterio
+    from rasterio.errors import NotGeoreferencedWarning
+    from rasterio.windows import Window
+except ImportError:  # windowed reads need rasterio; PIL is the fallback
+    rasterio = None
+
+
+class ImageTooLarge(ValueError):
+    """The image has more pixels than the active strip reader accepts"""
+
+
+class RasterioStripReader:
+    """Reads horizontal strips through GDAL so the full image is never held in memory"""
+
+    def __init__(self, path):
+        with warnings.catch_warnings():
+            # Plain JPEG/PNG uploads carry no geotransform, which is fine for tiling
+            warnings.simplefilter('ignore', NotGeoreferencedWarning)
+            self._dataset = rasterio.open(path)
+        self.width = self._dataset.width
+        self.height = self._dataset.height
+        self._bands = [1, 2, 3] if self._dataset.count >= 3 else [1, 1, 1]
+
+    def read_strip(self, top, height):
+        window = Window(0, top, self.width, height)
+        strip = np.moveaxis(self._dataset.read(self._bands, window=window), 0, -1)
+        if strip.dtype != np.uint8 and np.issubdtype(strip.dtype, np.integer):
+            # 16-bit orthophotos are rescaled to the 8-bit range the model was trained on
+            strip = (strip.astype(np.float32) * (255.0 / np.iinfo(strip.dtype).max)).astype(np.uint8)
+        return strip
+
+    def close(self):
+        self._dataset.close()
+
+
+class PILStripReader:
+    """
+    Fallback strip reader for when rasterio is not installed
+
+    PIL decodes the whole image on first access, so this reader refuses images
+    above TILE_MAX_DECODED_MEGAPIXELS before decoding anything; rasterio (a
+    requirement) is what handles orthophoto-scale inputs.
+    """
+
+    def __init__(self, path):
+        from PIL import Image
+        try:
+            image = Image.open(path)
+        except Image.DecompressionBombError as e:
+            raise ImageTooLarge(str(e))
+        # Image.open only reads the header, so the size is known before the decode
+        _check_size(image.width, image.height, Config.TILE_MAX_DECODED_MEGAPIXELS,
+                    "without rasterio installed")
+        self._image = image.convert('RGB')
+        image.close()
+        self.width, self.height = self._image.size
+
+    def read_strip(self, top, height):
+        return np.asarray(self._image.crop((0, top, self.width, top + height)))
+
+    def close(self):
+        self._image.close()
+
+
+def _check_size(width, height, max_megapixels, context=''):
+    megapixels = width * height / 1e6
+    if megapixels > max_megapixels:
+        raise ImageTooLarge(f"Image is {width}x{height} ({megapixels:.1f} MP); "
+                            f"at most {max_megapixels:g} MP can be analyzed {context}".rstrip())
+
+
+def open_strip_reader(path):
+    """
+    Strip reader for an image, windowed through rasterio when available
+
+    Raises:
+        ImageTooLarge: If the image exceeds the reader's pixel limit
+    """
+    reader = RasterioStripReader(path) if rasterio is not None else PILStripReader(path)
+    try:
+        _check_size(reader.width, reader.height, Config.TILE_MAX_MEGAPIXELS)
+    except ImageTooLarge:
+        reader.close()
+        raise
+    return reader
+
+
+def tile_origins(length, tile, stride):
+    """Tile start offsets along one axis; the last tile is aligned to the image edge"""
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile + 1, stride))
+    if origins[-1] != length - tile:
+        origins.append(length - tile)
+    return origins
+
+
+class TiledAnalyzer:
+    def __init__(self, model, index_to_class, tile_size=None, overlap=None, batch_size=None):
+        self.model = model
+        self.index_to_class = index_to_class
+        self.tile_size = tile_size or Config.IMAGE_SIZE[0]
+        self.overlap = Config.TILE_OVERLAP if overlap is None else overlap
+        self.batch_size = batch_size or Config.INFERENCE_BATCH_SIZE
+        self.stride = max(1, int(self.tile_size * (1.0 - self.overlap)))
+
+    def _iter_tiles(self, reader):
+        """Yield (row, col, tile) reading one tile-high strip at a time"""
+        size = self.tile_size
+        for row, top in enumerate(tile_origins(reader.height, size, self.stride)):
+            strip = reader.read_strip(top, min(size, reader.height - top))
+            if strip.shape[0] < size or strip.shape[1] < size:
+                # Images smaller than a tile are zero-padded rather than stretched
+                padded = np.zeros((size, max(size, strip.shape[1]), 3), dtype=strip.dtype)
+                padded[:strip.shape[0], :strip.shape[1]] = strip
+                strip = padded
+            for col, left in enumerate(tile_origins(reader.width, size, self.stride)):
+                yield row, col, strip[:, left:left + size]
+
+    def analyze(self, path):
+        """
+        Score every tile of a large image
+
+        Returns:
+            dict: Per-class tile heatmaps, per-tile label grid and an aggregate summary
+        """
+        start = time.perf_counter()
+        reader = open_strip_reader(path)
+        try:
+            rows = len(tile_origins(reader.height, self.tile_size, self.stride))
+            cols = len(tile_origins(reader.width, self.tile_size, self.stride))
+            num_classes = len(self.index_to_class)
+            grid = np.zeros((rows, cols, num_classes), dtype=np.float32)
+
+            positions = []
+            batch = []
+            for row, col, tile in self._iter_tiles(reader):
+                positions.append((row, col))
+                batch.append(tile)
+                if len(batch) == self.batch_size:
+                    self._score(batch, positions, grid)
+                    batch, positions = [], []
+            if batch:
+                self._score(batch, positions, grid)
+
+            width, height = reader.width, reader.height
+        finally:
+            reader.close()
+
+        elapsed = time.perf_counter() - start
+        return self._summarize(grid, width, height, elapsed)
+
+    def _score(self, batch, positions, grid):
+        # Same scaling as DatasetHandler.preprocess_image; tiles are already model-sized
+        images = np.stack(batch).astype(np.float32) / 255.0
+        probs = self.model.predict(images, batch_size=len(images), verbose=0)
+        for (row, col), prob in zip(positions, probs):
+            grid[row, col] = prob
+
+    def _summarize(self, grid, width, height, elapsed):
+        class_names = [self.index_to_class[i].replace('_', ' ') for i in range(grid.shape[-1])]
+        labels = grid.argmax(axis=-1)
+        confidences = grid.max(axis=-1)
+        tiles = labels.size
+        counts = np.bincount(labels.ravel(), minlength=len(class_names))
+
+        healthy = [i for i, name in enumerate(class_names) if name.lower().startswith('healthy')]
+        affected = ~np.isin(labels, healthy) & (confidences >= Config.CONFIDENCE_THRESHOLD)
+
+        return {
+            'image_size': [width, height],
+            'tile_size': self.tile_size,
+            'stride': self.stride,
+            'grid_shape': [int(grid.shape[0]), int(grid.shape[1])],
+            'classes': class_names,
+            'label_grid': labels.tolist(),
+            'heatmaps': {
+                name: np.round(grid[:, :, i] * 100, 1).tolist()
+                for i, name in enumerate(class_names)
+            },
+            'summary': {
+                'tiles': int(tiles),
+                'tile_share': {name: round(float(counts[i]) / tiles, 4) for i, name in enumerate(class_names)},
+                'mean_probability': {
+                    name: round(float(grid[:, :, i].mean()) * 100, 2) for i, name in enumerate(class_names)
+                },
+                'affected_fraction': round(float(affected.mean()), 4),
+                'dominant_disease': class_names[int(counts.argmax())]
+            },
+            'timing': {
+                'seconds': round(elapsed, 3),
+                'tiles_per_sec': round(tiles / elapsed, 2) if elapsed else None,
+                'megapixels_per_sec': round(width * height / 1e6 / elapsed, 3) if elapsed else None
+            }
+        }
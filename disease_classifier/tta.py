@@ -0,0 +1,160 @@
+"""
+Test-Time Augmentation for Cotton Disease Detection
+Averages the softmax over augmented views packed into a single batched forward pass
+"""
+import time
+import numpy as np
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from config import Config
+
+# Fixed views drawn from the same transform family as the training generator in
+# DatasetHandler.create_data_generators (flips, zoom crops, small shifts and rotations)
+VIEW_TRANSFORMS = [
+    {},
+    {'flip_horizontal': True},
+    {'zx': 0.9, 'zy': 0.9},
+    {'theta': 10},
+    {'theta': -10},
+    {'flip_horizontal': True, 'zx': 0.9, 'zy': 0.9},
+    {'tx': 0.1 * Config.IMAGE_SIZE[0], 'ty': 0.1 * Config.IMAGE_SIZE[1]},
+    {'tx': -0.1 * Config.IMAGE_SIZE[0], 'ty': -0.1 * Config.IMAGE_SIZE[1]},
+    {'zx': 0.8, 'zy': 0.8},
+    {'flip_horizontal': True, 'theta': 15},
+]
+
+TTA_MODES = ('off', 'auto', 'always')
+
+_transformer = ImageDataGenerator()
+
+
+def augment_views(image_array, num_views):
+    """
+    Build augmented views of a single preprocessed image
+
+    Args:
+        image_array (np.ndarray): Image of shape (1, H, W, 3) or (H, W, 3), already scaled to [0, 1]
+        num_views (int): Number of views including the unmodified image
+
+    Returns:
+        np.ndarray: Batch of shape (num_views, H, W, 3)
+    """
+    image = image_array[0] if image_array.ndim == 4 else image_array
+    num_views = max(1, min(num_views, len(VIEW_TRANSFORMS)))
+    return np.stack([
+        _transformer.apply_transform(image, params) if params else image
+        for params in VIEW_TRANSFORMS[:num_views]
+    ])
+
+
+class TTAPredictor:
+    def __init__(self, model, num_views=None, confidence_threshold=None):
+        self.model = model
+        self.num_views = num_views or Config.TTA_VIEWS
+        self.confidence_threshold = (Config.TTA_CONFIDENCE_THRESHOLD
+                                     if confidence_threshold is None else confidence_threshold)
+
+    def predict(self, image_array, mode='off', num_views=None):
+        """
+        Predict class probabilities, optionally with test-time augmentation
+
+        Args:
+            image_array (np.ndarray): Preprocessed image batch of shape (1, H, W, 3)
+            mode (str): 'off' for a plain pass, 'always' to augment every image, or
+                'auto' to augment only when the plain prediction is below the threshold
+            num_views (int): Override for the configured number of views
+
+        Returns:
+            tuple: (probabilities of shape (1, num_classes), TTA info dict or None)
+        """
+        if mode not in TTA_MODES:
+            raise ValueError(f"Unknown TTA mode '{mode}', expected one of {TTA_MODES}")
+
+        num_views = num_views or self.num_views
+        if mode == 'off' or num_views <= 1:
+            return self.model.predict(image_array, verbose=0), None
+
+        if mode == 'always':
+            start = time.perf_counter()
+            views = augment_views(image_array, num_views)
+            probs = self.model.predict(views, batch_size=len(views), verbose=0)
+            return probs.mean(axis=0, keepdims=True), {
+                'mode': mode,
+                'applied': True,
+                'views': len(views),
+                'latency_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+
+        # auto: the plain prediction is reused as the identity view
+        base = self.model.predict(image_array, verbose=0)
+        if float(base.max()) >= self.confidence_threshold:
+            return base, {'mode': mode, 'applied': False, 'views': 1, 'latency_ms': 0.0}
+
+        start = time.perf_counter()
+        views = augment_views(image_array, num_views)[1:]
+        probs = self.model.predict(views, batch_size=len(views), verbose=0)
+        averaged = (base.sum(axis=0) + probs.sum(axis=0)) / (len(views) + 1)
+        return averaged[np.newaxis, :], {
+            'mode': mode,
+            'applied': True,
+            'views': len(views) + 1,
+            'base_confidence': round(float(base.max()) * 100, 2),
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+
+def evaluate_tta(model, test_generator, num_views=None, confidence_threshold=None):
+    """
+    Measure the accuracy gain and added latency of TTA on the test split
+
+    Returns:
+        dict: Plain, always-on and threshold accuracies with per-image extra latency
+    """
+    predictor = TTAPredictor(model, num_views, confidence_threshold)
+    test_generator.reset()
+
+    plain_correct = always_correct = auto_correct = total = triggered = 0
+    plain_seconds = always_seconds = auto_extra_seconds = 0.0
+
+    for _ in range(len(test_generator)):
+        images, labels = next(test_generator)
+        for image, label in zip(images, labels.argmax(axis=1)):
+            batch = image[np.newaxis]
+
+            start = time.perf_counter()
+            plain = model.predict(batch, verbose=0)
+            plain_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            always, _ = predictor.predict(batch, mode='always')
+            always_seconds += time.perf_counter() - start
+
+            # Threshold mode reuses the plain pass, so only the extra views are timed
+            if float(plain.max()) < predictor.confidence_threshold:
+                start = time.perf_counter()
+                views = augment_views(batch, predictor.num_views)[1:]
+                extra = model.predict(views, batch_size=len(views), verbose=0)
+                auto_extra_seconds += time.perf_counter() - start
+                auto = (plain.sum(axis=0) + extra.sum(axis=0))[np.newaxis, :]
+                triggered += 1
+            else:
+                auto = plain
+
+            plain_correct += int(plain.argmax() == label)
+            always_correct += int(always.argmax() == label)
+            auto_correct += int(auto.argmax() == label)
+            total += 1
+
+    if not total:
+        return {}
+
+    return {
+        'views': predictor.num_views,
+        'confidence_threshold': predictor.confidence_threshold,
+        'plain_accuracy': plain_correct / total,
+        'always_accuracy': always_correct / total,
+        'auto_accuracy': auto_correct / total,
+        'auto_trigger_rate': triggered / total,
+        'plain_latency_ms': plain_seconds / total * 1000,
+        'always_added_latency_ms': (always_seconds - plain_seconds) / total * 1000,
+        'auto_added_latency_ms': auto_extra_seconds / total * 1000
+    }
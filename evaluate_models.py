@@ -0,0 +1,81 @@
+"""
+Model Evaluation Script
+Decodes the test split once, scores every model in model/ and writes model/metrics.json
+"""
+import argparse
+import glob
+import os
+import sys
+from disease_classifier.dataset_handler import DatasetHandler
+from disease_classifier.evaluation import ModelEvaluator, build_metrics_document, write_metrics
+from disease_classifier.tta import evaluate_tta
+from config import Config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate cotton disease models on the test split")
+    parser.add_argument('models', nargs='*',
+                        help="Model files to evaluate (default: every .h5 file in model/)")
+    parser.add_argument('--output', default=Config.METRICS_PATH,
+                        help="Where to write the metrics document")
+    parser.add_argument('--tta-views', type=int, default=0,
+                        help="Also report test-time augmentation gain for the serving model with N views")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    model_paths = args.models or sorted(glob.glob(os.path.join('model', '*.h5')))
+
+    print("=" * 60)
+    print("Cotton Disease Model Evaluation")
+    print("=" * 60)
+
+    dataset_handler = DatasetHandler()
+    if not dataset_handler.validate_dataset():
+        print("❌ Dataset not found or invalid!")
+        print("Please run 'python download_dataset.py' first to download the dataset.")
+        return False
+
+    _, _, test_gen = dataset_handler.create_data_generators()
+    if test_gen is None:
+        print("❌ Failed to create the test generator!")
+        return False
+
+    evaluator = ModelEvaluator(model_paths)
+    if not evaluator.load_models():
+        print("❌ No models could be loaded!")
+        return False
+
+    print(f"\nScoring {len(evaluator.models)} models on {test_gen.samples} test images...")
+    results = evaluator.evaluate(test_gen)
+
+    class_names = [name for name, _ in sorted(test_gen.class_indices.items(), key=lambda item: item[1])]
+    document = build_metrics_document(results, class_names, test_gen.samples)
+
+    serving_model = evaluator.models.get(Config.SERVING_MODEL_PATH)
+    if args.tta_views > 1 and serving_model is not None:
+        print(f"\nMeasuring test-time augmentation with {args.tta_views} views...")
+        tta = evaluate_tta(serving_model, test_gen, num_views=args.tta_views)
+        document['tta'] = tta
+        print(f"  Plain accuracy:     {tta['plain_accuracy'] * 100:.2f}%")
+        print(f"  TTA (always):       {tta['always_accuracy'] * 100:.2f}% "
+              f"(+{tta['always_added_latency_ms']:.1f} ms/image)")
+        print(f"  TTA (below {tta['confidence_threshold']:.0%}):   {tta['auto_accuracy'] * 100:.2f}% "
+              f"(+{tta['auto_added_latency_ms']:.1f} ms/image, {tta['auto_trigger_rate']:.0%} triggered)")
+
+    write_metrics(document, args.output)
+
+    print("\n" + "-" * 60)
+    print(f"{'Model':<45}{'Accuracy':>10}{'img/s':>10}")
+    print("-" * 60)
+    for name, metrics in document['models'].items():
+        print(f"{name:<45}{metrics['accuracy'] * 100:>9.2f}%{metrics['throughput_images_per_sec'] or 0:>10.1f}")
+
+    print(f"\n✅ Metrics written to: {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -48,6 +48,8 @@ export const predictDiseaseJSON = async (file) => {
       confidence: data.confidence,
       probabilities: data.probabilities || [],
       imageUrl: data.image_url,
+      thumbnailUrl: data.thumbnail_url,
+      previewUrl: data.preview_url,
       preventive_measures: data.preventive_measures || [],
       causing_agents: data.causing_agents || [],
       timestamp: new Date().toISOString(),
@@ -185,6 +187,54 @@ export const getTrainingMetrics = async () => {
   return null;
 };
 
+/**
+ * Open a live prediction stream for camera frames
+ * @param {Function} onPrediction - Called with each smoothed prediction pushed by the server
+ * @param {Function} [onUnavailable] - Called when the stream cannot be opened or is closed by the server
+ * @returns {{sendFrame: Function, close: Function}} Stream controls
+ */
+export const openPredictionStream = (onPrediction, onUnavailable) => {
+  const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/api/stream`);
+  socket.binaryType = 'arraybuffer';
+  let inFlight = false;
+  let closedByClient = false;
+
+  socket.onclose = () => {
+    if (!closedByClient && onUnavailable) {
+      onUnavailable();
+    }
+  };
+
+  socket.onmessage = (event) => {
+    try {
+      onPrediction(JSON.parse(event.data));
+    } catch {
+      console.warn('Invalid stream message');
+    }
+  };
+
+  return {
+    /**
+     * Send a JPEG frame from a canvas; skipped while the previous frame is still uploading
+     * @param {HTMLCanvasElement} canvas - Canvas holding the current video frame
+     */
+    sendFrame: (canvas) => {
+      if (inFlight || socket.readyState !== WebSocket.OPEN) return;
+      inFlight = true;
+      canvas.toBlob((blob) => {
+        if (blob && socket.readyState === WebSocket.OPEN) {
+          socket.send(blob);
+        }
+        inFlight = false;
+      }, 'image/jpeg', 0.7);
+    },
+    close: () => {
+      closedByClient = true;
+      socket.close();
+    },
+  };
+};
+
 export default {
   predictDisease,
   predictDiseaseJSON,
@@ -192,4 +242,5 @@ export default {
   getModelMetadata,
   getTrainingMetrics,
   checkJsonApiAvailable,
+  openPredictionStream,
 };
@@ -1,5 +1,10 @@
 import { useState, useRef, useEffect } from 'react';
-import { Camera, X, RotateCcw, Check } from 'lucide-react';
+import { Camera, X, RotateCcw, Check, Activity } from 'lucide-react';
+import { openPredictionStream } from '../api/client';
+
+// Live detection sends a downscaled frame this often; the server skips near-identical frames
+const LIVE_FRAME_INTERVAL_MS = 250;
+const LIVE_FRAME_MAX_SIDE = 448;
 
 /**
  * Camera capture component for taking photos
@@ -11,6 +16,8 @@ const CameraCapture = ({ onCapture, onClose }) => {
   const [capturedImage, setCapturedImage] = useState(null);
   const [error, setError] = useState('');
   const [facingMode, setFacingMode] = useState('environment'); // 'user' for front, 'environment' for back
+  const [live, setLive] = useState(false);
+  const [livePrediction, setLivePrediction] = useState(null);
   const videoRef = useRef(null);
   const canvasRef = useRef(null);
 
@@ -124,6 +131,49 @@ const CameraCapture = ({ onCapture, onClose }) => {
     onClose();
   };
 
+  /**
+   * Toggle live detection over the prediction stream
+   */
+  const toggleLive = () => {
+    setLivePrediction(null);
+    setLive(prev => !prev);
+  };
+
+  // Stream frames while live detection is on and the camera is running
+  useEffect(() => {
+    if (!live || !stream || capturedImage) return undefined;
+
+    const connection = openPredictionStream(
+      (message) => {
+        if (message.error) {
+          setError(message.error);
+          setLive(false);
+        } else {
+          setLivePrediction(message);
+        }
+      },
+      () => {
+        setError('Live detection is not available right now');
+        setLive(false);
+      }
+    );
+    const frameCanvas = document.createElement('canvas');
+    const timer = setInterval(() => {
+      const video = videoRef.current;
+      if (!video || !video.videoWidth) return;
+      const scale = Math.min(1, LIVE_FRAME_MAX_SIDE / Math.max(video.videoWidth, video.videoHeight));
+      frameCanvas.width = Math.round(video.videoWidth * scale);
+      frameCanvas.height = Math.round(video.videoHeight * scale);
+      frameCanvas.getContext('2d').drawImage(video, 0, 0, frameCanvas.width, frameCanvas.height);
+      connection.sendFrame(frameCanvas);
+    }, LIVE_FRAME_INTERVAL_MS);
+
+    return () => {
+      clearInterval(timer);
+      connection.close();
+    };
+  }, [live, stream, capturedImage]);
+
   // Start camera on mount
   useEffect(() => {
     const initCamera = async () => {
@@ -164,6 +214,19 @@ const CameraCapture = ({ onCapture, onClose }) => {
                 className="w-full h-full object-cover"
               />
               <canvas ref={canvasRef} className="hidden" />
+
+              {/* Live detection result */}
+              {live && (
+                <div className="absolute top-4 left-4 px-3 py-2 bg-black bg-opacity-60 rounded-lg text-white text-sm">
+                  {livePrediction ? (
+                    <span>
+                      <span className="font-semibold">{livePrediction.label}</span> · {livePrediction.confidence}%
+                    </span>
+                  ) : (
+                    <span>Detecting…</span>
+                  )}
+                </div>
+              )}
               
               {/* Camera controls overlay */}
               <div className="absolute bottom-0 left-0 right-0 p-6 bg-gradient-to-t from-black to-transparent">
@@ -186,8 +249,17 @@ const CameraCapture = ({ onCapture, onClose }) => {
                     <div className="w-full h-full rounded-full bg-white" />
                   </button>
 
-                  {/* Spacer for symmetry */}
-                  <div className="w-12" />
+                  {/* Live detection toggle */}
+                  <button
+                    onClick={toggleLive}
+                    className={`p-3 rounded-full transition-all ${
+                      live ? 'bg-primary-600 hover:bg-primary-700' : 'bg-white bg-opacity-20 hover:bg-opacity-30'
+                    }`}
+                    aria-label={live ? 'Stop live detection' : 'Start live detection'}
+                    aria-pressed={live}
+                  >
+                    <Activity className="w-6 h-6 text-white" />
+                  </button>
                 </div>
               </div>
             </>
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Clock, Trash2, Eye } from 'lucide-react';
-import { getHistory, clearHistory, removeFromHistory } from '../utils/storage';
+import { getHistory, clearHistory, removeFromHistory, getThumbnailUrl } from '../utils/storage';
 
 /**
  * Display prediction history from localStorage
@@ -71,6 +71,17 @@ const History = ({ onSelectResult }) => {
             className="border border-gray-200 rounded-lg p-3 hover:border-primary-300 hover:bg-primary-50 transition-all group"
           >
             <div className="flex items-start justify-between">
+              {getThumbnailUrl(item) && (
+                <img
+                  src={getThumbnailUrl(item)}
+                  alt={item.label}
+                  width={48}
+                  height={48}
+                  loading="lazy"
+                  decoding="async"
+                  className="w-12 h-12 object-cover rounded-md mr-3 flex-shrink-0"
+                />
+              )}
               <div className="flex-1 min-w-0">
                 <p className="font-semibold text-gray-800 truncate">
                   {item.label}
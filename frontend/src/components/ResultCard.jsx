@@ -8,7 +8,10 @@ import { CheckCircle, AlertTriangle, Activity, Download } from 'lucide-react';
 const ResultCard = ({ result, onNewPrediction }) => {
   if (!result) return null;
 
-  const { label, confidence, probabilities = [], imageUrl } = result;
+  const { label, confidence, probabilities = [], imageUrl, previewUrl } = result;
+
+  // The medium preview is enough for display; the original stays one click away
+  const displayUrl = previewUrl || imageUrl;
 
   // Determine status based on confidence
   const getStatus = () => {
@@ -72,13 +75,16 @@ Generated by CottonAid - Cotton Disease Detection System
       </div>
 
       {/* Image preview */}
-      {imageUrl && (
+      {displayUrl && (
         <div className="mb-6">
-          <img
-            src={imageUrl}
-            alt="Analyzed cotton leaf"
-            className="w-full max-h-64 object-contain rounded-lg shadow-md"
-          />
+          <a href={imageUrl || displayUrl} target="_blank" rel="noopener noreferrer">
+            <img
+              src={displayUrl}
+              alt="Analyzed cotton leaf"
+              decoding="async"
+              className="w-full max-h-64 object-contain rounded-lg shadow-md"
+            />
+          </a>
         </div>
       )}
 
@@ -0,0 +1,43 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { render, screen } from '@testing-library/react';
+import History from '../History';
+
+const HISTORY_KEY = 'cotton_disease_history';
+
+describe('History', () => {
+  beforeEach(() => {
+    localStorage.clear();
+  });
+
+  it('shows empty state without history', () => {
+    render(<History />);
+    expect(screen.getByText(/no predictions yet/i)).toBeInTheDocument();
+  });
+
+  it('renders the thumbnail instead of the original image', () => {
+    localStorage.setItem(HISTORY_KEY, JSON.stringify([{
+      id: 1,
+      label: 'bacterial blight',
+      confidence: 91.2,
+      imageUrl: 'http://localhost/uploads/abc.jpg',
+      thumbnailUrl: 'http://localhost/uploads/abc.thumb.webp',
+      timestamp: new Date().toISOString(),
+    }]));
+    render(<History />);
+    const image = screen.getByAltText('bacterial blight');
+    expect(image).toHaveAttribute('src', 'http://localhost/uploads/abc.thumb.webp');
+  });
+
+  it('omits the image for entries without a thumbnail', () => {
+    localStorage.setItem(HISTORY_KEY, JSON.stringify([{
+      id: 2,
+      label: 'fresh leaf',
+      confidence: 88,
+      imageUrl: 'http://localhost/uploads/def.jpg',
+      timestamp: new Date().toISOString(),
+    }]));
+    render(<History />);
+    expect(screen.getByText('fresh leaf')).toBeInTheDocument();
+    expect(screen.queryByRole('img')).not.toBeInTheDocument();
+  });
+});
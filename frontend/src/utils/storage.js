@@ -45,6 +45,14 @@ export const addToHistory = (prediction) => {
   }
 };
 
+/**
+ * Small image for a history entry: the server-generated thumbnail, never the
+ * full-resolution original (entries from the HTML fallback have none)
+ * @param {Object} item - History entry
+ * @returns {string|null} Thumbnail URL
+ */
+export const getThumbnailUrl = (item) => item.thumbnailUrl || null;
+
 /**
  * Clear all history
  */
@@ -75,6 +83,7 @@ export const removeFromHistory = (id) => {
 export default {
   getHistory,
   addToHistory,
+  getThumbnailUrl,
   clearHistory,
   removeFromHistory,
 };
@@ -0,0 +1,37 @@
+"""
+Gunicorn Settings for Cotton Disease Detection
+Worker and thread counts come from Config, which reads the host's tune_capacity.py results
+"""
+from config import Config
+from knowledge_base.loader import install_reload_signal
+from serving.capacity import host_cpus
+from serving.telemetry import clear_multiprocess_dir, mark_process_dead
+
+workers = Config.WEB_CONCURRENCY
+# /api/stream WebSockets need the threaded worker (the sync worker cannot hold a connection
+# open) and keep one thread busy per connected camera, so stream threads come on top
+worker_class = 'gthread'
+threads = Config.GUNICORN_THREADS + Config.STREAM_MAX_CONNECTIONS
+
+
+def on_starting(server):
+    if Config.METRICS_MULTIPROC_DIR:
+        # Worker files of a previous run would otherwise be merged, or overwritten by reused pids
+        clear_multiprocess_dir(Config.METRICS_MULTIPROC_DIR)
+    cpus = host_cpus()
+    intra_op = Config.TF_INTRA_OP_THREADS or cpus  # TensorFlow's default uses every core
+    if workers * intra_op > cpus:
+        server.log.warning(
+            "%d workers x %d intra-op threads oversubscribes %d CPUs; run tune_capacity.py "
+            "or set TF_INTRA_OP_THREADS", workers, intra_op, cpus)
+
+
+def post_worker_init(worker):
+    # Worker.init_signals resets SIGHUP to its default (terminate); with --preload the
+    # knowledge-base reload handler was installed before that, so put it back
+    install_reload_signal()
+
+
+def child_exit(server, worker):
+    if Config.METRICS_MULTIPROC_DIR:
+        mark_process_dead(Config.METRICS_MULTIPROC_DIR, worker.pid)
@@ -0,0 +1 @@
+# Knowledge Base Module
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Read-only Records for Cotton Disease Detection
+Immutable dict and list wrappers for knowledge-base records shared between requests
+"""
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict used for cached records; still JSON-serializable like a dict
+
+    copy(), copy.deepcopy() and pickling give plain dicts (deep copies turn nested
+    tuples back into lists), so callers can modify what they copied.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cached knowledge-base records are read-only; copy them before modifying")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self):
+        return dict(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def freeze(value):
+    """Recursively convert dicts to FrozenDicts and lists to tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Private mutable copy of a frozen value: dicts and lists all the way down"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
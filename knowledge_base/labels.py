@@ -0,0 +1,34 @@
+"""
+Label Mapping for Cotton Disease Detection
+Translates model class labels into knowledge-base disease keys
+"""
+
+# Model classes (dataset folder names) -> keys used by the treatment and pest databases
+MODEL_LABEL_ALIASES = {
+    'Aphids': 'Aphids',
+    'Army_worm': 'Army Worm',
+    'Bacterial_Blight': 'Bacterial Blight',
+    'Healthy': 'Healthy Leaf',
+    'Powdery_Mildew': 'Powdery Mildew',
+    'Target_spot': 'Target Spot'
+}
+
+_ALIASES_BY_DISPLAY_NAME = {label.replace('_', ' ').lower(): key for label, key in MODEL_LABEL_ALIASES.items()}
+
+
+def to_knowledge_base_name(label):
+    """
+    Map a model label to its knowledge-base disease key
+
+    Accepts raw class names ('Bacterial_Blight'), display labels ('Bacterial Blight')
+    and knowledge-base keys themselves; unknown labels are returned with spaces.
+    """
+    if label in MODEL_LABEL_ALIASES:
+        return MODEL_LABEL_ALIASES[label]
+    display = label.replace('_', ' ')
+    return _ALIASES_BY_DISPLAY_NAME.get(display.lower(), display)
+
+
+def to_display_label(label):
+    """Model label as shown to users and used as the disease_info.json key"""
+    return label.replace('_', ' ')
@@ -0,0 +1,209 @@
+"""
+Knowledge File Loader for Cotton Disease Detection
+Reloads JSON knowledge files in the background and swaps in validated snapshots atomically
+"""
+import json
+import os
+import signal
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from config import Config
+from .frozen import freeze
+from .store import PROJECT_ROOT
+
+# One consistent version of a knowledge file: the frozen data plus anything derived
+# from it (e.g. a pre-serialized catalog). Readers take .current once per request.
+KnowledgeSnapshot = namedtuple('KnowledgeSnapshot', ['data', 'derived', 'version', 'signature', 'loaded_at'])
+
+
+def validate_disease_info(data):
+    """
+    Check the shape of disease_info.json
+
+    Raises:
+        ValueError: If an entry is not an object of string lists
+    """
+    if not isinstance(data, dict):
+        raise ValueError("disease_info.json must contain an object keyed by disease label")
+    for label, entry in data.items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"Entry for {label!r} must be an object")
+        for field in ('preventive_measures', 'causing_agents'):
+            values = entry.get(field, [])
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                raise ValueError(f"{field} of {label!r} must be a list of strings")
+
+
+class ReloadableJSON:
+    """
+    A JSON file that is re-read when its mtime or size changes
+
+    Parsing, validation and derived builders all run on the watcher thread (or the
+    caller of reload()); the new snapshot is published with a single attribute
+    assignment, so readers see either the old or the new version, never a mix.
+    A file that fails to parse or validate leaves the previous snapshot in place.
+    """
+
+    def __init__(self, path, validate=None, poll_interval=None):
+        self.path = path
+        self.validate = validate
+        self.poll_interval = Config.KNOWLEDGE_RELOAD_INTERVAL if poll_interval is None else poll_interval
+        self.last_error = None
+        self._builders = {}
+        self._lock = threading.Lock()  # serializes reloads; readers never take it
+        self._reload_requested = threading.Event()
+        self._rejected_signature = None
+        self._thread = None
+        self._snapshot = KnowledgeSnapshot(MappingProxyType({}), MappingProxyType({}), 0, None, None)
+        self.reload(force=True)
+
+    @property
+    def current(self):
+        return self._snapshot
+
+    def get(self, key, default=None):
+        return self._snapshot.data.get(key, default)
+
+    def add_derived(self, name, builder):
+        """Build an artifact from every snapshot, starting with the current one"""
+        with self._lock:
+            self._builders[name] = builder
+            snapshot = self._snapshot
+            derived = dict(snapshot.derived)
+            derived[name] = builder(snapshot.data)
+            self._snapshot = snapshot._replace(derived=MappingProxyType(derived))
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force=False):
+        """
+        Re-read the file if it changed since the current snapshot
+
+        Returns:
+            bool: True if a new snapshot was published
+        """
+        with self._lock:
+            signature = self._signature()
+            if not force and signature in (self._snapshot.signature, self._rejected_signature):
+                return False
+            try:
+                data = {}
+                if signature is not None:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                if self.validate is not None:
+                    self.validate(data)
+                data = freeze(data)
+                derived = {name: builder(data) for name, builder in self._builders.items()}
+            except (OSError, ValueError) as e:
+                # A half-written or invalid file is skipped until it changes again
+                self._rejected_signature = signature
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Keeping previous {os.path.basename(self.path)}: {self.last_error}")
+                return False
+
+            self._snapshot = KnowledgeSnapshot(
+                data, MappingProxyType(derived), self._snapshot.version + 1, signature, time.time()
+            )
+            self._rejected_signature = None
+            self.last_error = None
+            return True
+
+    def request_reload(self):
+        """Ask the watcher thread to check the file now (safe to call from a signal handler)"""
+        self._reload_requested.set()
+
+    def start(self):
+        """Start the background watcher thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='knowledge-reload', daemon=True)
+            self._thread.start()
+        return self
+
+    def _watch(self):
+        timeout = self.poll_interval if self.poll_interval > 0 else None
+        while True:
+            self._reload_requested.wait(timeout)
+            self._reload_requested.clear()
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error reloading {self.path}: {e}")
+
+    def status(self):
+        snapshot = self._snapshot
+        return {
+            'path': self.path,
+            'version': snapshot.version,
+            'entries': len(snapshot.data),
+            'loaded_at': snapshot.loaded_at,
+            'last_error': self.last_error
+        }
+
+
+def _resolve_data_path(path):
+    if os.path.isabs(path):
+        return path
+    candidate = os.path.join(PROJECT_ROOT, path)
+    # Fall back to the working directory, like the original loaders did
+    return candidate if os.path.exists(candidate) else os.path.join(os.getcwd(), path)
+
+
+_sources = {}
+_sources_lock = threading.Lock()
+
+
+def _handle_reload_signal(signum, frame):
+    for source in list(_sources.values()):
+        source.request_reload()
+
+
+def install_reload_signal():
+    """
+    Route Config.KNOWLEDGE_RELOAD_SIGNAL to every watched file (main thread only)
+
+    gunicorn workers reset their signal handlers after forking, so with --preload the
+    handler installed at import time is gone; gunicorn.conf.py re-installs it in each worker.
+    """
+    signal_name = Config.KNOWLEDGE_RELOAD_SIGNAL
+    if not signal_name or not hasattr(signal, signal_name):
+        return
+    try:
+        signal.signal(getattr(signal, signal_name), _handle_reload_signal)
+    except ValueError:
+        # Not the main thread; mtime polling still applies
+        pass
+
+
+def _restart_watchers():
+    # Threads do not survive fork (e.g. gunicorn --preload); give each child its own watcher
+    for source in _sources.values():
+        source._thread = None
+        source.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_watchers)
+
+
+def get_disease_info_source():
+    """
+    Process-wide reloadable view of disease_info.json
+
+    Under gunicorn, send the reload signal to the worker processes, not the master
+    (SIGHUP to the master restarts the workers, reloading the model).
+    """
+    with _sources_lock:
+        source = _sources.get('disease_info')
+        if source is None:
+            source = ReloadableJSON(_resolve_data_path(Config.DISEASE_INFO_PATH), validate_disease_info)
+            _sources['disease_info'] = source.start()
+            install_reload_signal()
+    return source
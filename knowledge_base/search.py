@@ -0,0 +1,246 @@
+"""
+Treatment Search for Cotton Disease Detection
+Inverted index over treatments and products with faceted filtering and ranked results
+"""
+import heapq
+import math
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from .labels import to_knowledge_base_name
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'at', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on', 'or',
+    'the', 'to', 'use', 'uses', 'with', 'which', 'what', 'everything', 'all'
+})
+
+# Relative weight of a term match in each indexed field
+FIELD_WEIGHTS = {
+    'product': 4.0,
+    'active_ingredient': 4.0,
+    'pest_type': 3.0,
+    'pest': 2.0,
+    'disease': 2.0,
+    'text': 1.0
+}
+
+FACETS = ('kind', 'disease', 'pest_type', 'urgency')
+
+# Query terms this long also match indexed tokens they prefix (insect -> insecticide),
+# at this fraction of an exact match's weight
+PREFIX_MIN_LENGTH = 3
+PREFIX_WEIGHT = 0.5
+
+# Free-text fields of a treatment item, and of the pests linked to its disease
+TREATMENT_TEXT_FIELDS = ('dosage', 'application', 'timing', 'precautions', 'procedure', 'effectiveness')
+PEST_TEXT_FIELDS = ('lifecycle_info', 'damage_description', 'optimal_conditions', 'spread_method')
+
+
+def stem(token):
+    """Light suffix folding so inflected forms share a token (sucking -> suck, flies -> fly)"""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 5 and token.endswith('ing'):
+        return token[:-3]
+    if len(token) > 4 and token.endswith('ed') and not token.endswith('eed'):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lowercase, stemmed word tokens with stopwords dropped"""
+    return [stem(token) for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+def normalize_facet_value(facet, value):
+    """Facet value as indexed; diseases also accept model labels such as Bacterial_Blight"""
+    if facet == 'disease':
+        value = to_knowledge_base_name(value)
+    return value.lower()
+
+
+class TreatmentSearchIndex:
+    """
+    Inverted index built once from the treatment and pest databases
+
+    Every chemical or organic treatment is one document. Term postings map each
+    token to per-document weighted frequencies; facet postings map each facet
+    value to the set of documents carrying it.
+    """
+
+    def __init__(self, treatment_db, disease_pests, pest_details):
+        self.documents = []
+        self._postings = defaultdict(dict)
+        self._facets = {facet: defaultdict(set) for facet in FACETS}
+        self._doc_facets = []
+
+        for disease, record in treatment_db.items():
+            pests = disease_pests.get(disease, ())
+            pest_types = sorted({pest.get('pest_type') for pest in pests if pest.get('pest_type')})
+            pest_text = []
+            for pest in pests:
+                details = pest_details.get(pest.get('scientific_name', '')) or pest_details.get(pest['pest_name'], {})
+                pest_text.extend(str(source[field]) for source in (pest, details)
+                                 for field in PEST_TEXT_FIELDS if field in source)
+
+            for kind in ('chemical', 'organic'):
+                for treatment in record.get(f'{kind}_treatments', ()):
+                    self._add_document(disease, record, kind, treatment, pests, pest_types, pest_text)
+
+        self._idf = {
+            token: math.log(1 + len(self.documents) / len(postings)) for token, postings in self._postings.items()
+        }
+        self._vocabulary = sorted(self._postings)
+        self._all = frozenset(range(len(self.documents)))
+
+    def _add_document(self, disease, record, kind, treatment, pests, pest_types, pest_text):
+        doc_id = len(self.documents)
+        name = treatment.get('product') or treatment.get('method', '')
+        self.documents.append({
+            'disease': disease,
+            'kind': kind,
+            'name': name,
+            'active_ingredient': treatment.get('active_ingredient'),
+            'pest_types': pest_types,
+            'pests': [pest['pest_name'] for pest in pests],
+            'urgency': record.get('urgency'),
+            'treatment': treatment
+        })
+
+        fields = {
+            'product': [name],
+            'active_ingredient': [treatment.get('active_ingredient', '')],
+            'pest_type': pest_types,
+            'pest': [pest['pest_name'] for pest in pests] + [pest.get('scientific_name', '') for pest in pests],
+            'disease': [disease],
+            'text': [treatment.get(field, '') for field in TREATMENT_TEXT_FIELDS]
+                    + [record.get('description', '')] + pest_text
+        }
+        for field, values in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for value in values:
+                for token in tokenize(value):
+                    postings = self._postings[token]
+                    postings[doc_id] = postings.get(doc_id, 0.0) + weight
+
+        facet_values = [('kind', kind), ('disease', disease.lower()), ('urgency', str(record.get('urgency')).lower())]
+        facet_values.extend(('pest_type', pest_type.lower()) for pest_type in pest_types)
+        for facet, value in facet_values:
+            self._facets[facet][value].add(doc_id)
+        self._doc_facets.append(tuple(facet_values))
+
+    @classmethod
+    def from_knowledge_base(cls):
+        from remedy_engine.treatment_database import TREATMENT_DATABASE
+        from pest_predictor.pest_database import DISEASE_PEST_MAPPING, PEST_DETAILS
+        return cls(TREATMENT_DATABASE, DISEASE_PEST_MAPPING, PEST_DETAILS)
+
+    def _filtered(self, filters):
+        """Documents matching every facet; several values of one facet are OR-ed"""
+        allowed = self._all
+        for facet, values in (filters or {}).items():
+            if facet not in self._facets or not values:
+                continue
+            matches = set()
+            for value in values:
+                matches |= self._facets[facet].get(normalize_facet_value(facet, value), set())
+            allowed = allowed & matches
+        return allowed
+
+    def _term_scores(self, term, allowed):
+        """Allowed documents matching a query term, exactly or as a prefix, with their best score"""
+        if len(term) < PREFIX_MIN_LENGTH:
+            tokens = [term] if term in self._postings else []
+        else:
+            tokens = []
+            position = bisect_left(self._vocabulary, term)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+                tokens.append(self._vocabulary[position])
+                position += 1
+
+        scores = {}
+        for token in tokens:
+            weight = self._idf[token] * (1.0 if token == term else PREFIX_WEIGHT)
+            for doc_id, tf in self._postings[token].items():
+                if doc_id in allowed and tf * weight > scores.get(doc_id, 0.0):
+                    scores[doc_id] = tf * weight
+        return scores
+
+    @staticmethod
+    def _match_all(term_scores):
+        scores = None
+        # Rarest term first keeps the candidate set small
+        for postings in sorted(term_scores, key=len):
+            if not postings:
+                return {}
+            if scores is None:
+                scores = dict(postings)
+            else:
+                scores = {doc_id: score + postings[doc_id] for doc_id, score in scores.items() if doc_id in postings}
+        return scores
+
+    @staticmethod
+    def _match_any(term_scores):
+        # Documents matching more of the terms rank first
+        scores, matched_terms = Counter(), Counter()
+        for postings in term_scores:
+            for doc_id, score in postings.items():
+                scores[doc_id] += score
+                matched_terms[doc_id] += 1
+        return {doc_id: score * matched_terms[doc_id] / len(term_scores) for doc_id, score in scores.items()}
+
+    def search(self, query='', filters=None, limit=20, offset=0):
+        """
+        Ranked search with facet filtering
+
+        Args:
+            query (str): Free text; results match every term, or any term when no result
+                matches them all (see 'match' in the result)
+            filters (dict): Facet name -> list of accepted values (kind, disease, pest_type, urgency)
+            limit (int): Maximum number of results
+            offset (int): Number of ranked results to skip
+
+        Returns:
+            dict: Total count, ranked results and facet counts over all matches
+        """
+        start = time.perf_counter()
+        allowed = self._filtered(filters)
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        match = 'all'
+        if terms:
+            term_scores = [self._term_scores(term, allowed) for term in terms]
+            matched = self._match_all(term_scores)
+            if not matched and len(terms) > 1:
+                match = 'any'
+                matched = self._match_any(term_scores)
+        else:
+            matched = dict.fromkeys(allowed, 0.0)
+
+        ranked = heapq.nsmallest(offset + limit, matched.items(), key=lambda item: (-item[1], item[0]))[offset:]
+
+        counts = Counter(pair for doc_id in matched for pair in self._doc_facets[doc_id])
+        facet_counts = {facet: {} for facet in FACETS}
+        for (facet, value), count in sorted(counts.items()):
+            facet_counts[facet][value] = count
+
+        results = []
+        for doc_id, score in ranked:
+            result = dict(self.documents[doc_id])
+            result['score'] = round(score, 4)
+            results.append(result)
+
+        return {
+            'query': query,
+            'filters': {facet: list(values) for facet, values in (filters or {}).items() if facet in FACETS},
+            'match': match,
+            'total': len(matched),
+            'results': results,
+            'facets': facet_counts,
+            'took_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
@@ -0,0 +1,300 @@
+"""
+Knowledge Store for Cotton Disease Detection
+Indexed SQLite copy of the treatment and pest knowledge base, loaded one record at a time
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+from urllib.request import pathname2url
+from config import Config
+from .frozen import freeze, thaw
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bump when the table layout changes so existing databases are rebuilt
+SCHEMA_VERSION = 1
+
+SOURCE_FILES = ('treatments.json', 'disease_pests.json', 'pest_details.json')
+
+SCHEMA = """
+CREATE TABLE treatments (
+    disease TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    urgency TEXT,
+    record TEXT NOT NULL
+);
+CREATE TABLE treatment_products (
+    disease TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    active_ingredient TEXT COLLATE NOCASE
+);
+CREATE INDEX idx_treatment_products_disease ON treatment_products (disease);
+CREATE INDEX idx_treatment_products_ingredient ON treatment_products (active_ingredient);
+CREATE INDEX idx_treatment_products_name ON treatment_products (name);
+CREATE TABLE pest_diseases (
+    disease TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE disease_pests (
+    disease TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    pest_name TEXT NOT NULL,
+    pest_type TEXT,
+    confidence REAL NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX idx_disease_pests_disease ON disease_pests (disease, position);
+CREATE INDEX idx_disease_pests_pest ON disease_pests (pest_name);
+CREATE TABLE pest_details (
+    pest_name TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+"""
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def load_sources(source_dir):
+    """
+    Read and validate the JSON knowledge-base sources
+
+    Returns:
+        tuple: (treatments, disease_pests, pest_details) dicts
+
+    Raises:
+        ValueError: If a source does not have the expected shape
+    """
+    sources = []
+    for name in SOURCE_FILES:
+        with open(os.path.join(source_dir, name), 'r', encoding='utf-8') as f:
+            sources.append(json.load(f))
+    treatments, disease_pests, pest_details = sources
+
+    for disease, record in treatments.items():
+        if not isinstance(record, dict) or 'urgency' not in record:
+            raise ValueError(f"treatments.json: entry for {disease!r} needs an 'urgency'")
+    for disease, pests in disease_pests.items():
+        for pest in pests:
+            if 'pest_name' not in pest or 'confidence' not in pest:
+                raise ValueError(f"disease_pests.json: pests of {disease!r} need 'pest_name' and 'confidence'")
+    for pest_name, record in pest_details.items():
+        if not isinstance(record, dict):
+            raise ValueError(f"pest_details.json: entry for {pest_name!r} must be an object")
+    return treatments, disease_pests, pest_details
+
+
+def build_database(source_dir, db_path):
+    """Build the SQLite store from the JSON sources, replacing db_path atomically"""
+    treatments, disease_pests, pest_details = load_sources(source_dir)
+
+    tmp_path = f'{db_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            'INSERT INTO treatments VALUES (?, ?, ?, ?)',
+            [(disease, position, record.get('urgency'), json.dumps(record))
+             for position, (disease, record) in enumerate(treatments.items())]
+        )
+        connection.executemany(
+            'INSERT INTO treatment_products VALUES (?, ?, ?, ?)',
+            [(disease, 'chemical', item.get('product', ''), item.get('active_ingredient'))
+             for disease, record in treatments.items() for item in record.get('chemical_treatments', [])]
+            + [(disease, 'organic', item.get('method', ''), None)
+               for disease, record in treatments.items() for item in record.get('organic_treatments', [])]
+        )
+        connection.executemany(
+            'INSERT INTO pest_diseases VALUES (?, ?)',
+            [(disease, position) for position, disease in enumerate(disease_pests)]
+        )
+        connection.executemany(
+            'INSERT INTO disease_pests VALUES (?, ?, ?, ?, ?, ?)',
+            [(disease, position, pest['pest_name'], pest.get('pest_type'), pest['confidence'], json.dumps(pest))
+             for disease, pests in disease_pests.items() for position, pest in enumerate(pests)]
+        )
+        connection.executemany(
+            'INSERT INTO pest_details VALUES (?, ?)',
+            [(pest_name, json.dumps(record)) for pest_name, record in pest_details.items()]
+        )
+        connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, db_path)
+
+
+def is_stale(db_path, source_dir):
+    """True when the database is missing, older than a source file or from another schema version"""
+    if not os.path.exists(db_path):
+        return True
+    built_at = os.path.getmtime(db_path)
+    if any(os.path.getmtime(os.path.join(source_dir, name)) > built_at for name in SOURCE_FILES):
+        return True
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION
+    finally:
+        connection.close()
+
+
+class KnowledgeStore:
+    """
+    Read-only access to the knowledge base, one record per query
+
+    The database is (re)built from the JSON sources on first use when it is stale.
+    Records are returned frozen, so the small per-store LRUs can share them safely;
+    store_view hands out plain dict/list copies to everything outside the engines.
+    """
+
+    def __init__(self, db_path=None, source_dir=None, cache_size=None):
+        self.db_path = _resolve(db_path or Config.KNOWLEDGE_DB_PATH)
+        self.source_dir = _resolve(source_dir or Config.KNOWLEDGE_SOURCE_DIR)
+        cache_size = Config.KNOWLEDGE_CACHE_SIZE if cache_size is None else cache_size
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+        self._ready = False
+
+        self.treatment = lru_cache(maxsize=cache_size)(self._load_treatment)
+        self.disease_pests = lru_cache(maxsize=cache_size)(self._load_disease_pests)
+        self.pest_details = lru_cache(maxsize=cache_size)(self._load_pest_details)
+        self.treatment_names = lru_cache(maxsize=1)(self._load_treatment_names)
+        self.pest_disease_names = lru_cache(maxsize=1)(self._load_pest_disease_names)
+        self.pest_names = lru_cache(maxsize=1)(self._load_pest_names)
+
+    def ensure_built(self):
+        with self._build_lock:
+            if self._ready:
+                return
+            if is_stale(self.db_path, self.source_dir):
+                try:
+                    build_database(self.source_dir, self.db_path)
+                except (OSError, sqlite3.Error):
+                    # Read-only checkout (sqlite3 reports an unwritable directory as
+                    # OperationalError): build a private copy in the temp directory instead
+                    self.db_path = os.path.join(tempfile.gettempdir(), 'cottonaid-knowledge.db')
+                    if is_stale(self.db_path, self.source_dir):
+                        build_database(self.source_dir, self.db_path)
+            self._ready = True
+
+    def _connection(self):
+        # One read-only connection per thread, reopened after a fork (gunicorn workers)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            self.ensure_built()
+            connection = sqlite3.connect(f'file:{pathname2url(self.db_path)}?mode=ro', uri=True)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def _load_treatment(self, disease_name):
+        rows = self._query('SELECT record FROM treatments WHERE disease = ?', (disease_name,))
+        return freeze(json.loads(rows[0][0])) if rows else None
+
+    def _load_disease_pests(self, disease_name):
+        if disease_name not in self.pest_disease_names():
+            return None
+        rows = self._query('SELECT record FROM disease_pests WHERE disease = ? ORDER BY position', (disease_name,))
+        return tuple(freeze(json.loads(record)) for record, in rows)
+
+    def _load_pest_details(self, pest_name):
+        rows = self._query('SELECT record FROM pest_details WHERE pest_name = ?', (pest_name,))
+        return freeze(json.loads(rows[0][0])) if rows else None
+
+    def _load_treatment_names(self):
+        return tuple(name for name, in self._query('SELECT disease FROM treatments ORDER BY position'))
+
+    def _load_pest_disease_names(self):
+        return tuple(name for name, in self._query('SELECT disease FROM pest_diseases ORDER BY position'))
+
+    def _load_pest_names(self):
+        return tuple(name for name, in self._query('SELECT pest_name FROM pest_details ORDER BY rowid'))
+
+    def diseases_for_pest(self, pest_name):
+        """Diseases whose pest list includes the given pest, in knowledge-base order"""
+        rows = self._query(
+            'SELECT DISTINCT p.disease FROM disease_pests p JOIN pest_diseases d ON d.disease = p.disease '
+            'WHERE p.pest_name = ? ORDER BY d.position', (pest_name,)
+        )
+        return [disease for disease, in rows]
+
+    def diseases_for_active_ingredient(self, ingredient):
+        """Diseases with a chemical treatment whose active ingredient starts with the given text"""
+        escaped = ingredient.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        rows = self._query(
+            "SELECT DISTINCT p.disease FROM treatment_products p JOIN treatments t ON t.disease = p.disease "
+            "WHERE p.active_ingredient LIKE ? ESCAPE '\\' ORDER BY t.position", (escaped + '%',)
+        )
+        return [disease for disease, in rows]
+
+    def cache_info(self):
+        """Hit/miss statistics of the per-record LRUs"""
+        return {
+            'treatment': self.treatment.cache_info(),
+            'disease_pests': self.disease_pests.cache_info(),
+            'pest_details': self.pest_details.cache_info()
+        }
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide store configured from Config"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = KnowledgeStore()
+    return _default_store
+
+
+class KnowledgeView(Mapping):
+    """Read-only dict-like view whose values are loaded on access (and passed through copy, if given)"""
+
+    def __init__(self, load, names, copy=None):
+        self._load = load
+        self._names = names
+        self._copy = copy
+
+    def __getitem__(self, key):
+        value = self._load(key)
+        if value is None:
+            raise KeyError(key)
+        return value if self._copy is None else self._copy(value)
+
+    def __contains__(self, key):
+        return self._load(key) is not None
+
+    def __iter__(self):
+        return iter(self._names())
+
+    def __len__(self):
+        return len(self._names())
+
+
+def store_view(record_method, names_method, frozen=False):
+    """
+    KnowledgeView over the default store; nothing is opened until the first access
+
+    Values are private dict/list copies, like the original in-code databases, unless
+    frozen=True: then the store's shared read-only records (FrozenDicts and tuples) are
+    returned, for callers that cache them.
+    """
+    return KnowledgeView(
+        lambda key: getattr(get_store(), record_method)(key),
+        lambda: getattr(get_store(), names_method)(),
+        copy=None if frozen else thaw
+    )
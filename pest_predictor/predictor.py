@@ -2,12 +2,22 @@
 Pest Predictor Component
 Predicts pests based on identified diseases with confidence scoring
 """
-from .pest_database import DISEASE_PEST_MAPPING, PEST_DETAILS, get_pest_info, get_all_pests_for_disease
+import numpy as np
+from knowledge_base.labels import to_knowledge_base_name
+from config import Config
+from .pest_database import DISEASE_PEST_MAPPING, PEST_DETAILS, PEST_INDEX, get_pest_matrix
 
 class PestPredictor:
     def __init__(self):
         self.pest_mapping = DISEASE_PEST_MAPPING
         self.pest_details = PEST_DETAILS
+        self.pest_index = PEST_INDEX
+        self._column_maps = {}
+
+    @property
+    def pest_matrix(self):
+        # Compiled on first vectorized prediction rather than at import
+        return get_pest_matrix()
     
     def predict_pests(self, disease_name, disease_confidence=1.0):
         """
@@ -20,27 +30,22 @@ class PestPredictor:
         Returns:
             list: List of predicted pests with confidence scores
         """
-        if disease_name not in self.pest_mapping:
+        records = self.pest_index.get(disease_name)
+        if records is None:
             return []
-        
-        pests = self.pest_mapping[disease_name]
-        
-        # Adjust pest confidence based on disease confidence
+
+        # Records are pre-merged with PEST_DETAILS and pre-sorted by base confidence;
+        # scaling by a positive disease confidence keeps that order
+        if disease_confidence <= 0:
+            records = sorted(records, key=lambda record: record.position)
+
         adjusted_pests = []
-        for pest in pests:
-            adjusted_pest = pest.copy()
+        for record in records:
+            adjusted_pest = record.fields.copy()
             # Adjust confidence: pest_confidence * disease_confidence
-            adjusted_pest['confidence'] = pest['confidence'] * disease_confidence
-            
-            # Add additional pest details
-            pest_details = get_pest_info(pest['pest_name'])
-            adjusted_pest.update(pest_details)
-            
+            adjusted_pest['confidence'] = record.confidence * disease_confidence
             adjusted_pests.append(adjusted_pest)
         
-        # Sort by confidence (highest first)
-        adjusted_pests.sort(key=lambda x: x['confidence'], reverse=True)
-        
         return adjusted_pests
     
     def predict_multiple_diseases(self, disease_predictions):
@@ -77,6 +82,80 @@ class PestPredictor:
         
         return result
     
+    def _disease_columns(self, class_labels):
+        """Map model output columns to matrix disease rows (-1 when the KB has no entry)"""
+        key = tuple(class_labels)
+        columns = self._column_maps.get(key)
+        if columns is None:
+            rows = {name: row for row, name in enumerate(self.pest_matrix.diseases)}
+            columns = np.array([rows.get(to_knowledge_base_name(label), -1) for label in key], dtype=np.intp)
+            self._column_maps[key] = columns
+        return columns
+
+    def pest_confidence_matrix(self, probabilities, class_labels=None):
+        """
+        Compute every pest's confidence for a batch of model outputs in one pass
+
+        Equivalent to predict_multiple_diseases over all classes: a pest's confidence is
+        the maximum over diseases of disease probability x base pest confidence.
+
+        Args:
+            probabilities (np.ndarray): Softmax output of shape (num_classes,) or (N, num_classes)
+            class_labels (list): Model class labels in output order (default: Config.DISEASE_CLASSES)
+
+        Returns:
+            np.ndarray: Pest confidences of shape (N, num_pests), columns ordered as pest_matrix.pests
+        """
+        probs = np.atleast_2d(np.asarray(probabilities, dtype=np.float32))
+        columns = self._disease_columns(class_labels or Config.DISEASE_CLASSES)
+        matrix = self.pest_matrix
+
+        # Scatter model columns onto knowledge-base disease rows
+        disease_probs = np.zeros((probs.shape[0], len(matrix.diseases)), dtype=np.float32)
+        known = columns >= 0
+        np.maximum.at(disease_probs.T, columns[known], probs[:, known].T)
+
+        contributions = disease_probs[:, matrix.disease_rows] * matrix.weights
+        return np.maximum.reduceat(contributions, matrix.indptr[:-1], axis=1)
+
+    def predict_from_probabilities(self, probabilities, class_labels=None, top_k=5, min_confidence=0.0):
+        """
+        Vectorized pest prediction from the full softmax vector (or a batch of them)
+
+        Args:
+            probabilities (np.ndarray): Shape (num_classes,) or (N, num_classes)
+            class_labels (list): Model class labels in output order
+            top_k (int): Number of pests to return per image
+            min_confidence (float): Drop pests below this confidence
+
+        Returns:
+            list: Pest dicts for a single vector, or a list of such lists for a batch
+        """
+        single = np.ndim(probabilities) == 1
+        confidences = self.pest_confidence_matrix(probabilities, class_labels)
+
+        top_k = min(top_k, confidences.shape[1])
+        if top_k <= 0:
+            return [] if single else [[] for _ in range(len(confidences))]
+        top = np.argpartition(-confidences, top_k - 1, axis=1)[:, :top_k]
+        order = np.argsort(-np.take_along_axis(confidences, top, axis=1), axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+
+        records = self.pest_matrix.records
+        results = []
+        for row, pest_columns in zip(confidences, top):
+            pests = []
+            for column in pest_columns:
+                confidence = float(row[column])
+                if confidence <= min_confidence:
+                    break
+                pest = records[column].fields.copy()
+                pest['confidence'] = confidence
+                pests.append(pest)
+            results.append(pests)
+
+        return results[0] if single else results
+
     def get_pest_management_priority(self, pests):
         """
         Determine management priority based on pest characteristics
@@ -119,17 +198,21 @@ class PestPredictor:
             'primary_pest': pests[0]['pest_name'] if pests else None
         }
     
-    def get_seasonal_risk_assessment(self, pests, current_season='unknown'):
+    def get_seasonal_risk_assessment(self, pests, current_season='unknown', weather_risk=None):
         """
         Assess seasonal risk factors for predicted pests
         
         Args:
             pests (list): List of predicted pests
             current_season (str): Current season (spring, summer, fall, winter)
+            weather_risk (dict): Optional WeatherRiskEngine.plot_risk result for the plot
             
         Returns:
             dict: Seasonal risk assessment
         """
+        if current_season == 'unknown' and weather_risk:
+            current_season = weather_risk.get('season', 'unknown')
+
         if not pests:
             return {'risk_level': 'low', 'recommendations': []}
         
@@ -171,8 +254,45 @@ class PestPredictor:
             risk_level = 'medium'
             recommendations = ['Monitor all pest types as season is unknown']
         
-        return {
+        assessment = {
             'risk_level': risk_level,
             'recommendations': recommendations,
             'seasonal_conditions': seasonal_factors.get(current_season, {}).get('conditions', 'Unknown')
+        }
+        if weather_risk:
+            self._apply_weather_risk(assessment, pests, weather_risk)
+        return assessment
+
+    def _apply_weather_risk(self, assessment, pests, weather_risk):
+        """Raise the seasonal risk level where recent weather favours the predicted pests"""
+        levels = ['low', 'medium', 'high']
+        scores = weather_risk.get('scores', {})
+
+        pest_risk = []
+        for pest in pests:
+            favourability = scores.get(pest['pest_type'])
+            if favourability is not None:
+                pest_risk.append({
+                    'pest_name': pest['pest_name'],
+                    'pest_type': pest['pest_type'],
+                    'favourability': favourability,
+                    'risk': round(pest['confidence'] * favourability, 3)
+                })
+        pest_risk.sort(key=lambda x: x['risk'], reverse=True)
+
+        top_risk = pest_risk[0]['risk'] if pest_risk else 0.0
+        weather_level = 'high' if top_risk >= 0.5 else 'medium' if top_risk >= 0.25 else 'low'
+        if assessment['risk_level'] in levels and levels.index(weather_level) > levels.index(assessment['risk_level']):
+            assessment['risk_level'] = weather_level
+
+        favoured = sorted({entry['pest_type'] for entry in pest_risk if entry['favourability'] >= 0.6})
+        if favoured:
+            assessment['recommendations'].append(
+                f"Recent weather favours {', '.join(favoured)} pests: scout affected plots within 2-3 days"
+            )
+        assessment['weather_risk'] = {
+            'date': weather_risk.get('date'),
+            'synthetic': weather_risk.get('synthetic', False),
+            'conditions': weather_risk.get('conditions'),
+            'pest_risk': pest_risk
         }
\ No newline at end of file
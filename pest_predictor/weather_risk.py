@@ -0,0 +1,256 @@
+"""
+Weather Risk Engine for Cotton Disease Detection
+Scores pest favourability from daily temperature, humidity and rainfall series per plot
+"""
+import csv
+import datetime
+import threading
+import warnings
+import zlib
+from collections import OrderedDict, namedtuple
+import numpy as np
+from config import Config
+
+# Favourable conditions per pest type:
+#   temperature: trapezoid (zero below, optimal from, optimal to, zero above) in degrees C
+#   humidity: relative humidity ramp (%); a reversed ramp means dry weather favours the pest
+#   humidity_weight / rainfall_weight: share of the moisture term; the rest is weather-neutral
+PEST_TYPE_PROFILES = {
+    'fungus': {'temperature': (12, 20, 30, 36), 'humidity': (60, 90), 'humidity_weight': 0.6, 'rainfall_weight': 0.3},
+    'bacteria': {'temperature': (18, 25, 35, 40), 'humidity': (65, 90), 'humidity_weight': 0.4, 'rainfall_weight': 0.5},
+    'insect': {'temperature': (18, 26, 35, 42), 'humidity': (90, 55), 'humidity_weight': 0.5, 'rainfall_weight': 0.0},
+    'virus': {'temperature': (18, 26, 35, 42), 'humidity': (90, 55), 'humidity_weight': 0.5, 'rainfall_weight': 0.0},
+    'nematode': {'temperature': (15, 24, 30, 36), 'humidity': (40, 70), 'humidity_weight': 0.3, 'rainfall_weight': 0.2}
+}
+
+# Daily rainfall (mm) at which the rain term saturates
+RAINFALL_SATURATION_MM = 10.0
+
+# Risk of every plot in a region on one date: scores[p, k] is the favourability of
+# pest_types[k] on plot plot_ids[p]; conditions[p] is (mean temp, mean humidity, total rain)
+RegionRisk = namedtuple('RegionRisk', ['region', 'date', 'plot_ids', 'pest_types', 'scores', 'conditions'])
+
+
+def season_for(date):
+    """Season name used by PestPredictor.get_seasonal_risk_assessment"""
+    if date.month in (3, 4, 5):
+        return 'spring'
+    if date.month in (6, 7, 8):
+        return 'summer'
+    if date.month in (9, 10, 11):
+        return 'fall'
+    return 'winter'
+
+
+def _profile_arrays(pest_types):
+    profiles = [PEST_TYPE_PROFILES[pest_type] for pest_type in pest_types]
+    temperature = np.array([profile['temperature'] for profile in profiles], dtype=np.float64)
+    humidity = np.array([profile['humidity'] for profile in profiles], dtype=np.float64)
+    weights = np.array([[profile['humidity_weight'], profile['rainfall_weight']] for profile in profiles])
+    return temperature, humidity, weights
+
+
+def favourability(temperature, humidity, rainfall, pest_types=None):
+    """
+    Daily favourability in [0, 1] of each pest type, for every plot and day at once
+
+    Args:
+        temperature, humidity, rainfall (np.ndarray): Daily series of shape (P, T); NaN for missing days
+        pest_types (list): Pest types to score (default: every type in PEST_TYPE_PROFILES)
+
+    Returns:
+        np.ndarray: Shape (P, T, K) for the K pest types
+    """
+    pest_types = list(pest_types or PEST_TYPE_PROFILES)
+    temp_profile, humidity_profile, weights = _profile_arrays(pest_types)
+    temperature = np.asarray(temperature, dtype=np.float64)[..., None]
+    humidity = np.asarray(humidity, dtype=np.float64)[..., None]
+    rainfall = np.asarray(rainfall, dtype=np.float64)[..., None]
+
+    rising = (temperature - temp_profile[:, 0]) / (temp_profile[:, 1] - temp_profile[:, 0])
+    falling = (temp_profile[:, 3] - temperature) / (temp_profile[:, 3] - temp_profile[:, 2])
+    temp_score = np.clip(np.minimum(rising, falling), 0.0, 1.0)
+
+    humidity_score = np.clip(
+        (humidity - humidity_profile[:, 0]) / (humidity_profile[:, 1] - humidity_profile[:, 0]), 0.0, 1.0
+    )
+    rain_score = np.clip(rainfall / RAINFALL_SATURATION_MM, 0.0, 1.0)
+
+    moisture = (weights[:, 0] * humidity_score + weights[:, 1] * rain_score
+                + (1.0 - weights[:, 0] - weights[:, 1]))
+    return temp_score * moisture
+
+
+def decayed_mean(values, half_life):
+    """NaN-aware mean over axis 1, weighting recent days more (half weight every half_life days)"""
+    days = values.shape[1]
+    weights = 0.5 ** ((days - 1 - np.arange(days)) / half_life)
+    weights = weights.reshape((1, days) + (1,) * (values.ndim - 2))
+    present = ~np.isnan(values)
+    total = np.where(present, weights, 0.0).sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        return np.where(total > 0, np.nansum(values * weights, axis=1) / total, np.nan)
+
+
+class CSVWeatherSource:
+    """
+    Daily plot weather from a local CSV file
+
+    Expected columns: region, plot_id, date (YYYY-MM-DD), temperature, humidity, rainfall
+    """
+
+    synthetic = False
+
+    def __init__(self, path):
+        self.path = path
+        self._regions = {}
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                plots = self._regions.setdefault(row['region'], {})
+                plots.setdefault(row['plot_id'], {})[datetime.date.fromisoformat(row['date'])] = (
+                    float(row['temperature']), float(row['humidity']), float(row['rainfall'] or 0.0)
+                )
+
+    def series(self, region, end_date, days):
+        """
+        Daily series ending on end_date (inclusive) for every plot of a region
+
+        Returns:
+            tuple: (plot_ids, temperature, humidity, rainfall), series of shape (P, days)
+        """
+        plots = self._regions.get(region, {})
+        plot_ids = sorted(plots)
+        values = np.full((len(plot_ids), days, 3), np.nan)
+        dates = [end_date - datetime.timedelta(days=days - 1 - i) for i in range(days)]
+        for p, plot_id in enumerate(plot_ids):
+            readings = plots[plot_id]
+            for t, date in enumerate(dates):
+                if date in readings:
+                    values[p, t] = readings[date]
+        return plot_ids, values[:, :, 0], values[:, :, 1], values[:, :, 2]
+
+
+class StubWeatherService:
+    """
+    Stand-in for a weather service: deterministic synthetic seasonal series per region
+
+    Used for development and load testing only; every result it feeds is marked synthetic.
+    """
+
+    synthetic = True
+
+    def __init__(self, plots_per_region=100):
+        self.plots_per_region = plots_per_region
+
+    def series(self, region, end_date, days):
+        rng = np.random.default_rng([zlib.crc32(region.encode('utf-8')), end_date.toordinal()])
+        plots = self.plots_per_region
+        day_of_year = (end_date.timetuple().tm_yday - np.arange(days)[::-1]) % 365
+        season = np.sin(2 * np.pi * (day_of_year - 110) / 365.0)
+        monsoon = np.sin(2 * np.pi * (day_of_year - 200) / 365.0)
+
+        plot_offset = rng.normal(0.0, 1.5, size=(plots, 1))
+        temperature = 27 + 8 * season + plot_offset + rng.normal(0.0, 2.0, size=(plots, days))
+        humidity = np.clip(65 + 20 * monsoon + rng.normal(0.0, 8.0, size=(plots, days)), 15, 100)
+        rain_days = rng.random((plots, days)) < np.clip(0.15 + 0.35 * monsoon, 0.02, 0.8)
+        rainfall = np.where(rain_days, rng.gamma(2.0, 6.0, size=(plots, days)), 0.0)
+
+        plot_ids = [f'{region}-{i:04d}' for i in range(plots)]
+        return plot_ids, temperature, humidity, rainfall
+
+
+def open_weather_source(spec=None):
+    """
+    'stub' for the synthetic stand-in service, otherwise a path to a CSV file
+
+    Raises:
+        ValueError: If no weather source is configured
+    """
+    spec = spec or Config.WEATHER_SOURCE
+    if not spec:
+        raise ValueError("WEATHER_SOURCE is not set")
+    if spec == 'stub':
+        print("Weather risk uses the synthetic stub service; set WEATHER_SOURCE to real data in production")
+        return StubWeatherService()
+    return CSVWeatherSource(spec)
+
+
+class WeatherRiskEngine:
+    def __init__(self, source=None, window_days=None, half_life=None, cache_size=None):
+        self.source = source or open_weather_source()
+        self.window_days = window_days or Config.WEATHER_WINDOW_DAYS
+        self.half_life = half_life or Config.WEATHER_HALF_LIFE_DAYS
+        self.cache_size = cache_size or Config.WEATHER_CACHE_SIZE
+        self.pest_types = tuple(PEST_TYPE_PROFILES)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def assess(self, region, date=None):
+        """
+        Favourability of every pest type for every plot of a region, cached per (region, date)
+
+        Returns:
+            RegionRisk
+        """
+        date = date or datetime.date.today()
+        key = (region, date)
+        with self._lock:
+            risk = self._cache.get(key)
+            if risk is not None:
+                self._cache.move_to_end(key)
+                return risk
+
+        plot_ids, temperature, humidity, rainfall = self.source.series(region, date, self.window_days)
+        daily = favourability(temperature, humidity, rainfall, self.pest_types)
+        scores = decayed_mean(daily, self.half_life)
+        with warnings.catch_warnings():
+            # Plots without any readings in the window get NaN conditions
+            warnings.simplefilter('ignore', RuntimeWarning)
+            conditions = np.stack([
+                np.nanmean(temperature, axis=1), np.nanmean(humidity, axis=1), np.nansum(rainfall, axis=1)
+            ], axis=-1)
+        risk = RegionRisk(region, date, tuple(plot_ids), self.pest_types, scores, conditions)
+
+        with self._lock:
+            self._cache[key] = risk
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return risk
+
+    def plot_risk(self, region, plot_id=None, date=None):
+        """
+        Weather risk for one plot, or the region average when plot_id is None
+
+        Returns:
+            dict: Pest-type favourability scores and recent conditions, or None for an unknown plot;
+                'synthetic' is True when the weather came from the stub service
+        """
+        risk = self.assess(region, date)
+        if plot_id is None:
+            rows = slice(None)
+        elif plot_id in risk.plot_ids:
+            rows = risk.plot_ids.index(plot_id)
+        else:
+            return None
+        if not risk.plot_ids:
+            return None
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            scores = np.nanmean(np.atleast_2d(risk.scores[rows]), axis=0)
+            conditions = np.nanmean(np.atleast_2d(risk.conditions[rows]), axis=0)
+        return {
+            'region': region,
+            'plot_id': plot_id,
+            'date': risk.date.isoformat(),
+            'season': season_for(risk.date),
+            'synthetic': getattr(self.source, 'synthetic', False),
+            'scores': {pest_type: round(float(score), 3)
+                       for pest_type, score in zip(risk.pest_types, scores) if not np.isnan(score)},
+            'conditions': {
+                'mean_temperature': None if np.isnan(conditions[0]) else round(float(conditions[0]), 1),
+                'mean_humidity': None if np.isnan(conditions[1]) else round(float(conditions[1]), 1),
+                'total_rainfall': round(float(conditions[2]), 1),
+                'days': self.window_days
+            }
+        }
@@ -2,14 +2,199 @@
 Remedy Engine for Cotton Disease Management
 Provides treatment recommendations based on disease and pest information
 """
-from .treatment_database import TREATMENT_DATABASE, get_treatment_info, get_urgency_level
+from .treatment_database import TREATMENT_DATABASE, TREATMENT_RECORDS, get_urgency_level
+from knowledge_base.frozen import FrozenDict, freeze, thaw
+from functools import lru_cache
 import datetime
+import numpy as np
+
+
+def season_bucket(month):
+    """Group a month into the seasons used for application timing notes"""
+    if month in (6, 7, 8):
+        return 'summer'
+    if month in (12, 1, 2):
+        return 'winter'
+    return 'spring_fall'
+
+
+SEASONAL_NOTES = {
+    'summer': 'Avoid midday applications due to heat. Ensure adequate water for plant recovery.',
+    'winter': 'Apply during warmer parts of the day. Allow time for drying before evening.',
+    'spring_fall': 'Optimal conditions for most treatments. Monitor weather forecasts.'
+}
+
+TIMING_RECOMMENDATIONS = freeze({
+    'critical': {
+        'immediate_action': 'Apply treatment within 24 hours',
+        'follow_up': 'Monitor daily, retreat if necessary after 7 days',
+        'best_time': 'Early morning or late evening to avoid heat stress'
+    },
+    'high': {
+        'immediate_action': 'Apply treatment within 2-3 days',
+        'follow_up': 'Monitor every 2-3 days, retreat after 10-14 days if needed',
+        'best_time': 'Early morning or late evening'
+    },
+    'medium': {
+        'immediate_action': 'Apply treatment within 1 week',
+        'follow_up': 'Monitor weekly, retreat after 14-21 days if needed',
+        'best_time': 'Morning hours when dew has dried'
+    },
+    'low': {
+        'immediate_action': 'Consider treatment within 2 weeks',
+        'follow_up': 'Monitor bi-weekly, apply preventive measures',
+        'best_time': 'Any time during favorable weather'
+    },
+    'none': {
+        'immediate_action': 'Continue monitoring',
+        'follow_up': 'Maintain preventive practices',
+        'best_time': 'N/A'
+    }
+})
+
+COST_OPTIONS = freeze({
+    'chemical_treatments': {
+        'cost_level': 'medium-high',
+        'effectiveness': 'high',
+        'notes': 'Higher upfront cost but quick results'
+    },
+    'organic_treatments': {
+        'cost_level': 'low-medium',
+        'effectiveness': 'medium',
+        'notes': 'Lower cost, environmentally friendly, may require multiple applications'
+    },
+    'prevention': {
+        'cost_level': 'low',
+        'effectiveness': 'high',
+        'notes': 'Most cost-effective long-term strategy'
+    }
+})
+
+ENVIRONMENTAL_IMPACT = freeze({
+    'chemical_treatments': {
+        'environmental_risk': 'medium-high',
+        'considerations': [
+            'Potential impact on beneficial insects',
+            'Risk of pesticide resistance development',
+            'Possible soil and water contamination',
+            'Follow label instructions strictly'
+        ]
+    },
+    'organic_treatments': {
+        'environmental_risk': 'low',
+        'considerations': [
+            'Generally safe for beneficial organisms',
+            'Biodegradable and sustainable',
+            'May require more frequent applications',
+            'Support natural ecosystem balance'
+        ]
+    },
+    'cultural_practices': {
+        'environmental_risk': 'very low',
+        'considerations': [
+            'Enhance soil health and biodiversity',
+            'Reduce dependency on external inputs',
+            'Sustainable long-term approach',
+            'Support integrated pest management'
+        ]
+    }
+})
+
+PEST_TYPE_TREATMENTS = freeze({
+    'insect': {
+        'treatment_type': 'Insecticide',
+        'recommendations': [
+            'Use systemic insecticides for sucking pests',
+            'Apply contact insecticides for chewing pests',
+            'Consider biological control agents',
+            'Implement integrated pest management'
+        ]
+    },
+    'fungus': {
+        'treatment_type': 'Fungicide',
+        'recommendations': [
+            'Use preventive fungicide applications',
+            'Ensure good spray coverage',
+            'Rotate fungicide modes of action',
+            'Improve cultural practices'
+        ]
+    },
+    'bacteria': {
+        'treatment_type': 'Bactericide',
+        'recommendations': [
+            'Use copper-based bactericides',
+            'Apply during cool, humid conditions',
+            'Implement sanitation measures',
+            'Use resistant varieties when available'
+        ]
+    },
+    'virus': {
+        'treatment_type': 'Vector Control',
+        'recommendations': [
+            'Control insect vectors',
+            'Remove infected plants immediately',
+            'Use virus-resistant varieties',
+            'Implement quarantine measures'
+        ]
+    }
+})
+
+
+# Urgency scale shared by the scalar and batch urgency calculations
+URGENCY_SCORES = {'none': 0, 'low': 1, 'medium': 2, 'high': 3}
+URGENCY_LEVELS = ('none', 'low', 'medium', 'high', 'critical')
+URGENCY_THRESHOLDS = (0.5, 1.5, 2.5, 3.5)
+
+
+@lru_cache(maxsize=None)
+def _application_timing(urgency, season):
+    timing = dict(TIMING_RECOMMENDATIONS.get(urgency, TIMING_RECOMMENDATIONS['medium']))
+    timing['seasonal_note'] = SEASONAL_NOTES[season]
+    return FrozenDict(timing)
+
+
+@lru_cache(maxsize=None)
+def _cost_analysis(has_chemical, has_organic):
+    cost_analysis = dict(COST_OPTIONS)
+    if has_chemical and has_organic:
+        cost_analysis['recommendation'] = 'Consider integrated approach: start with organic methods, use chemicals if needed'
+    elif has_chemical:
+        cost_analysis['recommendation'] = 'Chemical treatments available - use judiciously to prevent resistance'
+    elif has_organic:
+        cost_analysis['recommendation'] = 'Organic treatments preferred - may require patience for results'
+    else:
+        cost_analysis['recommendation'] = 'Focus on prevention and cultural practices'
+    return FrozenDict(cost_analysis)
+
+
+@lru_cache(maxsize=256)
+def _recommendation_fragments(disease_name, urgency, season):
+    """
+    Immutable recommendation body for one (disease, urgency level, season bucket)
+
+    Everything except the pest-specific treatments depends only on this key, so it is
+    built once and shared; public methods hand callers a thawed (dict/list) copy.
+    """
+    treatment_info = dict(TREATMENT_RECORDS[disease_name])  # store records are already frozen
+    treatment_info['calculated_urgency'] = urgency
+    treatment_info['application_timing'] = _application_timing(urgency, season)
+    treatment_info['cost_analysis'] = _cost_analysis(
+        bool(treatment_info.get('chemical_treatments')), bool(treatment_info.get('organic_treatments'))
+    )
+    treatment_info['environmental_impact'] = ENVIRONMENTAL_IMPACT
+    return FrozenDict(treatment_info)
+
+
+def recommendation_cache_info():
+    """Hit/miss statistics of the shared recommendation fragment cache"""
+    return _recommendation_fragments.cache_info()
 
 class RemedyEngine:
     def __init__(self):
         self.treatment_db = TREATMENT_DATABASE
         
-    def get_treatment_recommendations(self, disease_name, pest_info=None, disease_confidence=1.0):
+    def get_treatment_recommendations(self, disease_name, pest_info=None, disease_confidence=1.0,
+                                      as_of=None, weather_risk=None):
         """
         Get comprehensive treatment recommendations for identified disease
         
@@ -17,46 +202,39 @@ class RemedyEngine:
             disease_name (str): Name of the identified disease
             pest_info (list): List of predicted pests
             disease_confidence (float): Confidence score of disease prediction
+            as_of (datetime.date): Date used for seasonal timing (default: today)
+            weather_risk (dict): Optional WeatherRiskEngine.plot_risk result for the plot
             
         Returns:
-            dict: Comprehensive treatment recommendations
+            dict: Comprehensive treatment recommendations (a private copy the caller may modify)
         """
         if disease_name not in self.treatment_db:
             return self._get_default_recommendations()
         
-        treatment_info = self.treatment_db[disease_name].copy()
-        
         # Calculate urgency based on disease confidence and pest information
         urgency = self._calculate_urgency(disease_name, disease_confidence, pest_info)
-        treatment_info['calculated_urgency'] = urgency
+        if as_of is None and weather_risk and weather_risk.get('date'):
+            as_of = datetime.date.fromisoformat(weather_risk['date'])
+        season = season_bucket((as_of or datetime.date.today()).month)
+        
+        # Shared read-only fragments: base treatments, timing, cost and environmental analysis
+        treatment_info = dict(_recommendation_fragments(disease_name, urgency, season))
+        if weather_risk:
+            treatment_info['application_timing'] = self._weather_adjusted_timing(
+                treatment_info['application_timing'], weather_risk
+            )
         
         # Add pest-specific recommendations if available
         if pest_info:
             treatment_info['pest_specific_treatments'] = self._get_pest_specific_treatments(pest_info)
         
-        # Add timing recommendations
-        treatment_info['application_timing'] = self._get_application_timing(disease_name, urgency)
-        
-        # Add cost-effectiveness analysis
-        treatment_info['cost_analysis'] = self._analyze_treatment_costs(treatment_info)
-        
-        # Add environmental considerations
-        treatment_info['environmental_impact'] = self._assess_environmental_impact(treatment_info)
-        
-        return treatment_info
+        return thaw(treatment_info)
     
     def _calculate_urgency(self, disease_name, disease_confidence, pest_info):
         """Calculate treatment urgency based on multiple factors"""
         base_urgency = get_urgency_level(disease_name)
         
-        urgency_scores = {
-            'none': 0,
-            'low': 1,
-            'medium': 2,
-            'high': 3
-        }
-        
-        base_score = urgency_scores.get(base_urgency, 1)
+        base_score = URGENCY_SCORES.get(base_urgency, 1)
         
         # Adjust based on disease confidence
         if disease_confidence >= 0.9:
@@ -94,169 +272,46 @@ class RemedyEngine:
         pest_treatments = []
         
         for pest in pest_info:
-            pest_type = pest.get('pest_type', 'unknown')
-            pest_name = pest.get('pest_name', 'Unknown')
-            
-            if pest_type == 'insect':
-                pest_treatments.append({
-                    'target': pest_name,
-                    'treatment_type': 'Insecticide',
-                    'recommendations': [
-                        'Use systemic insecticides for sucking pests',
-                        'Apply contact insecticides for chewing pests',
-                        'Consider biological control agents',
-                        'Implement integrated pest management'
-                    ]
-                })
-            elif pest_type == 'fungus':
-                pest_treatments.append({
-                    'target': pest_name,
-                    'treatment_type': 'Fungicide',
-                    'recommendations': [
-                        'Use preventive fungicide applications',
-                        'Ensure good spray coverage',
-                        'Rotate fungicide modes of action',
-                        'Improve cultural practices'
-                    ]
-                })
-            elif pest_type == 'bacteria':
-                pest_treatments.append({
-                    'target': pest_name,
-                    'treatment_type': 'Bactericide',
-                    'recommendations': [
-                        'Use copper-based bactericides',
-                        'Apply during cool, humid conditions',
-                        'Implement sanitation measures',
-                        'Use resistant varieties when available'
-                    ]
-                })
-            elif pest_type == 'virus':
+            template = PEST_TYPE_TREATMENTS.get(pest.get('pest_type', 'unknown'))
+            if template is not None:
                 pest_treatments.append({
-                    'target': pest_name,
-                    'treatment_type': 'Vector Control',
-                    'recommendations': [
-                        'Control insect vectors',
-                        'Remove infected plants immediately',
-                        'Use virus-resistant varieties',
-                        'Implement quarantine measures'
-                    ]
+                    'target': pest.get('pest_name', 'Unknown'),
+                    'treatment_type': template['treatment_type'],
+                    'recommendations': template['recommendations']
                 })
         
         return pest_treatments
     
-    def _get_application_timing(self, disease_name, urgency):
+    def _get_application_timing(self, disease_name, urgency, as_of=None):
         """Get specific timing recommendations for treatments"""
-        current_time = datetime.datetime.now()
-        
-        timing_recommendations = {
-            'critical': {
-                'immediate_action': 'Apply treatment within 24 hours',
-                'follow_up': 'Monitor daily, retreat if necessary after 7 days',
-                'best_time': 'Early morning or late evening to avoid heat stress'
-            },
-            'high': {
-                'immediate_action': 'Apply treatment within 2-3 days',
-                'follow_up': 'Monitor every 2-3 days, retreat after 10-14 days if needed',
-                'best_time': 'Early morning or late evening'
-            },
-            'medium': {
-                'immediate_action': 'Apply treatment within 1 week',
-                'follow_up': 'Monitor weekly, retreat after 14-21 days if needed',
-                'best_time': 'Morning hours when dew has dried'
-            },
-            'low': {
-                'immediate_action': 'Consider treatment within 2 weeks',
-                'follow_up': 'Monitor bi-weekly, apply preventive measures',
-                'best_time': 'Any time during favorable weather'
-            },
-            'none': {
-                'immediate_action': 'Continue monitoring',
-                'follow_up': 'Maintain preventive practices',
-                'best_time': 'N/A'
-            }
-        }
-        
-        base_timing = timing_recommendations.get(urgency, timing_recommendations['medium'])
-        
-        # Add seasonal considerations
-        month = current_time.month
-        if month in [6, 7, 8]:  # Summer months
-            base_timing['seasonal_note'] = 'Avoid midday applications due to heat. Ensure adequate water for plant recovery.'
-        elif month in [12, 1, 2]:  # Winter months
-            base_timing['seasonal_note'] = 'Apply during warmer parts of the day. Allow time for drying before evening.'
-        elif month in [3, 4, 5, 9, 10, 11]:  # Spring/Fall
-            base_timing['seasonal_note'] = 'Optimal conditions for most treatments. Monitor weather forecasts.'
-        
-        return base_timing
+        return _application_timing(urgency, season_bucket((as_of or datetime.date.today()).month))
+
+    def _weather_adjusted_timing(self, timing, weather_risk):
+        """Timing recommendations with notes from the plot's recent weather"""
+        conditions = weather_risk.get('conditions') or {}
+        notes = []
+        if (conditions.get('mean_temperature') or 0) >= 35:
+            notes.append('Recent heat: spray only in early morning or late evening')
+        if (conditions.get('mean_humidity') or 0) >= 85:
+            notes.append('High humidity: apply protectants early so foliage dries before night')
+        if (conditions.get('total_rainfall') or 0) >= 3 * conditions.get('days', 14):
+            notes.append('Wet spell: wait for a dry window of at least 6 hours and prefer rainfast products')
+
+        timing = dict(timing)
+        timing['weather_notes'] = notes or ['Recent weather does not restrict application timing']
+        timing['weather_date'] = weather_risk.get('date')
+        timing['weather_synthetic'] = weather_risk.get('synthetic', False)
+        return timing
     
     def _analyze_treatment_costs(self, treatment_info):
         """Analyze cost-effectiveness of different treatment options"""
-        cost_analysis = {
-            'chemical_treatments': {
-                'cost_level': 'medium-high',
-                'effectiveness': 'high',
-                'notes': 'Higher upfront cost but quick results'
-            },
-            'organic_treatments': {
-                'cost_level': 'low-medium',
-                'effectiveness': 'medium',
-                'notes': 'Lower cost, environmentally friendly, may require multiple applications'
-            },
-            'prevention': {
-                'cost_level': 'low',
-                'effectiveness': 'high',
-                'notes': 'Most cost-effective long-term strategy'
-            }
-        }
-        
-        # Add specific cost recommendations
-        chemical_count = len(treatment_info.get('chemical_treatments', []))
-        organic_count = len(treatment_info.get('organic_treatments', []))
-        
-        if chemical_count > 0 and organic_count > 0:
-            cost_analysis['recommendation'] = 'Consider integrated approach: start with organic methods, use chemicals if needed'
-        elif chemical_count > 0:
-            cost_analysis['recommendation'] = 'Chemical treatments available - use judiciously to prevent resistance'
-        elif organic_count > 0:
-            cost_analysis['recommendation'] = 'Organic treatments preferred - may require patience for results'
-        else:
-            cost_analysis['recommendation'] = 'Focus on prevention and cultural practices'
-        
-        return cost_analysis
+        return _cost_analysis(
+            bool(treatment_info.get('chemical_treatments')), bool(treatment_info.get('organic_treatments'))
+        )
     
     def _assess_environmental_impact(self, treatment_info):
         """Assess environmental impact of treatment options"""
-        impact_assessment = {
-            'chemical_treatments': {
-                'environmental_risk': 'medium-high',
-                'considerations': [
-                    'Potential impact on beneficial insects',
-                    'Risk of pesticide resistance development',
-                    'Possible soil and water contamination',
-                    'Follow label instructions strictly'
-                ]
-            },
-            'organic_treatments': {
-                'environmental_risk': 'low',
-                'considerations': [
-                    'Generally safe for beneficial organisms',
-                    'Biodegradable and sustainable',
-                    'May require more frequent applications',
-                    'Support natural ecosystem balance'
-                ]
-            },
-            'cultural_practices': {
-                'environmental_risk': 'very low',
-                'considerations': [
-                    'Enhance soil health and biodiversity',
-                    'Reduce dependency on external inputs',
-                    'Sustainable long-term approach',
-                    'Support integrated pest management'
-                ]
-            }
-        }
-        
-        return impact_assessment
+        return ENVIRONMENTAL_IMPACT
     
     def _get_default_recommendations(self):
         """Get default recommendations for unknown diseases"""
@@ -292,13 +347,15 @@ class RemedyEngine:
             }
         }
     
-    def get_integrated_management_plan(self, disease_predictions, pest_predictions):
+    def get_integrated_management_plan(self, disease_predictions, pest_predictions, as_of=None, weather_risk=None):
         """
         Create an integrated management plan for multiple diseases and pests
         
         Args:
             disease_predictions (list): List of disease predictions
             pest_predictions (list): List of pest predictions
+            as_of (datetime.date): Date used for seasonal timing (default: today)
+            weather_risk (dict): Optional WeatherRiskEngine.plot_risk result for the plot
             
         Returns:
             dict: Integrated management plan
@@ -312,7 +369,7 @@ class RemedyEngine:
         
         # Get comprehensive recommendations for primary disease
         primary_recommendations = self.get_treatment_recommendations(
-            primary_disease, pest_predictions, primary_confidence
+            primary_disease, pest_predictions, primary_confidence, as_of=as_of, weather_risk=weather_risk
         )
         
         # Add considerations for secondary diseases
@@ -321,12 +378,137 @@ class RemedyEngine:
             primary_recommendations['secondary_considerations'] = []
             for disease_pred in secondary_diseases:
                 if disease_pred['confidence'] >= 0.3:  # Only consider if reasonably confident
-                    secondary_info = get_treatment_info(disease_pred['disease'])
+                    secondary_info = TREATMENT_RECORDS.get(disease_pred['disease'], {})
                     primary_recommendations['secondary_considerations'].append({
                         'disease': disease_pred['disease'],
                         'confidence': disease_pred['confidence'],
-                        'key_treatments': secondary_info.get('chemical_treatments', [])[:2],  # Top 2
-                        'prevention': secondary_info.get('prevention', [])[:3]  # Top 3
+                        'key_treatments': thaw(secondary_info.get('chemical_treatments', ())[:2]),  # Top 2
+                        'prevention': thaw(secondary_info.get('prevention', ())[:3])  # Top 3
                     })
         
-        return primary_recommendations
\ No newline at end of file
+        return primary_recommendations
+
+    def batch_urgency(self, disease_names, disease_confidences, pest_confidences=None):
+        """
+        Vectorized _calculate_urgency for many plots at once
+
+        Args:
+            disease_names (list): Knowledge-base name of each plot's primary disease
+            disease_confidences (np.ndarray): Primary disease confidence per plot, shape (N,)
+            pest_confidences (np.ndarray): Optional pest confidences, shape (N, P)
+
+        Returns:
+            tuple: (urgency scores of shape (N,), urgency level indices into URGENCY_LEVELS)
+        """
+        base_scores = np.array(
+            [URGENCY_SCORES.get(get_urgency_level(name), 1) for name in disease_names], dtype=np.float64
+        )
+        confidences = np.asarray(disease_confidences, dtype=np.float64)
+        confidence_modifier = np.select([confidences >= 0.9, confidences >= 0.7], [1.2, 1.0], 0.8)
+
+        pest_modifier = np.ones_like(confidences)
+        if pest_confidences is not None and np.shape(pest_confidences)[1]:
+            top_pest = np.asarray(pest_confidences, dtype=np.float64).max(axis=1)
+            pest_modifier = np.select([top_pest >= 0.8, top_pest >= 0.6], [1.3, 1.1], 1.0)
+
+        scores = base_scores * confidence_modifier * pest_modifier
+        return scores, np.searchsorted(URGENCY_THRESHOLDS, scores, side='right')
+
+    def plan_batch(self, disease_confidences, disease_names, pest_confidences=None, pest_columns=None,
+                   min_pest_confidence=0.5, month=None):
+        """
+        Management plans for many plots, built once per distinct outcome
+
+        Plots are grouped by (primary disease, urgency level, secondary diseases,
+        pests present); each group shares one plan, so thousands of plots usually
+        need only a handful of plans. Plans have the shape of get_integrated_management_plan,
+        except that secondary considerations carry 'confidence': None (a plan is shared by
+        plots with different confidences) and pest-specific treatments follow pest column order.
+
+        Args:
+            disease_confidences (np.ndarray): Disease confidences, shape (N, D)
+            disease_names (list): Knowledge-base disease name of each of the D columns
+            pest_confidences (np.ndarray): Optional pest confidences, shape (N, P)
+            pest_columns (list): Pest dicts (pest_name, pest_type) describing the P columns
+            min_pest_confidence (float): A pest counts as present at or above this confidence
+            month (int): Month used for seasonal timing notes (default: current month)
+
+        Returns:
+            dict: 'plans' (list of shared plans), 'plan_index' (N,) into plans,
+                'urgency_scores' (N,) and 'urgency_levels' (N,) arrays
+        """
+        probs = np.atleast_2d(np.asarray(disease_confidences, dtype=np.float64))
+        num_plots, num_diseases = probs.shape
+        names = np.array(list(disease_names), dtype=object)
+        if len(names) != num_diseases:
+            raise ValueError(f"Expected {num_diseases} disease names, got {len(names)}")
+
+        if pest_confidences is not None:
+            pest_confidences = np.atleast_2d(np.asarray(pest_confidences, dtype=np.float64))
+            if pest_columns is None or len(pest_columns) != pest_confidences.shape[1]:
+                raise ValueError("pest_columns must describe every pest confidence column")
+        else:
+            pest_confidences = np.zeros((num_plots, 0))
+            pest_columns = []
+
+        # Top three diseases per plot, highest first (stable for ties like a sorted list)
+        order = np.argsort(-probs, axis=1, kind='stable')[:, :3]
+        primary = order[:, 0]
+        primary_confidence = probs[np.arange(num_plots), primary]
+
+        scores, levels = self.batch_urgency(names[primary], primary_confidence, pest_confidences)
+
+        # Secondary diseases considered by get_integrated_management_plan: ranks 2-3 with >= 0.3
+        secondary = np.full((num_plots, 2), -1, dtype=np.int64)
+        for rank in (1, 2):
+            if rank < num_diseases:
+                column = order[:, rank]
+                confident = probs[np.arange(num_plots), column] >= 0.3
+                secondary[confident, rank - 1] = column[confident]
+
+        known = np.array([name in self.treatment_db for name in names], dtype=bool)
+        # Unknown primaries all share the default plan regardless of urgency
+        level_key = np.where(known[primary], levels, -1)
+
+        pests_present = pest_confidences >= min_pest_confidence
+        keys = np.column_stack([primary, level_key, secondary, np.packbits(pests_present, axis=1)]
+                               if pests_present.shape[1] else [primary, level_key, secondary])
+        unique_keys, first_plot, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+
+        season = season_bucket(month or datetime.datetime.now().month)
+        plans = []
+        for key_row, group in zip(unique_keys, first_plot):
+            plans.append(self._batch_plan(
+                names[key_row[0]], URGENCY_LEVELS[levels[group]], season,
+                [names[column] for column in key_row[2:4] if column >= 0],
+                [pest_columns[column] for column in np.flatnonzero(pests_present[group])],
+                has_secondary=num_diseases > 1
+            ))
+
+        return {
+            'plans': plans,
+            'plan_index': inverse.reshape(-1),
+            'urgency_scores': scores,
+            'urgency_levels': np.array(URGENCY_LEVELS, dtype=object)[levels]
+        }
+
+    def _batch_plan(self, disease_name, urgency, season, secondary_diseases, pests, has_secondary=True):
+        """One shared plan of plan_batch"""
+        if disease_name not in self.treatment_db:
+            return self._get_default_recommendations()
+
+        plan = dict(_recommendation_fragments(disease_name, urgency, season))
+        if pests:
+            plan['pest_specific_treatments'] = self._get_pest_specific_treatments(pests)
+        if has_secondary:
+            # Present (possibly empty) whenever there are secondary predictions, like the scalar plan
+            plan['secondary_considerations'] = []
+            for secondary_disease in secondary_diseases:
+                secondary_info = TREATMENT_RECORDS.get(secondary_disease, {})
+                plan['secondary_considerations'].append({
+                    'disease': secondary_disease,
+                    'confidence': None,
+                    'key_treatments': secondary_info.get('chemical_treatments', ())[:2],
+                    'prevention': secondary_info.get('prevention', ())[:3]
+                })
+        return thaw(plan)
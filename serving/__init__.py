@@ -0,0 +1 @@
+# Serving Module
\ No newline at end of file
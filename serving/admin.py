@@ -0,0 +1,27 @@
+"""
+Admin Access for Cotton Disease Detection
+Token check for operational endpoints (profiling, memory diagnostics)
+"""
+import hmac
+from functools import wraps
+from flask import jsonify, request
+from config import Config
+
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def admin_required(view):
+    """
+    Reject requests without the configured admin token
+
+    Admin endpoints are disabled entirely (404) when ADMIN_TOKEN is not set.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({'error': 'Not found'}), 404
+        token = request.headers.get(ADMIN_TOKEN_HEADER, '')
+        if not hmac.compare_digest(token.encode('utf-8'), Config.ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({'error': 'Invalid admin token'}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,166 @@
+"""
+Capacity Tuning for Cotton Disease Detection
+Sweeps worker processes, TensorFlow thread pools and batch size under synthetic load
+"""
+import json
+import multiprocessing
+import os
+import platform
+import time
+import numpy as np
+from config import Config
+
+
+def host_cpus():
+    """CPUs this process may run on (respects affinity masks and container cpusets)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def configure_tensorflow_threads(intra_op=None, inter_op=None):
+    """
+    Size TensorFlow's thread pools before the runtime starts (0 keeps TensorFlow's default)
+
+    Must run before the first model is loaded; later calls are ignored with a warning.
+    """
+    import tensorflow as tf
+    intra_op = Config.TF_INTRA_OP_THREADS if intra_op is None else intra_op
+    inter_op = Config.TF_INTER_OP_THREADS if inter_op is None else inter_op
+    try:
+        if intra_op:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        if inter_op:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        print(f"TensorFlow threads already initialized, keeping defaults: {e}")
+    return intra_op, inter_op
+
+
+def thread_candidates(cpus, worker_counts=None, inter_ops=(1, 2), oversubscribe=False):
+    """
+    (workers, intra_op, inter_op) combinations for the thread sweep
+
+    By default each worker gets an equal share of the cores (or half a share), so
+    workers x intra_op never exceeds the CPU count.
+    """
+    if worker_counts is None:
+        worker_counts, count = [], 1
+        while count <= cpus:
+            worker_counts.append(count)
+            count *= 2
+    candidates = []
+    for workers in worker_counts:
+        share = max(cpus // workers, 1)
+        intra_ops = {share, max(share // 2, 1)}
+        if oversubscribe:
+            intra_ops.add(cpus)
+        for intra_op in sorted(intra_ops, reverse=True):
+            for inter_op in inter_ops:
+                candidates.append((workers, intra_op, inter_op))
+    return candidates
+
+
+def _load_worker(model_path, intra_op, inter_op, batch_size, duration, warmup, barrier, results):
+    """One simulated server worker: load the model, then predict back-to-back until the deadline"""
+    configure_tensorflow_threads(intra_op, inter_op)
+    from tensorflow.keras.models import load_model
+    model = load_model(model_path, compile=False)
+    shape = (batch_size,) + tuple(model.input_shape[1:])
+    batch = np.random.default_rng(os.getpid()).random(shape, dtype=np.float32)
+    for _ in range(warmup):
+        model.predict(batch, verbose=0)
+
+    barrier.wait()
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        model.predict(batch, verbose=0)
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def measure(model_path, workers, intra_op, inter_op, batch_size, duration=10.0, warmup=3):
+    """
+    Closed-loop load from `workers` processes at once
+
+    Every image in a batch waits for the whole batch, so a request's latency is its
+    batch's latency.
+
+    Returns:
+        dict: The configuration with images/s, p50 and p99 latency (ms)
+    """
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_load_worker,
+                        args=(model_path, intra_op, inter_op, batch_size, duration, warmup, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    latencies = []
+    try:
+        for _ in processes:
+            latencies.extend(results.get(timeout=duration + 600))
+    finally:
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+    latencies = np.asarray(latencies) * 1000
+    return {
+        'workers': workers,
+        'intra_op_threads': intra_op,
+        'inter_op_threads': inter_op,
+        'batch_size': batch_size,
+        'images_per_sec': round(len(latencies) * batch_size / duration, 2),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2)
+    }
+
+
+def best(results, p99_budget_ms=None, tolerance=0.05):
+    """
+    Lowest p99 among configurations within `tolerance` of the best throughput
+
+    Throughput differences of a few percent are run-to-run noise, so they should
+    not buy extra workers or latency. Only results within the p99 budget count.
+    """
+    eligible = [r for r in results if p99_budget_ms is None or r['p99_ms'] <= p99_budget_ms]
+    if not eligible:
+        return None
+    top = max(r['images_per_sec'] for r in eligible)
+    close = [r for r in eligible if r['images_per_sec'] >= top * (1 - tolerance)]
+    return min(close, key=lambda r: (r['p99_ms'], r['workers']))
+
+
+def recommendation(result):
+    return {
+        'workers': result['workers'],
+        'threads': 1,
+        'intra_op_threads': result['intra_op_threads'],
+        'inter_op_threads': result['inter_op_threads'],
+        'batch_size': result['batch_size']
+    }
+
+
+def write_tuning(path, model_path, results, chosen, p99_budget_ms=None):
+    """Write the tuning file read by Config and gunicorn.conf.py"""
+    import tensorflow as tf
+    payload = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': {'cpus': host_cpus(), 'machine': platform.machine(), 'processor': platform.processor(),
+                 'python': platform.python_version(), 'tensorflow': tf.__version__},
+        'model': model_path,
+        'p99_budget_ms': p99_budget_ms,
+        'recommended': recommendation(chosen),
+        'results': results
+    }
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(path + '.tmp', path)
+    return payload
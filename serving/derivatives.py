@@ -0,0 +1,128 @@
+"""
+Image Derivatives for Cotton Disease Detection
+Generates small thumbnails and medium previews of uploads in a background pool
+"""
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from PIL import Image, ImageOps, features
+from config import Config
+from .upload_store import NAME_PATTERN
+
+# Variant name -> config attribute holding its longest side in pixels, largest first
+VARIANTS = (('preview', 'DERIVATIVE_PREVIEW_SIZE'), ('thumb', 'DERIVATIVE_THUMB_SIZE'))
+
+
+class DerivativeGenerator:
+    """
+    Thumbnails and previews stored next to the upload as <sha256>.<variant>.<webp|jpg>
+
+    The original is decoded once per upload (JPEGs at a reduced DCT scale via draft())
+    and each variant is resized from the next larger one. A request for a derivative
+    that is still being generated waits for it; one that was never generated in this
+    worker, or was garbage-collected, is rebuilt from the stored original.
+    """
+
+    def __init__(self, store, image_format=None, quality=None, workers=None):
+        self.store = store
+        self.sizes = {variant: getattr(Config, attribute) for variant, attribute in VARIANTS}
+        image_format = (image_format or Config.DERIVATIVE_FORMAT).lower()
+        if image_format == 'webp' and not features.check('webp'):
+            print("Pillow was built without WebP support; derivatives use JPEG")
+            image_format = 'jpeg'
+        self.format = 'WEBP' if image_format == 'webp' else 'JPEG'
+        self.extension = '.webp' if self.format == 'WEBP' else '.jpg'
+        self.quality = quality or Config.DERIVATIVE_QUALITY
+        self.workers = workers or Config.DERIVATIVE_WORKERS
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def names_for(self, upload_name):
+        """Stored names of every variant of an upload, e.g. {'thumb': '<sha256>.thumb.webp'}"""
+        digest = NAME_PATTERN.match(upload_name).group(1)
+        return {variant: f'{digest}.{variant}{self.extension}' for variant in self.sizes}
+
+    def submit(self, upload_name, data):
+        """
+        Queue generation for an upload; returns its variant names straight away
+
+        A repeated upload whose variants are all on disk only refreshes their age.
+
+        Returns:
+            dict: variant -> stored name
+        """
+        names = self.names_for(upload_name)
+        if all(self.store.touch(name) for name in names.values()):
+            return names
+        digest = upload_name[:64]
+        with self._lock:
+            if digest not in self._jobs:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='derivatives')
+                job = self._executor.submit(self._generate, digest, data)
+                self._jobs[digest] = job
+                job.add_done_callback(lambda _, digest=digest: self._finished(digest))
+        return names
+
+    def _finished(self, digest):
+        with self._lock:
+            self._jobs.pop(digest, None)
+
+    def render(self, data):
+        """
+        Encode every variant of an image
+
+        Returns:
+            dict: variant -> encoded bytes
+        """
+        largest = max(self.sizes.values())
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEG decodes straight to a smaller scale; other formats ignore draft()
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGB')
+
+        encoded = {}
+        for variant, size in sorted(self.sizes.items(), key=lambda item: item[1], reverse=True):
+            image.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, self.format, quality=self.quality)
+            encoded[variant] = buffer.getvalue()
+        return encoded
+
+    def _generate(self, digest, data):
+        try:
+            for variant, encoded in self.render(data).items():
+                self.store.write(f'{digest}.{variant}{self.extension}', encoded)
+        except Exception as e:
+            print(f"Error generating derivatives of {digest}: {e}")
+
+    def serve(self, name):
+        """Serve a derivative, waiting for or rebuilding it when it is not on disk yet"""
+        match = NAME_PATTERN.match(name)
+        if match is None or match.group(2) is None:
+            return self.store.serve(name)
+        digest = match.group(1)
+
+        with self._lock:
+            job = self._jobs.get(digest)
+        if job is not None:
+            try:
+                job.result(timeout=Config.MAX_PREDICTION_TIME)
+            except TimeoutError:
+                pass
+        elif not self.store.exists(name):
+            _, data = self.store.read_original(digest)
+            if data is not None:
+                self._generate(digest, data)
+        return self.store.serve(name)
+
+    def _after_fork(self):
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
@@ -0,0 +1,194 @@
+"""
+Streaming Frame Inference for Cotton Disease Detection
+Shares one batching inference thread between live camera streams
+"""
+import io
+import json
+import threading
+import time
+import numpy as np
+from PIL import Image
+from config import Config
+
+FINGERPRINT_SIZE = (16, 16)
+
+
+def frame_fingerprint(frame_bytes):
+    """Small grayscale thumbnail used to detect near-identical consecutive frames"""
+    image = Image.open(io.BytesIO(frame_bytes))
+    # JPEG draft mode decodes at reduced scale, which is much cheaper than a full decode
+    image.draft('L', (FINGERPRINT_SIZE[0] * 4, FINGERPRINT_SIZE[1] * 4))
+    return np.asarray(image.convert('L').resize(FINGERPRINT_SIZE), dtype=np.float32)
+
+
+class FrameStream:
+    """State for one connected camera: latest pending frame and smoothed prediction"""
+
+    def __init__(self, similarity_threshold=None, smoothing=None):
+        self.similarity_threshold = (Config.STREAM_SIMILARITY_THRESHOLD
+                                     if similarity_threshold is None else similarity_threshold)
+        self.smoothing = Config.STREAM_SMOOTHING if smoothing is None else smoothing
+        self.pending = None
+        self.last_fingerprint = None
+        self.smoothed = None
+        self.result_seq = 0
+        self.stats = {'received': 0, 'skipped_similar': 0, 'dropped_stale': 0, 'inferred': 0}
+        self._lock = threading.Lock()
+
+    def submit(self, frame_bytes, handler):
+        """
+        Offer a new frame from the client
+
+        Frames too similar to the last accepted one are skipped; an accepted frame
+        replaces any pending frame the batcher has not picked up yet.
+
+        Returns:
+            bool: True if the frame was queued for inference
+        """
+        self.stats['received'] += 1
+        fingerprint = frame_fingerprint(frame_bytes)
+        if (self.last_fingerprint is not None
+                and np.abs(fingerprint - self.last_fingerprint).mean() < self.similarity_threshold):
+            self.stats['skipped_similar'] += 1
+            return False
+
+        image = handler.preprocess_image(io.BytesIO(frame_bytes))
+        if image is None:
+            return False
+
+        with self._lock:
+            if self.pending is not None:
+                self.stats['dropped_stale'] += 1
+            self.pending = (image[0], time.monotonic())
+            self.last_fingerprint = fingerprint
+        return True
+
+    def take_pending(self, max_age):
+        """Hand the pending frame to the batcher, discarding it if it is too old"""
+        with self._lock:
+            pending, self.pending = self.pending, None
+            if pending is None:
+                return None
+            if time.monotonic() - pending[1] > max_age:
+                self.stats['dropped_stale'] += 1
+                return None
+        return pending[0]
+
+    def update(self, probs):
+        """Fold a new prediction into the exponentially smoothed probabilities"""
+        with self._lock:
+            if self.smoothed is None:
+                self.smoothed = probs
+            else:
+                self.smoothed = self.smoothing * self.smoothed + (1.0 - self.smoothing) * probs
+            self.result_seq += 1
+            self.stats['inferred'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return (None if self.smoothed is None else self.smoothed.copy()), self.result_seq
+
+
+class FrameBatcher:
+    """Background thread that batches the latest pending frame of every stream"""
+
+    def __init__(self, model, max_batch=None, max_frame_age=None):
+        self.model = model
+        self.max_batch = max_batch or Config.STREAM_MAX_BATCH
+        self.max_frame_age = max_frame_age or Config.STREAM_MAX_FRAME_AGE
+        self._streams = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def register(self, stream):
+        with self._lock:
+            self._streams.add(stream)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='frame-batcher', daemon=True)
+                self._thread.start()
+
+    def unregister(self, stream):
+        with self._lock:
+            self._streams.discard(stream)
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _collect(self):
+        with self._lock:
+            streams = list(self._streams)
+        batch = []
+        for stream in streams:
+            image = stream.take_pending(self.max_frame_age)
+            if image is not None:
+                batch.append((stream, image))
+                if len(batch) >= self.max_batch:
+                    break
+        return batch
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            batch = self._collect()
+            while batch:
+                images = np.stack([image for _, image in batch])
+                try:
+                    probs = self.model.predict(images, batch_size=len(images), verbose=0)
+                except Exception as e:
+                    print(f"Error in streaming inference: {e}")
+                    break
+                for (stream, _), prob in zip(batch, probs):
+                    stream.update(prob)
+                batch = self._collect()
+
+
+def serve_stream(ws, batcher, handler, index_to_class):
+    """
+    Run one WebSocket connection: receive binary JPEG frames, send smoothed predictions
+
+    Predictions are pushed at a steady STREAM_EMIT_HZ regardless of the client frame rate.
+    A text message of "stats" returns the stream counters.
+    """
+    stream = FrameStream()
+    batcher.register(stream)
+    interval = 1.0 / Config.STREAM_EMIT_HZ
+    next_emit = time.monotonic() + interval
+    last_sent_seq = 0
+
+    try:
+        while True:
+            message = ws.receive(timeout=max(0.0, next_emit - time.monotonic()))
+            if isinstance(message, (bytes, bytearray)):
+                try:
+                    if stream.submit(bytes(message), handler):
+                        batcher.notify()
+                except Exception as e:
+                    ws.send(json.dumps({'error': f'Could not decode frame: {e}'}))
+            elif message == 'stats':
+                ws.send(json.dumps({'stats': stream.stats}))
+
+            if time.monotonic() < next_emit:
+                continue
+            next_emit += interval
+            if next_emit < time.monotonic():
+                next_emit = time.monotonic() + interval
+
+            probs, seq = stream.snapshot()
+            if probs is None:
+                continue
+            index = int(np.argmax(probs))
+            ws.send(json.dumps({
+                'updated': seq != last_sent_seq,
+                'label': index_to_class[index].replace('_', ' '),
+                'confidence': round(float(probs[index]) * 100, 2),
+                'probabilities': [
+                    {'class': index_to_class[i].replace('_', ' '), 'probability': round(float(p) * 100, 2)}
+                    for i, p in enumerate(probs)
+                ],
+                'frames': dict(stream.stats)
+            }))
+            last_sent_seq = seq
+    finally:
+        batcher.unregister(stream)
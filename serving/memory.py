@@ -0,0 +1,330 @@
+"""
+Memory Instrumentation for Cotton Disease Detection
+Per-worker RSS, Python heap and TensorFlow allocator gauges, plus a tracemalloc leak detector
+"""
+import gc
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from config import Config
+from .telemetry import Gauge
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_bytes():
+    """Current resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def python_heap_by_type(top=None):
+    """
+    Count gc-tracked objects by type name
+
+    Walks every tracked object (hundreds of milliseconds on a loaded worker), so it runs
+    on demand from /api/admin/memory, or on the sampler thread when
+    MEMORY_TYPE_CENSUS_INTERVAL is set.
+
+    Returns:
+        list: (type name, count) pairs, largest first
+    """
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return counts.most_common(top)
+
+
+def tf_allocator_stats():
+    """
+    Current and peak allocator bytes per TensorFlow device
+
+    Only reported once the app has imported TensorFlow; devices whose allocator
+    does not track usage are skipped.
+    """
+    tf = sys.modules.get('tensorflow')
+    if tf is None:
+        return {}
+    stats = {}
+    try:
+        devices = tf.config.list_logical_devices()
+    except Exception:
+        return {}
+    for device in devices:
+        name = device.name.replace('/device:', '')
+        try:
+            stats[name] = tf.config.experimental.get_memory_info(name)
+        except (ValueError, RuntimeError):
+            continue
+    return stats
+
+
+class MemoryMonitor:
+    """
+    Samples worker memory on a background thread into telemetry gauges
+
+    Gauges are labelled by worker pid so growth of a single gunicorn worker stays
+    visible after metrics from all workers are merged. With MEMORY_RECYCLE_RSS_MB
+    set, a worker that crosses it sends itself SIGTERM once; gunicorn finishes the
+    in-flight requests and starts a fresh worker.
+
+    The per-type object gauges come from the last census, which periodic samples
+    only take every census_interval seconds (never when it is 0).
+    """
+
+    def __init__(self, registry, interval=None, top_types=None, recycle_rss_mb=None, census_interval=None):
+        self.interval = Config.MEMORY_SAMPLE_INTERVAL if interval is None else interval
+        self.top_types = Config.MEMORY_TOP_TYPES if top_types is None else top_types
+        self.census_interval = (Config.MEMORY_TYPE_CENSUS_INTERVAL if census_interval is None
+                                else census_interval)
+        recycle_rss_mb = Config.MEMORY_RECYCLE_RSS_MB if recycle_rss_mb is None else recycle_rss_mb
+        self.recycle_bytes = int(recycle_rss_mb * 1024 * 1024)
+        self.rss = registry.register(Gauge(
+            'cottonaid_process_resident_memory_bytes', 'Resident set size per worker', ('worker',)))
+        self.heap = registry.register(Gauge(
+            'cottonaid_python_objects', 'gc-tracked Python objects per worker by type at the last census (most common types)',
+            ('worker', 'type')))
+        self.tf_memory = registry.register(Gauge(
+            'cottonaid_tf_allocator_bytes', 'TensorFlow allocator usage per worker and device',
+            ('worker', 'device', 'kind')))
+        self.last_sample = {}
+        self.last_census = None
+        self._recycling = False
+        self._thread = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Inherited gauges belong to the parent's pid; the child reports its own
+        self._thread = None
+        self.last_census = None
+        for gauge in (self.rss, self.heap, self.tf_memory):
+            with gauge._lock:
+                gauge._values.clear()
+        self.start()
+
+    def start(self):
+        if self.interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name='memory-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            census_due = self.census_interval > 0 and (
+                self.last_census is None or time.time() - self.last_census >= self.census_interval)
+            try:
+                self.sample(type_census=census_due)
+            except Exception as e:
+                print(f"Error sampling memory: {e}")
+            time.sleep(self.interval)
+
+    def sample(self, type_census=False):
+        """
+        Take one sample, update the gauges and return it
+
+        Args:
+            type_census (bool): Also count Python objects by type (walks the whole heap)
+        """
+        worker = str(os.getpid())
+        rss = rss_bytes()
+        heap = python_heap_by_type(self.top_types) if type_census else None
+        tf_stats = tf_allocator_stats()
+
+        self.rss.set(rss, (worker,))
+        if heap is not None:
+            self.last_census = time.time()
+            with self.heap._lock:
+                # Types drop out of the top list; replace rather than accumulate series
+                self.heap._values = {(worker, type_name): count for type_name, count in heap}
+        for device, info in tf_stats.items():
+            for kind, value in info.items():
+                self.tf_memory.set(value, (worker, device, kind))
+
+        self.last_sample = {
+            'pid': os.getpid(), 'sampled_at': time.time(), 'rss_bytes': rss,
+            'python_objects': None if heap is None else dict(heap), 'tf_allocator': tf_stats
+        }
+        if self.recycle_bytes and rss > self.recycle_bytes:
+            self._recycle(rss)
+        return self.last_sample
+
+    def _recycle(self, rss):
+        if self._recycling or 'gunicorn' not in sys.modules:
+            # Outside gunicorn nothing would restart the process
+            return
+        self._recycling = True
+        print(f"Worker {os.getpid()} RSS {rss // (1024 * 1024)} MB exceeds "
+              f"{self.recycle_bytes // (1024 * 1024)} MB; recycling")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+
+class LeakDetector:
+    """
+    Compares tracemalloc snapshots every `requests` requests over `rounds` intervals
+
+    Allocation sites that grew in every interval are reported, largest total growth
+    first. tracemalloc slows allocation noticeably, so it runs only while a check is
+    active and the report is written to PROFILE_DIR for any worker to serve.
+    """
+
+    _lock = threading.Lock()
+    _active = None
+
+    def __init__(self, requests, rounds=3, top=None, frames=None, directory=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.requests = max(int(requests), 1)
+        self.rounds = max(int(rounds), 1)
+        self.top = top or Config.MEMORY_LEAK_TOP
+        self.frames = frames or Config.MEMORY_TRACE_FRAMES
+        self.directory = directory or Config.PROFILE_DIR
+        self.snapshots = []
+        self.seen = 0
+        self.started_tracing = False
+
+    @classmethod
+    def start(cls, *args, **kwargs):
+        """
+        Begin a check in this worker
+
+        Returns:
+            LeakDetector: The new check, or None if one is already running
+        """
+        detector = cls(*args, **kwargs)
+        # Before taking the slot: an OSError here must not leave it held
+        os.makedirs(detector.directory, exist_ok=True)
+        detector._write({'status': 'running'})
+        with cls._lock:
+            if cls._active is not None:
+                os.remove(detector._path())
+                return None
+            detector.started_tracing = not tracemalloc.is_tracing()
+            if detector.started_tracing:
+                tracemalloc.start(detector.frames)
+            try:
+                detector.snapshots.append(detector._snapshot())
+            except Exception:
+                if detector.started_tracing:
+                    tracemalloc.stop()
+                raise
+            cls._active = detector
+        return detector
+
+    @classmethod
+    def request_finished(cls):
+        """Call once per request; snapshots and finishes the active check when due"""
+        detector = cls._active
+        if detector is None:
+            return
+        with cls._lock:
+            if cls._active is not detector:
+                return
+            detector.seen += 1
+            if detector.seen % detector.requests:
+                return
+            detector.snapshots.append(detector._snapshot())
+            if len(detector.snapshots) <= detector.rounds:
+                return
+            cls._active = None
+        try:
+            detector._finish()
+        except OSError as e:
+            # Runs from teardown_request; a lost report must not fail the request
+            print(f"Error writing leak report {detector.id}: {e}")
+
+    @staticmethod
+    def _snapshot():
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def _finish(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+        try:
+            report = self.report()
+        except Exception as e:
+            self._write({'status': 'failed', 'error': str(e)})
+            return
+        self._write({'status': 'done', **report})
+
+    def report(self):
+        """Sites whose allocated size grew in every interval"""
+        growth = {}
+        for older, newer in zip(self.snapshots, self.snapshots[1:]):
+            for stat in newer.compare_to(older, 'traceback'):
+                entry = growth.setdefault(stat.traceback, [0, 0, 0, 0])
+                entry[0] += stat.size_diff > 0
+                entry[1] += stat.size_diff
+                entry[2] += stat.count_diff
+                entry[3] = stat.size
+
+        intervals = len(self.snapshots) - 1
+        growing = sorted(
+            ((traceback, size_diff, count_diff, size)
+             for traceback, (grew, size_diff, count_diff, size) in growth.items() if grew == intervals),
+            key=lambda item: item[1], reverse=True
+        )
+        return {
+            'intervals': intervals,
+            'growing_sites': len(growing),
+            'total_growth_bytes': sum(item[1] for item in growing),
+            'top': [{
+                'size_growth_bytes': size_diff,
+                'count_growth': count_diff,
+                'size_bytes': size,
+                # Allocating line first
+                'traceback': [f'{frame.filename}:{frame.lineno}' for frame in reversed(traceback)]
+            } for traceback, size_diff, count_diff, size in growing[:self.top]]
+        }
+
+    def _path(self):
+        return os.path.join(self.directory, f'leaks-{self.id}.json')
+
+    def _write(self, fields):
+        payload = {'id': self.id, 'pid': os.getpid(), 'requests': self.requests,
+                   'rounds': self.rounds, 'requests_seen': self.seen}
+        payload.update(fields)
+        path = self._path()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(path + '.tmp', path)
+
+
+def load_leak_report(report_id, directory=None):
+    """Leak report written by any worker, or None if unknown"""
+    if not report_id.isalnum():
+        return None
+    path = os.path.join(directory or Config.PROFILE_DIR, f'leaks-{report_id}.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def instrument_app(app, telemetry):
+    """Start the memory monitor and count requests for the leak detector"""
+    monitor = MemoryMonitor(telemetry.registry).start()
+
+    @app.teardown_request
+    def _leak_detector_tick(exc):
+        LeakDetector.request_finished()
+
+    return monitor
@@ -0,0 +1,203 @@
+"""
+Sampling Profiler for Cotton Disease Detection
+Samples live worker stacks for a bounded time and writes flamegraph-compatible folded stacks
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from config import Config
+
+# The sampler's own frames are never part of a profile
+_IGNORED_FILES = (os.path.abspath(__file__),)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def fold_stack(frame):
+    """Root-first 'a;b;c' stack of a frame, as used by flamegraph.pl and speedscope"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Periodically snapshots every thread's Python stack with sys._current_frames()
+
+    Nothing is installed in the profiled threads, so overhead is one stack walk per
+    thread per sample and stops entirely when the profile ends.
+    """
+
+    def __init__(self, hz=None, match=None):
+        self.interval = 1.0 / min(max(hz or Config.PROFILER_DEFAULT_HZ, 1), Config.PROFILER_MAX_HZ)
+        self.match = match
+        self.stacks = Counter()
+        self.samples = 0
+
+    def run(self, seconds, stop_event=None):
+        """Sample for `seconds` (capped at PROFILER_MAX_SECONDS) on the calling thread"""
+        seconds = min(seconds, Config.PROFILER_MAX_SECONDS)
+        own_thread = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + seconds
+        next_sample = time.monotonic()
+
+        while time.monotonic() < deadline and not (stop_event and stop_event.is_set()):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread or frame.f_code.co_filename in _IGNORED_FILES:
+                    continue
+                stack = fold_stack(frame)
+                if self.match and self.match not in stack:
+                    continue
+                name = names.get(thread_id)
+                if name is None:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    name = names.get(thread_id, str(thread_id))
+                self.stacks[f'{name};{stack}'] += 1
+            self.samples += 1
+
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_sample = time.monotonic()
+        return self
+
+    def folded(self):
+        """Folded stacks text: one 'stack count' line per distinct stack"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    """
+    One background profiling run per process, with results written to PROFILE_DIR
+
+    Results are files so that any gunicorn worker can serve a profile started on another.
+    """
+
+    _lock = threading.Lock()
+    _active = None
+
+    def __init__(self, seconds, hz=None, match=None, tf_trace=False, directory=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.seconds = min(float(seconds), Config.PROFILER_MAX_SECONDS)
+        # The rate SamplingProfiler actually samples at, so responses and metadata report it
+        self.hz = min(max(hz or Config.PROFILER_DEFAULT_HZ, 1), Config.PROFILER_MAX_HZ)
+        self.match = match
+        self.tf_trace = tf_trace
+        self.directory = directory or Config.PROFILE_DIR
+        self.stop_event = threading.Event()
+
+    @classmethod
+    def start(cls, *args, **kwargs):
+        """
+        Start a profile in a background thread
+
+        Returns:
+            ProfileSession: The new session, or None if one is already running in this worker
+        """
+        session = cls(*args, **kwargs)
+        # Before taking the slot: an OSError here must not leave it held
+        os.makedirs(session.directory, exist_ok=True)
+        with cls._lock:
+            if cls._active is not None:
+                return None
+            cls._active = session
+        threading.Thread(target=session._run, name='sampling-profiler', daemon=True).start()
+        return session
+
+    @classmethod
+    def stop_active(cls):
+        session = cls._active
+        if session is not None:
+            session.stop_event.set()
+        return session
+
+    def path(self, extension):
+        return os.path.join(self.directory, f'{self.id}.{extension}')
+
+    def _write_meta(self, **fields):
+        meta = {
+            'id': self.id, 'pid': os.getpid(), 'seconds': self.seconds, 'hz': self.hz,
+            'match': self.match, 'tf_trace': self.tf_trace
+        }
+        meta.update(fields)
+        with open(self.path('json.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(self.path('json.tmp'), self.path('json'))
+
+    def _run(self):
+        started = time.time()
+        trace_dir = None
+        try:
+            # Inside the try so an unwritable PROFILE_DIR still releases the active slot
+            self._write_meta(status='running', started_at=started)
+            if self.tf_trace:
+                trace_dir = self._start_tf_trace()
+            profiler = SamplingProfiler(self.hz, self.match).run(self.seconds, self.stop_event)
+            with open(self.path('folded'), 'w', encoding='utf-8') as f:
+                f.write(profiler.folded())
+            self._write_meta(status='done', started_at=started, finished_at=time.time(),
+                             samples=profiler.samples, distinct_stacks=len(profiler.stacks),
+                             tf_trace_dir=trace_dir)
+        except Exception as e:
+            try:
+                self._write_meta(status='failed', started_at=started, error=str(e))
+            except OSError as write_error:
+                print(f"Error writing profile {self.id}: {write_error}")
+        finally:
+            if trace_dir is not None:
+                self._stop_tf_trace()
+            with ProfileSession._lock:
+                ProfileSession._active = None
+
+    def _start_tf_trace(self):
+        """Op-level TensorFlow trace for TensorBoard's profile plugin"""
+        import tensorflow as tf
+        trace_dir = os.path.join(self.directory, f'{self.id}-tf')
+        tf.profiler.experimental.start(trace_dir)
+        return trace_dir
+
+    @staticmethod
+    def _stop_tf_trace():
+        import tensorflow as tf
+        try:
+            tf.profiler.experimental.stop()
+        except Exception as e:
+            print(f"Error stopping TensorFlow trace: {e}")
+
+
+def load_profile(profile_id, directory=None):
+    """
+    Read a profile written by any worker
+
+    Returns:
+        tuple: (meta dict, folded stacks text or None), or (None, None) if unknown
+    """
+    directory = directory or Config.PROFILE_DIR
+    if not profile_id.isalnum():
+        return None, None
+    try:
+        with open(os.path.join(directory, f'{profile_id}.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    folded = None
+    if meta.get('status') == 'done':
+        try:
+            with open(os.path.join(directory, f'{profile_id}.folded'), 'r', encoding='utf-8') as f:
+                folded = f.read()
+        except OSError:
+            # Removed since (e.g. a temp-directory cleanup): the metadata is all there is
+            pass
+    return meta, folded
@@ -0,0 +1,169 @@
+"""
+Slow Request Log for Cotton Disease Detection
+Records slow predictions with input fingerprints and stage timings for later replay
+"""
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from logging.handlers import RotatingFileHandler
+from flask import g, request
+from PIL import Image
+from config import Config
+
+# Stored inputs are named by content hash, so repeated pathological uploads are kept once
+INPUTS_SUBDIR = 'inputs'
+
+
+def fingerprint_image(data):
+    """
+    Size, hash and header fields of an uploaded image (the pixels are not decoded)
+
+    Returns:
+        dict: bytes, sha256, format, mode, width, height (None where unreadable)
+    """
+    info = {'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest(), 'format': None, 'mode': None,
+            'width': None, 'height': None}
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            info.update(format=image.format, mode=image.mode, width=image.width, height=image.height)
+    except Exception as e:
+        info['error'] = str(e)
+    return info
+
+
+class SlowRequestLog:
+    """
+    JSON-lines log of requests slower than a threshold
+
+    Each worker writes its own rotating file (slow_requests.<pid>.jsonl), which avoids
+    rotation races between gunicorn workers. With keep_inputs the uploaded image is
+    copied to <directory>/inputs/<sha256><ext> for benchmarks/replay_slow_requests.py.
+    """
+
+    def __init__(self, directory=None, threshold_ms=None, keep_inputs=None, max_inputs=None):
+        self.directory = directory or Config.SLOW_LOG_DIR
+        self.threshold = (Config.SLOW_LOG_THRESHOLD_MS if threshold_ms is None else threshold_ms) / 1000.0
+        self.keep_inputs = Config.SLOW_LOG_KEEP_INPUTS if keep_inputs is None else keep_inputs
+        self.max_inputs = Config.SLOW_LOG_MAX_INPUTS if max_inputs is None else max_inputs
+        self._logger = None
+        self._logger_pid = None
+
+    @property
+    def enabled(self):
+        return self.threshold > 0
+
+    def _get_logger(self):
+        pid = os.getpid()
+        if self._logger_pid != pid:
+            # A forked worker opens its own file rather than sharing the parent's handle
+            os.makedirs(self.directory, exist_ok=True)
+            logger = logging.getLogger(f'{__name__}.{pid}')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(
+                os.path.join(self.directory, f'slow_requests.{pid}.jsonl'),
+                maxBytes=Config.SLOW_LOG_MAX_BYTES, backupCount=Config.SLOW_LOG_BACKUPS, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.handlers = [handler]
+            self._logger, self._logger_pid = logger, pid
+        return self._logger
+
+    def track(self, timer, **params):
+        """Mark the current request for logging if it turns out slow"""
+        if self.enabled:
+            g.slow_log = {'timer': timer, 'params': params, 'input': None}
+
+    def attach_input(self, data, filename=None):
+        """Record the uploaded bytes the current request is working on"""
+        entry = g.get('slow_log')
+        if entry is not None:
+            entry['input'] = (data, filename)
+
+    def record(self, route, status, timer, params=None, input_file=None):
+        """
+        Write an entry if the request took longer than the threshold
+
+        Returns:
+            dict: The entry written, or None for a fast request
+        """
+        total = timer.total()
+        if not self.enabled or total < self.threshold:
+            return None
+        entry = {
+            'timestamp': time.time(),
+            'route': route,
+            'status': status,
+            'worker': os.getpid(),
+            'total_ms': round(total * 1000, 2),
+            'stages_ms': timer.as_milliseconds(),
+            'params': params or {}
+        }
+        if input_file is not None:
+            data, filename = input_file
+            entry['input'] = {'filename': filename}
+            entry['input'].update(fingerprint_image(data))
+            try:
+                if self.keep_inputs:
+                    entry['input']['stored_as'] = self._store_input(data, filename, entry['input']['sha256'])
+            except OSError as e:
+                entry['input']['error'] = str(e)
+        self._get_logger().info(json.dumps(entry, sort_keys=True))
+        return entry
+
+    def _store_input(self, data, filename, sha256):
+        inputs_dir = os.path.join(self.directory, INPUTS_SUBDIR)
+        os.makedirs(inputs_dir, exist_ok=True)
+        name = sha256 + os.path.splitext(filename or '')[1].lower()
+        target = os.path.join(inputs_dir, name)
+        if not os.path.exists(target):
+            with open(target, 'wb') as f:
+                f.write(data)
+            self._prune_inputs(inputs_dir)
+        return os.path.join(INPUTS_SUBDIR, name)
+
+    def _prune_inputs(self, inputs_dir):
+        stored = glob.glob(os.path.join(inputs_dir, '*'))
+        if len(stored) <= self.max_inputs:
+            return
+        stored.sort(key=lambda path: os.path.getmtime(path))
+        for path in stored[:len(stored) - self.max_inputs]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def instrument_app(self, app):
+        """Log tracked requests once their status is known"""
+
+        @app.after_request
+        def _slow_log_record(response):
+            entry = g.pop('slow_log', None)
+            if entry is not None:
+                try:
+                    route = request.url_rule.rule if request.url_rule is not None else request.path
+                    self.record(route, response.status_code, entry['timer'], entry['params'], entry['input'])
+                except Exception as e:
+                    print(f"Error writing slow request log: {e}")
+            return response
+
+
+def read_entries(directory=None):
+    """Every entry of every worker's log, rotated files included, oldest first"""
+    directory = directory or Config.SLOW_LOG_DIR
+    entries = []
+    for path in glob.glob(os.path.join(directory, 'slow_requests.*.jsonl*')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+    entries.sort(key=lambda entry: entry.get('timestamp', 0))
+    return entries
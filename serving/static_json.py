@@ -0,0 +1,104 @@
+"""
+Pre-serialized JSON for Cotton Disease Detection
+Serves static knowledge-base content as bytes encoded once, with strong ETags and gzip
+"""
+import gzip
+import hashlib
+import json
+from flask import Response, request
+from config import Config
+
+# Bodies smaller than this are not worth a gzip variant
+GZIP_MIN_BYTES = 512
+
+
+class PreserializedJSON:
+    """A JSON document encoded once, plus its gzip variant and strong ETags"""
+
+    __slots__ = ('body', 'gzipped', 'etag', 'gzip_etag')
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = digest
+        if len(self.body) >= GZIP_MIN_BYTES:
+            # mtime=0 keeps the gzip bytes, and therefore the ETag, identical across workers
+            self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+            self.gzip_etag = digest + '-gz'
+        else:
+            self.gzipped = None
+            self.gzip_etag = None
+
+
+class JSONCatalog:
+    """
+    Named documents with an optional key normalizer, each serialized on first request
+
+    Documents may be a lazy mapping such as a knowledge-store view, so nothing is read
+    until a name is requested; the encoded entry is then kept for later requests.
+    """
+
+    def __init__(self, documents, normalize=None):
+        self.documents = documents
+        self.normalize = normalize
+        self._entries = {}
+        self._names_lower = None
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = PreserializedJSON(sorted(self.documents))
+        return self._index
+
+    def _resolve(self, name):
+        if name in self.documents:
+            return name
+        if self.normalize is not None:
+            normalized = self.normalize(name)
+            if normalized in self.documents:
+                return normalized
+        if self._names_lower is None:
+            self._names_lower = {key.lower(): key for key in self.documents}
+        return self._names_lower.get(name.lower())
+
+    def get(self, name):
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+        key = self._resolve(name)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            # Concurrent first requests may both encode; the results are identical
+            entry = self._entries[key] = PreserializedJSON(self.documents[key])
+        return entry
+
+
+def serve_preserialized(entry, max_age=None):
+    """
+    Respond with a pre-serialized document, honouring If-None-Match and Accept-Encoding
+
+    Returns:
+        flask.Response: 200 with the (possibly gzipped) body, or 304 when the client copy is current
+    """
+    max_age = Config.KNOWLEDGE_CACHE_MAX_AGE if max_age is None else max_age
+    use_gzip = entry.gzipped is not None and request.accept_encodings['gzip'] > 0
+    etag = entry.gzip_etag if use_gzip else entry.etag
+
+    headers = {
+        'Cache-Control': f'public, max-age={max_age}, must-revalidate',
+        'Vary': 'Accept-Encoding'
+    }
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(entry.gzipped if use_gzip else entry.body,
+                            mimetype='application/json', headers=headers)
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,446 @@
+"""
+Telemetry for Cotton Disease Detection
+Low-overhead counters, gauges and histograms exposed in the Prometheus text format
+"""
+import bisect
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, request
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow TTA predictions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Totals of exited workers, and the lock serializing folds and scrapes, in the multiprocess directory
+AGGREGATE_FILE = 'aggregate.json'
+LOCK_FILE = 'metrics.lock'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels_text(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base metric: values keyed by a tuple of label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def state(self):
+        with self._lock:
+            return dict(self._values)
+
+    def describe(self):
+        return {'kind': self.kind, 'help': self.help, 'label_names': list(self.label_names)}
+
+    def samples(self, state):
+        for labels, value in sorted(state.items()):
+            yield self.name, self.label_names, labels, value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, label_names=(), merge='sum'):
+        super().__init__(name, help_text, label_names)
+        self.merge = merge  # how worker values are combined: 'sum' or 'max'
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def describe(self):
+        description = super().describe()
+        description['merge'] = self.merge
+        return description
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; observe() is a bisect and three additions under a lock"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def state(self):
+        with self._lock:
+            return {labels: [list(entry[0]), entry[1], entry[2]] for labels, entry in self._values.items()}
+
+    def describe(self):
+        description = super().describe()
+        description['buckets'] = list(self.buckets)
+        return description
+
+    def samples(self, state):
+        names = self.label_names + ('le',)
+        for labels, (counts, total, count) in sorted(state.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', names, labels + (_number(bound),), cumulative
+            yield f'{self.name}_sum', self.label_names, labels, total
+            yield f'{self.name}_count', self.label_names, labels, count
+
+
+class CallbackMetric(Metric):
+    """Counter or gauge whose values are read from a function at scrape time"""
+
+    def __init__(self, name, help_text, label_names, callback, kind='gauge'):
+        super().__init__(name, help_text, label_names)
+        self.kind = kind
+        self.callback = callback
+
+    def state(self):
+        return dict(self.callback())
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def collect(self):
+        """Current state of every metric: name -> (description, state)"""
+        return {name: (metric.describe(), metric.state()) for name, metric in self._metrics.items()}
+
+    def render(self, collected=None):
+        """Prometheus text exposition of this registry (or of merged worker states)"""
+        collected = self.collect() if collected is None else collected
+        lines = []
+        for name, (description, state) in collected.items():
+            metric = self._metrics.get(name)
+            lines.append(f'# HELP {name} {description["help"]}')
+            lines.append(f'# TYPE {name} {description["kind"]}')
+            for sample_name, label_names, labels, value in metric.samples(state):
+                lines.append(f'{sample_name}{_labels_text(label_names, labels)} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def _directory_lock(directory):
+    """Exclusive lock over a metrics directory, held while files are folded or merged"""
+    if fcntl is None:
+        # No gunicorn without fcntl, so only one process uses the directory
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_payload(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        return None
+
+
+def _write_payload(path, payload):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(path + '.tmp', path)
+
+
+def _to_payload(merged):
+    return {name: {'description': description, 'values': [[list(labels), value] for labels, value in state.items()]}
+            for name, (description, state) in merged.items()}
+
+
+def _combine(description, current, value):
+    if current is None:
+        return value
+    if description['kind'] == 'histogram':
+        return [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]]
+    if description['kind'] == 'gauge' and description.get('merge') == 'max':
+        return max(current, value)
+    return current + value
+
+
+def _merge(merged, payload, gauges=True):
+    for name, entry in payload.items():
+        description = entry['description']
+        if description['kind'] == 'gauge' and not gauges:
+            continue
+        _, state = merged.setdefault(name, (description, {}))
+        for labels, value in entry['values']:
+            labels = tuple(labels)
+            state[labels] = _combine(description, state.get(labels), value)
+
+
+def _fold(directory, pid):
+    # Caller holds the directory lock
+    path = os.path.join(directory, f'{pid}.json')
+    payload = _read_payload(path)
+    if payload is not None:
+        aggregate_path = os.path.join(directory, AGGREGATE_FILE)
+        aggregate = {}
+        _merge(aggregate, _read_payload(aggregate_path) or {})
+        _merge(aggregate, payload, gauges=False)
+        _write_payload(aggregate_path, _to_payload(aggregate))
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def clear_multiprocess_dir(directory):
+    """Remove the metric files of a previous server run (call before any worker starts)"""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.json')) + glob.glob(os.path.join(directory, '*.tmp')):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def mark_process_dead(directory, pid):
+    """
+    Fold an exited worker's counters and histograms into the aggregate file
+
+    Its gauges are dropped and its file removed, so a later worker reusing the pid
+    starts from zero instead of overwriting the exited worker's totals.
+    """
+    with _directory_lock(directory):
+        _fold(directory, pid)
+
+
+class MultiprocessCollector:
+    """
+    Shares metrics between gunicorn workers through per-worker JSON files
+
+    Each worker writes its state to <directory>/<pid>.json when scraped and on a
+    timer; a scrape merges every file. Counters and histograms of exited workers
+    are folded into <directory>/aggregate.json so totals do not go backwards;
+    their gauges are dropped.
+    """
+
+    def __init__(self, registry, directory, interval=None):
+        self.registry = registry
+        self.directory = directory
+        self.interval = Config.METRICS_FLUSH_INTERVAL if interval is None else interval
+        os.makedirs(directory, exist_ok=True)
+        self._thread = None
+        if hasattr(os, 'register_at_fork'):
+            # The flush thread does not survive fork (gunicorn --preload)
+            os.register_at_fork(after_in_child=self.start)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.dump()
+            except OSError as e:
+                print(f"Error writing worker metrics: {e}")
+
+    def dump(self):
+        _write_payload(os.path.join(self.directory, f'{os.getpid()}.json'), _to_payload(self.registry.collect()))
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def collect(self):
+        self.dump()
+        merged = {}
+        with _directory_lock(self.directory):
+            live = []
+            for path in glob.glob(os.path.join(self.directory, '*.json')):
+                try:
+                    pid = int(os.path.basename(path)[:-5])
+                except ValueError:
+                    continue
+                if self._alive(pid):
+                    live.append(path)
+                else:
+                    # Workers that exited without the gunicorn child_exit hook folding them
+                    _fold(self.directory, pid)
+            for path in [os.path.join(self.directory, AGGREGATE_FILE)] + live:
+                payload = _read_payload(path)
+                if payload is not None:
+                    _merge(merged, payload)
+        return merged
+
+
+def model_version(path):
+    """Short content-independent version tag of a model file (size and mtime)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'unknown'
+    return hashlib.sha1(f'{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()[:12]
+
+
+class Telemetry:
+    """The application's standard metrics, plus Flask hooks that record them"""
+
+    def __init__(self, registry=None, multiprocess_dir=None):
+        self.registry = registry or Registry()
+        registry = self.registry
+        self.requests = registry.register(Counter(
+            'cottonaid_http_requests_total', 'HTTP requests by route, method and status',
+            ('route', 'method', 'status')))
+        self.latency = registry.register(Histogram(
+            'cottonaid_http_request_duration_seconds', 'HTTP request latency by route', ('route',)))
+        self.in_flight = registry.register(Gauge(
+            'cottonaid_http_requests_in_flight', 'Requests currently being handled', ('route',)))
+        self.stages = registry.register(Histogram(
+            'cottonaid_stage_duration_seconds', 'Pipeline stage latency by endpoint and stage',
+            ('endpoint', 'stage')))
+        self.model_info = registry.register(Gauge(
+            'cottonaid_model_info', 'Loaded model; the value is always 1', ('model', 'version'), merge='max'))
+
+        self._caches = {}
+        self._cache_events = {}
+        self._cache_lock = threading.Lock()
+        self.hits = registry.register(CallbackMetric(
+            'cottonaid_cache_hits_total', 'Cache hits by cache', ('cache',),
+            lambda: {(name,): hits for name, (hits, _) in self._cache_counts().items()}, kind='counter'))
+        self.misses = registry.register(CallbackMetric(
+            'cottonaid_cache_misses_total', 'Cache misses by cache', ('cache',),
+            lambda: {(name,): misses for name, (_, misses) in self._cache_counts().items()}, kind='counter'))
+        # Filled in at scrape time from the (merged) hit and miss counters
+        self.hit_ratio = registry.register(Gauge(
+            'cottonaid_cache_hit_ratio', 'Cache hit ratio since worker start', ('cache',)))
+
+        directory = Config.METRICS_MULTIPROC_DIR if multiprocess_dir is None else multiprocess_dir
+        self.collector = MultiprocessCollector(registry, directory).start() if directory else None
+
+    def set_model(self, path):
+        self.model_info.set(1, (os.path.basename(path), model_version(path)))
+
+    def register_cache(self, name, stats):
+        """Export a cache whose stats() returns (hits, misses), e.g. an lru_cache's cache_info()"""
+        self._caches[name] = stats
+
+    def cache_event(self, name, hit):
+        """Count one hit or miss of a cache that has no statistics of its own"""
+        with self._cache_lock:
+            counts = self._cache_events.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def _cache_counts(self):
+        counts = {name: tuple(stats()[:2]) for name, stats in self._caches.items()}
+        with self._cache_lock:
+            counts.update({name: tuple(values) for name, values in self._cache_events.items()})
+        return counts
+
+    def observe_stages(self, endpoint, timer):
+        """Record every stage of a StageTimer"""
+        for stage, seconds in timer.durations.items():
+            self.stages.observe(seconds, (endpoint, stage))
+
+    def render(self):
+        collected = self.collector.collect() if self.collector is not None else self.registry.collect()
+        hits = collected.get(self.hits.name, (None, {}))[1]
+        misses = collected.get(self.misses.name, (None, {}))[1]
+        ratios = {}
+        for labels, hit_count in hits.items():
+            lookups = hit_count + misses.get(labels, 0)
+            if lookups:
+                ratios[labels] = round(hit_count / lookups, 6)
+        collected[self.hit_ratio.name] = (self.hit_ratio.describe(), ratios)
+        return self.registry.render(collected)
+
+    def instrument_app(self, app, metrics_path='/metrics'):
+        """Count and time every request, and serve the exposition at metrics_path"""
+
+        @app.before_request
+        def _telemetry_start():
+            g.telemetry_route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            g.telemetry_start = time.perf_counter()
+            self.in_flight.inc((g.telemetry_route,))
+
+        @app.after_request
+        def _telemetry_record(response):
+            route = g.get('telemetry_route')
+            if route is not None:
+                self.requests.inc((route, request.method, str(response.status_code)))
+                self.latency.observe(time.perf_counter() - g.telemetry_start, (route,))
+            return response
+
+        @app.teardown_request
+        def _telemetry_finish(exc):
+            route = g.pop('telemetry_route', None)
+            if route is not None:
+                self.in_flight.dec((route,))
+
+        def metrics():
+            return Response(self.render(), mimetype=CONTENT_TYPE)
+
+        app.add_url_rule(metrics_path, 'metrics', metrics, methods=['GET'])
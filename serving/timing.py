@@ -0,0 +1,33 @@
+"""
+Request Stage Timing for Cotton Disease Detection
+Measures named pipeline stages and renders them as a Server-Timing header
+"""
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    def __init__(self):
+        self.durations = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block; repeated stages accumulate"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + (time.perf_counter() - start)
+
+    def total(self):
+        return time.perf_counter() - self._start
+
+    def as_milliseconds(self):
+        return {name: round(seconds * 1000, 2) for name, seconds in self.durations.items()}
+
+    def server_timing(self):
+        """Server-Timing header value, e.g. 'classify;dur=41.2, pests;dur=0.1, total;dur=55.0'"""
+        parts = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.durations.items()]
+        parts.append(f'total;dur={self.total() * 1000:.2f}')
+        return ', '.join(parts)
@@ -0,0 +1,256 @@
+"""
+Upload Store for Cotton Disease Detection
+Content-addressed, sharded storage for uploaded images with background writes and retention GC
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response, request, send_file
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: every worker collects on its own
+    fcntl = None
+
+# <sha256 hex>[.<variant>]<extension>, e.g. 9f86d0...0a08.jpg or 9f86d0...0a08.thumb.webp
+NAME_PATTERN = re.compile(r'^([0-9a-f]{64})(\.(?:thumb|preview))?(\.[a-z0-9]{1,5})?$')
+
+# Stored content never changes under a name, so clients may cache it indefinitely
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class UploadStore:
+    """
+    Uploads stored once per content hash under <root>/<ab>/<cd>/<sha256><ext>
+
+    Names are derived from the bytes, so identical uploads share one file and a
+    returned URL keeps pointing at the same image. Writes happen on a small thread
+    pool after inference; until a write lands the bytes are served from memory.
+    A background thread removes files older than UPLOAD_MAX_AGE_HOURS and then the
+    least recently uploaded ones while the store exceeds UPLOAD_MAX_BYTES.
+    """
+
+    def __init__(self, root=None, max_age_hours=None, max_bytes=None, gc_interval=None, writers=None):
+        self.root = root or Config.UPLOAD_FOLDER
+        self.max_age = (Config.UPLOAD_MAX_AGE_HOURS if max_age_hours is None else max_age_hours) * 3600
+        self.max_bytes = Config.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+        self.gc_interval = Config.UPLOAD_GC_INTERVAL if gc_interval is None else gc_interval
+        self.writers = writers or Config.UPLOAD_WRITERS
+        os.makedirs(self.root, exist_ok=True)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._gc_thread = None
+        if hasattr(os, 'register_at_fork'):
+            # Neither the writer pool nor the GC thread survives fork
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @staticmethod
+    def name_for(data, filename=''):
+        """Content-addressed name: sha256 of the bytes plus the upload's allowed extension"""
+        extension = os.path.splitext(filename)[1].lower()
+        if extension[1:] not in Config.ALLOWED_EXTENSIONS:
+            extension = ''
+        return hashlib.sha256(data).hexdigest() + extension
+
+    def path_for(self, name):
+        return os.path.join(self.root, name[:2], name[2:4], name)
+
+    def put(self, data, filename=''):
+        """Write synchronously and return the stored name"""
+        name = self.name_for(data, filename)
+        self.write(name, data)
+        return name
+
+    def put_async(self, data, filename=''):
+        """Queue the write and return the name immediately; it is servable at once"""
+        name = self.name_for(data, filename)
+        with self._pending_lock:
+            if name in self._pending:
+                return name
+            self._pending[name] = data
+        self._get_executor().submit(self._write_pending, name, data)
+        return name
+
+    def _get_executor(self):
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.writers, thread_name_prefix='upload-writer')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _write_pending(self, name, data):
+        try:
+            self.write(name, data)
+        except OSError as e:
+            print(f"Error storing upload {name}: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(name, None)
+
+    def write(self, name, data):
+        """Store bytes under an explicit name (uploads and their derivatives)"""
+        if self.touch(name):
+            return
+        path = self.path_for(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def touch(self, name):
+        """
+        Refresh the age of a stored file so retention treats it as recent
+
+        Returns:
+            bool: False if the file is not on disk
+        """
+        try:
+            os.utime(self.path_for(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def exists(self, name):
+        with self._pending_lock:
+            if name in self._pending:
+                return True
+        return os.path.isfile(self.path_for(name))
+
+    def read_original(self, digest):
+        """
+        Bytes of the upload with this sha256, pending or on disk
+
+        Returns:
+            tuple: (name, bytes), or (None, None) if it is not stored
+        """
+        names = [digest + extension for extension in
+                 [''] + sorted('.' + extension for extension in Config.ALLOWED_EXTENSIONS)]
+        with self._pending_lock:
+            for name in names:
+                if name in self._pending:
+                    return name, self._pending[name]
+        for name in names:
+            try:
+                with open(self.path_for(name), 'rb') as f:
+                    return name, f.read()
+            except FileNotFoundError:
+                continue
+        return None, None
+
+    def flush(self):
+        """Wait for queued writes (used by tests and shutdown hooks)"""
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def serve(self, name):
+        """
+        Response for a stored upload with a strong ETag, Range support and long-lived caching
+
+        Files on disk go through send_file, which hands the open file to the server's
+        wsgi.file_wrapper (gunicorn uses sendfile(2) for full responses).
+        """
+        match = NAME_PATTERN.match(name)
+        if match is None:
+            return Response('Not found', status=404)
+        etag = match.group(1) + (match.group(2) or '')
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+        with self._pending_lock:
+            data = self._pending.get(name)
+        if data is not None:
+            response = Response(data, mimetype=mimetype)
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response = response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+        else:
+            path = self.path_for(name)
+            if not os.path.isfile(path):
+                return Response('Not found', status=404)
+            response = send_file(os.path.abspath(path), mimetype=mimetype, conditional=True,
+                                 etag=etag, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+        return response
+
+    def collect_garbage(self, now=None):
+        """
+        Apply the age limit, then the size cap (oldest first)
+
+        Returns:
+            tuple: (files removed, bytes freed)
+        """
+        now = time.time() if now is None else now
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith('.'):
+                    continue  # the GC lock file
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith('.tmp') and now - stat.st_mtime < 3600:
+                    continue  # a write in progress
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = freed = 0
+        for mtime, size, path in files:
+            too_old = self.max_age > 0 and now - mtime > self.max_age
+            too_big = self.max_bytes > 0 and total > self.max_bytes
+            if not (too_old or too_big):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def _locked_gc(self):
+        # One worker at a time walks the tree; the others skip this round
+        if fcntl is None:
+            return self.collect_garbage()
+        with open(os.path.join(self.root, '.gc.lock'), 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return 0, 0
+            return self.collect_garbage()
+
+    def start(self):
+        """Start the retention GC thread (idempotent)"""
+        if self.gc_interval > 0 and (self._gc_thread is None or not self._gc_thread.is_alive()):
+            self._gc_thread = threading.Thread(target=self._run_gc, name='upload-gc', daemon=True)
+            self._gc_thread.start()
+        return self
+
+    def _run_gc(self):
+        while True:
+            try:
+                removed, freed = self._locked_gc()
+                if removed:
+                    print(f"Upload GC removed {removed} files ({freed // 1024} KB)")
+            except Exception as e:
+                print(f"Error collecting uploads: {e}")
+            time.sleep(self.gc_interval)
+
+    def _after_fork(self):
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._executor = None
+        if self._gc_thread is not None:
+            self._gc_thread = None
+            self.start()
@@ -41,6 +41,8 @@ cd ..
 
 echo.
 echo [3/4] Starting Flask backend...
+REM Synthetic weather for pest risk unless real data is configured
+if not defined WEATHER_SOURCE set WEATHER_SOURCE=stub
 start "Flask Backend" cmd /k "python app_with_api.py"
 timeout /t 3 /nobreak >nul
 
@@ -36,7 +36,8 @@ cd ..
 
 echo ""
 echo "[3/4] Starting Flask backend..."
-python3 app_with_api.py &
+# Synthetic weather for pest risk unless real data is configured
+WEATHER_SOURCE=${WEATHER_SOURCE:-stub} python3 app_with_api.py &
 FLASK_PID=$!
 sleep 3
 
@@ -0,0 +1,42 @@
+"""
+Knowledge Store Tests
+Building the SQLite store when its configured location cannot be written
+"""
+import os
+import tempfile
+import pytest
+from knowledge_base.store import KnowledgeStore
+
+
+@pytest.fixture
+def private_tempdir(tmp_path, monkeypatch):
+    """Redirect the store's temp-directory fallback into the test's own directory"""
+    directory = tmp_path / 'tmp'
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(directory))
+    return directory
+
+
+def _assert_serves_records(store, private_tempdir):
+    names = store.treatment_names()
+    assert names
+    assert store.treatment(names[0])['urgency']
+    assert store.db_path == str(private_tempdir / 'cottonaid-knowledge.db')
+
+
+def test_missing_directory_falls_back_to_temp_copy(tmp_path, private_tempdir):
+    store = KnowledgeStore(db_path=str(tmp_path / 'missing' / 'knowledge.db'), cache_size=4)
+    _assert_serves_records(store, private_tempdir)
+
+
+@pytest.mark.skipif(not hasattr(os, 'geteuid') or os.geteuid() == 0,
+                    reason="root can write to read-only directories")
+def test_read_only_directory_falls_back_to_temp_copy(tmp_path, private_tempdir):
+    read_only = tmp_path / 'read-only'
+    read_only.mkdir()
+    read_only.chmod(0o555)
+    try:
+        store = KnowledgeStore(db_path=str(read_only / 'knowledge.db'), cache_size=4)
+        _assert_serves_records(store, private_tempdir)
+    finally:
+        read_only.chmod(0o755)
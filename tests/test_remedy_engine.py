@@ -0,0 +1,36 @@
+"""
+Remedy Engine Tests
+Recommendations built from shared frozen records are handed out as private copies
+"""
+import copy
+import pickle
+from knowledge_base.frozen import freeze
+from remedy_engine.engine import RemedyEngine
+from remedy_engine.treatment_database import TREATMENT_DATABASE, get_treatment_info
+
+
+def test_frozen_records_copy_to_plain_containers():
+    record = freeze({'prevention': ['rotate crops'], 'timing': {'follow_up': 'weekly'}})
+    assert copy.deepcopy(record) == {'prevention': ['rotate crops'], 'timing': {'follow_up': 'weekly'}}
+    assert type(copy.deepcopy(record)['prevention']) is list
+    assert type(pickle.loads(pickle.dumps(record))) is dict
+    assert type(record.copy()) is dict
+
+
+def test_public_accessors_return_lists():
+    disease = next(iter(TREATMENT_DATABASE))
+    assert isinstance(TREATMENT_DATABASE[disease]['prevention'], list)
+    assert isinstance(get_treatment_info(disease)['chemical_treatments'], list)
+
+
+def test_recommendations_are_private_copies():
+    engine = RemedyEngine()
+    disease = next(iter(TREATMENT_DATABASE))
+    recommendations = engine.get_treatment_recommendations(disease)
+    recommendations['prevention'].append('caller note')
+    recommendations['application_timing']['follow_up'] = 'changed'
+    copy.deepcopy(recommendations)
+
+    fresh = engine.get_treatment_recommendations(disease)
+    assert 'caller note' not in fresh['prevention']
+    assert fresh['application_timing']['follow_up'] != 'changed'
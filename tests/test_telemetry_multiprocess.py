@@ -0,0 +1,62 @@
+"""
+Multiprocess Telemetry Tests
+Folding the metric files of exited gunicorn workers into one aggregate
+"""
+import json
+import os
+import subprocess
+import sys
+from serving.telemetry import (AGGREGATE_FILE, Counter, Gauge, MultiprocessCollector, Registry,
+                               clear_multiprocess_dir, mark_process_dead)
+
+
+def _exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def _worker_file(directory, pid, requests, in_flight):
+    payload = {
+        'requests_total': {'description': {'kind': 'counter', 'help': 'Requests', 'label_names': []},
+                           'values': [[[], requests]]},
+        'in_flight': {'description': {'kind': 'gauge', 'help': 'In flight', 'label_names': [], 'merge': 'sum'},
+                      'values': [[[], in_flight]]}
+    }
+    with open(os.path.join(directory, f'{pid}.json'), 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+
+
+def _collector(directory):
+    registry = Registry()
+    registry.register(Counter('requests_total', 'Requests')).inc(amount=1)
+    registry.register(Gauge('in_flight', 'In flight')).set(1)
+    return MultiprocessCollector(registry, str(directory), interval=3600)
+
+
+def test_exited_workers_are_folded_into_the_aggregate(tmp_path):
+    collector = _collector(tmp_path)
+    first, second = _exited_pid(), _exited_pid()
+    _worker_file(tmp_path, first, requests=5, in_flight=2)
+    mark_process_dead(str(tmp_path), first)
+    # Not marked dead by the server: folded at the next scrape
+    _worker_file(tmp_path, second, requests=7, in_flight=3)
+
+    merged = collector.collect()
+    assert merged['requests_total'][1] == {(): 13}
+    assert merged['in_flight'][1] == {(): 1}
+    assert sorted(os.listdir(tmp_path)) == sorted([AGGREGATE_FILE, f'{os.getpid()}.json', 'metrics.lock'])
+
+    # A new worker reusing an exited pid starts from zero without losing the old totals
+    _worker_file(tmp_path, first, requests=2, in_flight=0)
+    mark_process_dead(str(tmp_path), first)
+    assert collector.collect()['requests_total'][1] == {(): 15}
+
+
+def test_clear_removes_previous_run(tmp_path):
+    pid = _exited_pid()
+    _worker_file(tmp_path, pid, requests=5, in_flight=2)
+    mark_process_dead(str(tmp_path), pid)
+    _worker_file(tmp_path, _exited_pid(), requests=7, in_flight=3)
+    clear_multiprocess_dir(str(tmp_path))
+    assert _collector(tmp_path).collect()['requests_total'][1] == {(): 1}
@@ -0,0 +1,39 @@
+"""
+Treatment Search Tests
+Stemming, prefix matching, the any-term fallback and facet normalization
+"""
+import pytest
+from knowledge_base.search import TreatmentSearchIndex, stem
+
+
+@pytest.fixture(scope='module')
+def index():
+    return TreatmentSearchIndex.from_knowledge_base()
+
+
+def test_stem_folds_common_suffixes():
+    assert [stem(token) for token in ('sucking', 'flies', 'infested', 'insects', 'grass')] == \
+        ['suck', 'fly', 'infest', 'insect', 'grass']
+
+
+def test_prefix_matches_longer_tokens(index):
+    result = index.search('insect')
+    assert result['match'] == 'all'
+    assert result['total'] > 0
+
+
+def test_falls_back_to_any_term(index):
+    result = index.search('sucking insects')
+    assert result['match'] == 'any'
+    assert result['total'] > 0
+
+
+def test_documents_matching_more_terms_rank_first(index):
+    result = index.search('which treatments use copper', limit=1)
+    assert 'copper' in result['results'][0]['name'].lower()
+
+
+def test_disease_facet_accepts_model_labels(index):
+    by_label = index.search('', {'disease': ['Bacterial_Blight']})
+    by_key = index.search('', {'disease': ['bacterial blight']})
+    assert by_label['total'] == by_key['total'] > 0
@@ -0,0 +1,97 @@
+"""
+Capacity Tuning Script
+Finds the gunicorn worker count, TensorFlow thread pools and batch size for this host
+"""
+import argparse
+import sys
+from config import Config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tune serving capacity for this machine")
+    parser.add_argument('--model', default=Config.SERVING_MODEL_PATH, help="Model to load in every worker")
+    parser.add_argument('--output', default=Config.TUNING_PATH, help="Tuning file read by Config")
+    parser.add_argument('--workers', default=None,
+                        help="Comma-separated worker counts (default: powers of two up to the CPU count)")
+    parser.add_argument('--inter-op', default="1,2", help="Comma-separated inter-op thread counts")
+    parser.add_argument('--batch-sizes', default="1,2,4,8,16", help="Comma-separated batch sizes")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds of load per configuration")
+    parser.add_argument('--p99-budget-ms', type=float, default=None,
+                        help="Only recommend configurations whose p99 latency is within this budget")
+    parser.add_argument('--oversubscribe', action='store_true',
+                        help="Also try intra-op pools that use every core in every worker")
+    return parser.parse_args()
+
+
+def _ints(text):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def _print_result(result, cpus):
+    marker = '(oversubscribed)' if result['workers'] * result['intra_op_threads'] > cpus else ''
+    print(f"{result['workers']:>8}{result['intra_op_threads']:>7}{result['inter_op_threads']:>7}"
+          f"{result['batch_size']:>7}{result['images_per_sec']:>10.1f}{result['p50_ms']:>9.1f}"
+          f"{result['p99_ms']:>9.1f} {marker}")
+
+
+def main():
+    args = parse_args()
+
+    from serving.capacity import host_cpus, thread_candidates, measure, best, write_tuning
+
+    cpus = host_cpus()
+    print("=" * 60)
+    print("Cotton Disease Capacity Tuning")
+    print("=" * 60)
+    print(f"Model: {args.model}")
+    print(f"CPUs:  {cpus}")
+    if args.p99_budget_ms:
+        print(f"p99 budget: {args.p99_budget_ms:.0f} ms")
+    print("-" * 60)
+    print(f"{'Workers':>8}{'Intra':>7}{'Inter':>7}{'Batch':>7}{'Img/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+
+    try:
+        # Stage 1: thread layout at batch size 1 (one upload per request)
+        results = []
+        worker_counts = _ints(args.workers) if args.workers else None
+        for workers, intra_op, inter_op in thread_candidates(cpus, worker_counts, _ints(args.inter_op),
+                                                             args.oversubscribe):
+            result = measure(args.model, workers, intra_op, inter_op, 1, args.duration)
+            _print_result(result, cpus)
+            results.append(result)
+
+        layout = best(results, args.p99_budget_ms)
+        if layout is None:
+            print(f"❌ No thread layout meets the p99 budget of {args.p99_budget_ms:.0f} ms")
+            return False
+
+        # Stage 2: batch size for the best layout
+        for batch_size in _ints(args.batch_sizes):
+            if batch_size == 1:
+                continue
+            result = measure(args.model, layout['workers'], layout['intra_op_threads'],
+                             layout['inter_op_threads'], batch_size, args.duration)
+            _print_result(result, cpus)
+            results.append(result)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted - no tuning file written")
+        return False
+    except Exception as e:
+        print(f"❌ Tuning failed: {e}")
+        return False
+
+    chosen = best(results, args.p99_budget_ms)
+    payload = write_tuning(args.output, args.model, results, chosen, args.p99_budget_ms)
+
+    print("-" * 60)
+    recommended = payload['recommended']
+    print(f"✅ Recommended: {recommended['workers']} workers x {recommended['intra_op_threads']} intra-op / "
+          f"{recommended['inter_op_threads']} inter-op threads, batch size {recommended['batch_size']}")
+    print(f"   {chosen['images_per_sec']:.1f} images/s, p99 {chosen['p99_ms']:.1f} ms")
+    print(f"   Written to {args.output}; Config and gunicorn.conf.py pick it up on the next start")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)